@@ -31,4 +31,8 @@
 import os
 
 LEGGED_GYM_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
-LEGGED_GYM_ENVS_DIR = os.path.join(LEGGED_GYM_ROOT_DIR, 'legged_gym', 'envs')
\ No newline at end of file
+LEGGED_GYM_ENVS_DIR = os.path.join(LEGGED_GYM_ROOT_DIR, 'legged_gym', 'envs')
+if os.environ.get("LEGGED_GYM_NULL_PHYSICS", "0") == "1":
+    from legged_gym import null_physics
+
+    null_physics.install()
@@ -32,6 +32,7 @@ import legged_gym.utils.kinematics.urdf as pk
 from legged_gym.envs.a1_robot import a1_robot_velocity_estimator
 from legged_gym.envs.a1_robot import laikago_constants
 from legged_gym.envs.a1_robot import laikago_motor
+from legged_gym.envs.a1_robot import leg_kinematics
 from legged_gym.envs.a1_robot import minitaur
 from legged_gym.envs.a1_robot import robot_config
 from legged_gym.envs.a1_robot import locomotion_gym_config
@@ -78,10 +79,8 @@ _DEFAULT_HIP_POSITIONS = (
     (-0.195, 0.13, 0),
 )
 
-COM_OFFSET = -np.array([0.012731, 0.002186, 0.000515])
-HIP_OFFSETS = np.array([[0.183, -0.047, 0.], [0.183, 0.047, 0.],
-                        [-0.183, -0.047, 0.], [-0.183, 0.047, 0.]
-                        ]) + COM_OFFSET
+COM_OFFSET = leg_kinematics.COM_OFFSET
+HIP_OFFSETS = leg_kinematics.HIP_OFFSETS
 
 ABDUCTION_P_GAIN = 80.0
 ABDUCTION_D_GAIN = 1.
@@ -128,7 +127,8 @@ class VelocitySource(enum.Enum):
 
 
 # Found that these numba.jit decorators slow down the timestep from 1ms without
-# to 5ms with decorators.
+# to 5ms with decorators. See leg_kinematics for the vectorized versions, for
+# all the legs and batches of states at once.
 # @numba.jit(nopython=True, cache=True)
 def foot_position_in_hip_frame_to_joint_angle(foot_position, l_hip_sign=1):
   l_up = 0.2
@@ -682,3 +682,8 @@ class A1(minitaur.Minitaur):
     # Does not work for Minitaur which has the four bar mechanism for now.
     motor_angles = self.GetMotorAngles()[leg_id * 3:(leg_id + 1) * 3]
     return analytical_leg_jacobian(motor_angles, leg_id)
+
+  def ComputeJacobians(self):
+    """Compute the Jacobians of all the legs, of shape [4, 3, 3]."""
+    return leg_kinematics.leg_jacobians(
+        self.GetMotorAngles().reshape((NUM_LEGS, DOFS_PER_LEG)))
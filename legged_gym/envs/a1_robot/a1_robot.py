@@ -23,13 +23,16 @@ os.sys.path.insert(0, parentdir)
 
 
 from absl import logging
+import itertools
 import math
+import operator
 import re
 import multiprocessing
 import numpy as np
 import time
 
 from legged_gym.envs.a1_robot import a1
+from legged_gym.envs.a1_robot import control_loop
 from legged_gym.envs.a1_robot import minitaur
 from legged_gym.envs.a1_robot import robot_config
 from legged_gym.envs.a1_robot import locomotion_gym_config
@@ -47,6 +50,10 @@ MOTOR_WARN_TEMP_C = 50.0
 COMMAND_CHANNEL_NAME = 'LCM_Low_Cmd'
 STATE_CHANNEL_NAME = 'LCM_Low_State'
 
+# Fields of the motor states read by ReceiveObservation, in the columns of its
+# motor state array.
+_MOTOR_STATE_FIELDS = operator.attrgetter('q', 'dq', 'tauEst', 'temperature')
+
 
 class A1Robot(a1.A1):
   """Interface for real A1 robot."""
@@ -56,8 +63,15 @@ class A1Robot(a1.A1):
                time_step=0.001,
                enable_clip_motor_commands=True,
                reset_func_name='_StandupReset',
+               robot_interface=None,
                **kwargs):
-    """Initializes the robot class."""
+    """Initializes the robot class.
+
+    Args:
+      robot_interface: The interface to the robot, a new RobotInterface by
+        default. E.g. a fake_robot_interface.FakeRobotInterface to run the
+        control loop without the robot.
+    """
     # Initialize pd gain vector
     self._pybullet_client = pybullet_client
     self.time_step = time_step
@@ -74,10 +88,21 @@ class A1Robot(a1.A1):
     self._motor_temperatures = np.zeros(12)
     self._joint_states = None
     self._last_reset_time = time.time()
+    # Paces the time_step loop, and times it. Callers can time their policy in
+    # it, and read its histograms live, e.g. from another thread.
+    self.control_loop = control_loop.ControlLoopScheduler(time_step)
 
     # Initiate UDP for robot state and actions
-    self._robot_interface = RobotInterface()
+    if robot_interface is None:
+      robot_interface = RobotInterface()
+    self._robot_interface = robot_interface
     self._robot_interface.send_command(np.zeros(60, dtype=np.float32))
+    # Commands sent by ApplyAction, which only writes the motor commands in
+    # their slots: 5 per motor, position, kp, velocity, kd and torque.
+    self._position_command = np.zeros(60, dtype=np.float32)
+    self._position_command[1::5] = a1.MOTOR_KPS
+    self._position_command[3::5] = a1.MOTOR_KDS
+    self._torque_command = np.zeros(60, dtype=np.float32)
     # Re-entrant lock to ensure one process commands the robot at a time.
     self._robot_command_lock = multiprocessing.RLock()
     self._pipe = None
@@ -103,24 +128,31 @@ class A1Robot(a1.A1):
     """
     state = self._robot_interface.receive_observation()
     self._raw_state = state
-    # Convert quaternion from wxyz to xyzw, which is default for Pybullet.
-    q = state.imu.quaternion
-    self._base_orientation = np.array([q[1], q[2], q[3], q[0]])
-    self._accelerometer_reading = np.array(state.imu.accelerometer)
-    self._motor_angles = np.array([motor.q for motor in state.motorState[:12]])
-    self._motor_velocities = np.array(
-        [motor.dq for motor in state.motorState[:12]])
-    self._joint_states = np.array(
-        list(zip(self._motor_angles, self._motor_velocities)))
-    self._observed_motor_torques = np.array(
-        [motor.tauEst for motor in state.motorState[:12]])
-    self._motor_temperatures = np.array(
-        [motor.temperature for motor in state.motorState[:12]])
+    self._UnpackState(state)
     if self._init_complete:
       # self._SetRobotStateInSim(self._motor_angles, self._motor_velocities)
       self._velocity_estimator.update(state.tick / 1000.)
       self._UpdatePosition()
 
+  def _UnpackState(self, state):
+    """Reads the IMU and motor states of the low level state of the SDK."""
+    # Convert quaternion from wxyz to xyzw, which is default for Pybullet.
+    q = state.imu.quaternion
+    self._base_orientation = np.array([q[1], q[2], q[3], q[0]])
+    self._accelerometer_reading = np.array(state.imu.accelerometer)
+    # Reads the fields of all the motors in a single pass, into the columns of
+    # one array. The motor state arrays are views of these columns.
+    motor_states = np.fromiter(
+        itertools.chain.from_iterable(
+            map(_MOTOR_STATE_FIELDS, state.motorState[:a1.NUM_MOTORS])),
+        dtype=np.float64,
+        count=4 * a1.NUM_MOTORS).reshape(a1.NUM_MOTORS, 4)
+    self._motor_angles = motor_states[:, 0]
+    self._motor_velocities = motor_states[:, 1]
+    self._joint_states = motor_states[:, :2]
+    self._observed_motor_torques = motor_states[:, 2]
+    self._motor_temperatures = motor_states[:, 3]
+
   def _CheckMotorTemperatures(self):
     if any(self._motor_temperatures > MOTOR_WARN_TEMP_C):
       print("WARNING: Motors are getting hot. Temperatures:")
@@ -197,15 +229,12 @@ class A1Robot(a1.A1):
 
     motor_commands = self._ClipMotorCommands(motor_commands, motor_control_mode)
 
-    command = np.zeros(60, dtype=np.float32)
     if motor_control_mode == robot_config.MotorControlMode.POSITION:
-      for motor_id in range(a1.NUM_MOTORS):
-        command[motor_id * 5] = motor_commands[motor_id]
-        command[motor_id * 5 + 1] = a1.MOTOR_KPS[motor_id]
-        command[motor_id * 5 + 3] = a1.MOTOR_KDS[motor_id]
+      command = self._position_command
+      command[0::5] = motor_commands
     elif motor_control_mode == robot_config.MotorControlMode.TORQUE:
-      for motor_id in range(a1.NUM_MOTORS):
-        command[motor_id * 5 + 4] = motor_commands[motor_id]
+      command = self._torque_command
+      command[4::5] = motor_commands
     elif motor_control_mode == robot_config.MotorControlMode.HYBRID:
       command = np.array(motor_commands, dtype=np.float32)
     else:
@@ -238,8 +267,9 @@ class A1Robot(a1.A1):
         except (robot_config.SafetyError) as e:
           error = e
           continue
-        self.ApplyAction(
-            pose, motor_control_mode=robot_config.MotorControlMode.POSITION)
+        with self.control_loop.Measure(control_loop.APPLY_ACTION):
+          self.ApplyAction(
+              pose, motor_control_mode=robot_config.MotorControlMode.POSITION)
     pipe.send(error)
 
   def HoldCurrentPose(self):
@@ -300,6 +330,7 @@ class A1Robot(a1.A1):
     """Reset the robot to default motor angles."""
     self._base_position[2] = 0
     self._last_position_update_time = time.time()
+    self.control_loop.Restart()
     super(A1Robot, self).Reset(reload_urdf=reload_urdf,
                                default_motor_angles=default_motor_angles,
                                reset_time=-1)
@@ -322,8 +353,10 @@ class A1Robot(a1.A1):
 
   def _StepInternal(self, action, motor_control_mode=None):
     if self._is_safe:
-      self.ApplyAction(action, motor_control_mode)
-    self.ReceiveObservation()
+      with self.control_loop.Measure(control_loop.APPLY_ACTION):
+        self.ApplyAction(action, motor_control_mode)
+    with self.control_loop.Measure(control_loop.RECEIVE_OBSERVATION):
+      self.ReceiveObservation()
     self._state_action_counter += 1
     if not self._is_safe:
       return
@@ -339,14 +372,15 @@ class A1Robot(a1.A1):
     self._Nap()
 
   def _Nap(self):
-    """Sleep for the remainder of self.time_step."""
-    now = time.time()
-    sleep_time = self.time_step - (now - self._last_step_time_wall)
+    """Waits for the deadline of the next self.time_step tick."""
+    period = self.control_loop.WaitForNextTick()
     if self._timesteps is not None:
-      self._timesteps.append(now - self._last_step_time_wall)
-    self._last_step_time_wall = now
-    if sleep_time >= 0:
-      time.sleep(sleep_time)
+      self._timesteps.append(period)
+
+  def LogTimesteps(self):
+    super().LogTimesteps()
+    if self.control_loop.histograms[control_loop.PERIOD].Summary()['count']:
+      print(self.control_loop.Report())
 
   def Brake(self):
     self.ReleasePose()
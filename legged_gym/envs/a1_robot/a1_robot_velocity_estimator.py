@@ -88,20 +88,16 @@ class VelocityEstimator:
     self.filter.predict(u=calibrated_acc * delta_time_s)
 
     # Correct estimation using contact legs
-    observed_velocities = []
-    foot_contact = self.robot.GetFootContacts()
-    for leg_id in range(4):
-      if foot_contact[leg_id]:
-        jacobian = self.robot.ComputeJacobian(leg_id)
-        # Only pick the jacobian related to joint motors
-        joint_velocities = self.robot.GetMotorVelocities()[leg_id *
-                                                           3:(leg_id + 1) * 3]
-        leg_velocity_in_base_frame = jacobian.dot(joint_velocities)
-        base_velocity_in_base_frame = -leg_velocity_in_base_frame[:3]
-        observed_velocities.append(rot_mat.dot(base_velocity_in_base_frame))
-
-    if observed_velocities:
-      observed_velocities = np.mean(observed_velocities, axis=0)
+    foot_contact = np.asarray(self.robot.GetFootContacts(), dtype=float)
+    num_contacts = foot_contact.sum()
+    if num_contacts:
+      # Velocities of all the feet at once, averaged over the contact legs
+      joint_velocities = self.robot.GetMotorVelocities().reshape((4, 3, 1))
+      leg_velocities_in_base_frame = np.matmul(self.robot.ComputeJacobians(),
+                                               joint_velocities)[..., 0]
+      base_velocity_in_base_frame = -foot_contact.dot(
+          leg_velocities_in_base_frame) / num_contacts
+      observed_velocities = rot_mat.dot(base_velocity_in_base_frame)
       self.filter.update(observed_velocities)
 
     vel_x = self.moving_window_filter_x.calculate_average(self.filter.x[0])
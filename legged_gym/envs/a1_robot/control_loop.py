@@ -0,0 +1,184 @@
+"""Deadline based scheduler of the real robot control loop, with timing histograms."""
+
+import contextlib
+import math
+import multiprocessing
+import time
+
+import numpy as np
+
+# Histograms of ControlLoopScheduler, in seconds. LATENESS is the time between
+# the deadline of a tick and the actual start of the tick.
+PERIOD = 'period'
+LATENESS = 'lateness'
+RECEIVE_OBSERVATION = 'receive_observation'
+APPLY_ACTION = 'apply_action'
+POLICY_INFERENCE = 'policy_inference'
+HISTOGRAM_NAMES = (PERIOD, LATENESS, RECEIVE_OBSERVATION, APPLY_ACTION,
+                   POLICY_INFERENCE)
+
+
+class LatencyHistogram(object):
+  """Histogram of durations, with logarithmic bins from 1 us to 10 s.
+
+  The counts are in shared memory, without a lock: there is a single writer at
+  a time, and readers in other threads, or processes forked after the
+  construction, read them live. A reader may see a sample in the counts but not
+  yet in the sum, which is negligible for the statistics.
+  """
+
+  MIN_DURATION = 1e-6
+  BINS_PER_DECADE = 500
+  NUM_DECADES = 7
+
+  def __init__(self):
+    # Bin 0 counts the durations below MIN_DURATION, the last bin the ones
+    # above MIN_DURATION * 10**NUM_DECADES.
+    self._num_bins = self.BINS_PER_DECADE * self.NUM_DECADES + 2
+    self._counts = np.frombuffer(
+        multiprocessing.RawArray('q', self._num_bins), dtype=np.int64)
+    # Sum and max of the durations.
+    self._totals = np.frombuffer(multiprocessing.RawArray('d', 2))
+
+  def Record(self, duration):
+    if duration <= self.MIN_DURATION:
+      index = 0
+    else:
+      index = min(
+          1 + int(math.log10(duration / self.MIN_DURATION) *
+                  self.BINS_PER_DECADE), self._num_bins - 1)
+    self._counts[index] += 1
+    self._totals[0] += duration
+    if duration > self._totals[1]:
+      self._totals[1] = duration
+
+  def Clear(self):
+    self._counts[:] = 0
+    self._totals[:] = 0
+
+  def _BinCenter(self, index):
+    """Geometric center of a bin, the bounds for the first and last ones."""
+    if index == 0:
+      return self.MIN_DURATION
+    exponent = min(index - 0.5, self._num_bins - 2) / self.BINS_PER_DECADE
+    return self.MIN_DURATION * 10**exponent
+
+  def Summary(self, quantiles=(0.5, 0.9, 0.99)):
+    """Returns the count, mean, max and quantiles of the durations.
+
+    The quantiles are the centers of their bins, within 0.25% of the durations.
+    """
+    counts = self._counts.copy()
+    total, max_duration = self._totals
+    count = int(counts.sum())
+    summary = {'count': count, 'mean': total / max(count, 1),
+               'max': max_duration}
+    cumulative_counts = np.cumsum(counts)
+    for quantile in quantiles:
+      index = np.searchsorted(cumulative_counts, quantile * count)
+      summary['p{:g}'.format(100 * quantile)] = (
+          self._BinCenter(index) if count else 0.0)
+    return summary
+
+
+class ControlLoopScheduler(object):
+  """Runs a loop with a fixed period, against absolute deadlines.
+
+  WaitForNextTick() sleeps until shortly before the deadline of the next tick,
+  then spins on the monotonic clock until the deadline, since sleep only
+  guarantees a minimum duration. The deadlines are absolute, so the loop does
+  not drift with the time spent between ticks. When a tick ends after the
+  deadline of the next one (an overrun), the next tick starts right away and
+  the deadlines restart from it: the missed ticks are skipped rather than run
+  back to back.
+  """
+
+  def __init__(self, period, spin_time=0.0002):
+    """Initializes the scheduler.
+
+    Args:
+      period: The period of the loop, in seconds.
+      spin_time: Time before each deadline spent spinning rather than sleeping,
+        in seconds. Longer than the sleep overshoot of the OS.
+    """
+    self.period = period
+    self._spin_time = spin_time
+    # Deadline of the next tick, start of the last one, number of overruns and
+    # of missed ticks. Shared, like the histograms, with the processes forked
+    # after the construction, which run the loop in turn.
+    self._state = np.frombuffer(multiprocessing.RawArray('d', 4))
+    self.histograms = {name: LatencyHistogram() for name in HISTOGRAM_NAMES}
+
+  def Restart(self):
+    """Starts the deadlines again from now, e.g. after a pause of the loop."""
+    now = time.perf_counter()
+    self._state[0] = now + self.period
+    self._state[1] = now
+
+  def WaitForNextTick(self):
+    """Waits for the deadline of the next tick.
+
+    Returns:
+      The time since the start of the last tick.
+    """
+    deadline = self._state[0]
+    if not deadline:
+      self.Restart()
+      return 0.
+    now = time.perf_counter()
+    if now > deadline:
+      self._state[2] += 1
+      self._state[3] += math.floor((now - deadline) / self.period)
+      tick = now
+      self._state[0] = tick + self.period
+    else:
+      sleep_time = deadline - now - self._spin_time
+      if sleep_time > 0:
+        time.sleep(sleep_time)
+      tick = time.perf_counter()
+      while tick < deadline:
+        tick = time.perf_counter()
+      self._state[0] = deadline + self.period
+    period = tick - self._state[1]
+    self._state[1] = tick
+    self.histograms[PERIOD].Record(period)
+    self.histograms[LATENESS].Record(tick - deadline)
+    return period
+
+  @contextlib.contextmanager
+  def Measure(self, name):
+    """Records the duration of the with block in the histogram name."""
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.histograms[name].Record(time.perf_counter() - start)
+
+  @property
+  def num_overruns(self):
+    return int(self._state[2])
+
+  @property
+  def num_missed_ticks(self):
+    return int(self._state[3])
+
+  def Clear(self):
+    """Clears the histograms and the overrun counts."""
+    for histogram in self.histograms.values():
+      histogram.Clear()
+    self._state[2:] = 0
+
+  def Report(self):
+    """Returns the statistics of the histograms, in ms, as a string."""
+    lines = ['Control loop at {:g} Hz: {} overruns, {} missed ticks'.format(
+        1. / self.period, self.num_overruns, self.num_missed_ticks)]
+    for name, histogram in self.histograms.items():
+      summary = histogram.Summary()
+      if not summary['count']:
+        continue
+      lines.append(
+          '{:>20}: n {:>8}, mean {:.3f}, p50 {:.3f}, p90 {:.3f}, p99 {:.3f}, '
+          'max {:.3f} ms'.format(name, summary['count'], 1e3 * summary['mean'],
+                                 1e3 * summary['p50'], 1e3 * summary['p90'],
+                                 1e3 * summary['p99'], 1e3 * summary['max']))
+    return '\n'.join(lines)
@@ -8,12 +8,14 @@ from legged_gym.envs.a1_robot import a1_robot
 
 def build_env_isaac(sim_params, default_pose, obs_scales, action_scale,
                     use_real_robot=False,
-                    realistic_sim=False):
+                    realistic_sim=False,
+                    flat_observation=False,
+                    urdf_filename=a1.URDF_FILENAME):
 
   gym_config = locomotion_gym_config.LocomotionGymConfig(simulation_parameters=sim_params)
 
   robot_class = a1_robot.A1Robot if use_real_robot else a1.A1
-  robot_kwargs = {}
+  robot_kwargs = {"urdf_filename": urdf_filename}
 
   if use_real_robot or realistic_sim:
     robot_kwargs["reset_func_name"] = "_SafeJointsReset"
@@ -46,7 +48,8 @@ def build_env_isaac(sim_params, default_pose, obs_scales, action_scale,
       robot_kwargs=robot_kwargs,
       env_randomizers=[],
       robot_sensors=sensors,
-      task=None)
+      task=None,
+      flat_observation=flat_observation)
   env = action_scale_wrapper.ActionScaleWrapper(env, action_scale, default_pose)
   return env
 
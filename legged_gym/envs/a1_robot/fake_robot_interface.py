@@ -0,0 +1,102 @@
+"""Local stand-in for the Unitree robot_interface.RobotInterface of the A1.
+
+It exchanges the same messages as the real interface, without a robot, to run
+and time A1Robot's control loop on any machine. The robot stands still: the
+motors move towards the position commands with a first order response, the
+IMU reads gravity, and the feet are in contact.
+"""
+
+import time
+
+import numpy as np
+
+NUM_LEGS = 4
+NUM_MOTORS = 12
+# The low level state of the SDK has 20 motor slots, 12 of them used by the A1.
+NUM_MOTOR_SLOTS = 20
+# Time constant of the motor response to the position commands, in seconds.
+MOTOR_TIME_CONSTANT = 0.02
+
+
+class MotorState(object):
+
+  def __init__(self):
+    self.q = 0.
+    self.dq = 0.
+    self.tauEst = 0.
+    self.temperature = 30
+
+
+class IMU(object):
+
+  def __init__(self):
+    # wxyz
+    self.quaternion = [1., 0., 0., 0.]
+    self.gyroscope = [0., 0., 0.]
+    self.accelerometer = [0., 0., 9.81]
+
+
+class LowState(object):
+
+  def __init__(self):
+    self.imu = IMU()
+    self.motorState = [MotorState() for _ in range(NUM_MOTOR_SLOTS)]
+    self.footForce = [50] * NUM_LEGS
+    self.tick = 0
+
+
+class FakeRobotInterface(object):
+  """Fake of robot_interface.RobotInterface, with an optional UDP latency."""
+
+  def __init__(self, latency=0., initial_motor_angles=None):
+    """Initializes the interface.
+
+    Args:
+      latency: Time spent in receive_observation and send_command, in seconds,
+        to emulate the communication with the robot.
+      initial_motor_angles: The initial motor angles, zeros by default.
+    """
+    self._latency = latency
+    self._state = LowState()
+    if initial_motor_angles is not None:
+      for motor, angle in zip(self._state.motorState, initial_motor_angles):
+        motor.q = float(angle)
+    self._command = np.zeros(60, dtype=np.float32)
+    self._start_time = time.perf_counter()
+    self._last_update_time = self._start_time
+
+  def _Wait(self):
+    if self._latency > 0:
+      end = time.perf_counter() + self._latency
+      while time.perf_counter() < end:
+        pass
+
+  def _Update(self):
+    now = time.perf_counter()
+    dt = now - self._last_update_time
+    self._last_update_time = now
+    alpha = 1. - np.exp(-dt / MOTOR_TIME_CONSTANT)
+    for motor_id in range(NUM_MOTORS):
+      motor = self._state.motorState[motor_id]
+      kp = self._command[motor_id * 5 + 1]
+      if kp > 0:
+        target = float(self._command[motor_id * 5])
+        step = alpha * (target - motor.q)
+        motor.q += step
+        motor.dq = step / dt if dt > 0 else 0.
+      else:
+        motor.dq = 0.
+      motor.tauEst = float(self._command[motor_id * 5 + 4])
+    self._state.tick = int(1000 * (now - self._start_time))
+
+  def receive_observation(self):
+    self._Wait()
+    self._Update()
+    return self._state
+
+  def send_command(self, command):
+    self._Wait()
+    self._command = np.array(command, dtype=np.float32)
+
+  def brake(self):
+    self._command = np.zeros(60, dtype=np.float32)
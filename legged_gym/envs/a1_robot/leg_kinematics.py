@@ -0,0 +1,174 @@
+"""Batched analytical kinematics of the A1 legs.
+
+Vectorized counterparts of the per-leg functions of a1.py, for joint angles of
+shape [..., 4, 3] (the legs FL, FR, RL, RR, and their abduction, hip and knee
+joints), e.g. [4, 3] for the state of the robot or [num_frames, 4, 3] for a
+motion clip. Each function takes numpy arrays or torch tensors and returns the
+same type, on the device and with the dtype of the torch inputs.
+"""
+
+import functools
+
+import numpy as np
+import torch
+
+UPPER_LEG_LENGTH = 0.2
+LOWER_LEG_LENGTH = 0.2
+HIP_LENGTH = 0.08505
+# Side of the hip of each leg, (-1)**(leg_id + 1): right legs are -1.
+LEG_HIP_SIGNS = np.array([-1., 1., -1., 1.])
+
+COM_OFFSET = -np.array([0.012731, 0.002186, 0.000515])
+HIP_OFFSETS = np.array([[0.183, -0.047, 0.], [0.183, 0.047, 0.],
+                        [-0.183, -0.047, 0.], [-0.183, 0.047, 0.]
+                        ]) + COM_OFFSET
+
+
+# Signed hip lengths of the legs.
+_HIP_LENGTHS = HIP_LENGTH * LEG_HIP_SIGNS
+_CONSTANTS = {'hip_lengths': _HIP_LENGTHS, 'hip_offsets': HIP_OFFSETS}
+
+
+def _array_module(x):
+  return torch if torch.is_tensor(x) else np
+
+
+@functools.lru_cache(maxsize=None)
+def _torch_constant(name, dtype, device):
+  return torch.as_tensor(_CONSTANTS[name], dtype=dtype, device=device)
+
+
+def _constant(name, x):
+  """Returns the constant name as the array type of x."""
+  if torch.is_tensor(x):
+    return _torch_constant(name, x.dtype, x.device)
+  return _CONSTANTS[name]
+
+
+def _empty(x, shape):
+  """Returns an uninitialized array of the array type of x."""
+  if torch.is_tensor(x):
+    return torch.empty(shape, dtype=x.dtype, device=x.device)
+  return np.empty(shape)
+
+
+def _leg_distance(xp, theta_knee):
+  """Distance from the hip joint to the foot, in the plane of the leg."""
+  return xp.sqrt(UPPER_LEG_LENGTH**2 + LOWER_LEG_LENGTH**2 +
+                 2 * UPPER_LEG_LENGTH * LOWER_LEG_LENGTH * xp.cos(theta_knee))
+
+
+def foot_positions_in_hip_frame(joint_angles):
+  """Returns the foot positions in the hip frames, of shape [..., 4, 3].
+
+  Args:
+    joint_angles: The joint angles of the legs, of shape [..., 4, 3].
+  """
+  xp = _array_module(joint_angles)
+  theta_ab = joint_angles[..., 0]
+  theta_hip = joint_angles[..., 1]
+  theta_knee = joint_angles[..., 2]
+  l_hip = _constant('hip_lengths', joint_angles)
+  leg_distance = _leg_distance(xp, theta_knee)
+  eff_swing = theta_hip + theta_knee / 2
+
+  off_z_hip = -leg_distance * xp.cos(eff_swing)
+  cos_ab = xp.cos(theta_ab)
+  sin_ab = xp.sin(theta_ab)
+  foot_positions = _empty(joint_angles, joint_angles.shape)
+  foot_positions[..., 0] = -leg_distance * xp.sin(eff_swing)
+  foot_positions[..., 1] = cos_ab * l_hip - sin_ab * off_z_hip
+  foot_positions[..., 2] = sin_ab * l_hip + cos_ab * off_z_hip
+  return foot_positions
+
+
+def foot_positions_in_base_frame(joint_angles):
+  """Returns the foot positions in the base frame, of shape [..., 4, 3].
+
+  Args:
+    joint_angles: The joint angles of the legs, of shape [..., 4, 3].
+  """
+  return (foot_positions_in_hip_frame(joint_angles) +
+          _constant('hip_offsets', joint_angles))
+
+
+def joint_angles_from_foot_positions_in_hip_frame(foot_positions):
+  """Inverse kinematics, returns the joint angles of shape [..., 4, 3].
+
+  The knee angles are negative, the angles are NaN for unreachable positions.
+
+  Args:
+    foot_positions: The foot positions in the hip frames, of shape [..., 4, 3].
+  """
+  xp = _array_module(foot_positions)
+  x = foot_positions[..., 0]
+  y = foot_positions[..., 1]
+  z = foot_positions[..., 2]
+  l_hip = _constant('hip_lengths', foot_positions)
+  theta_knee = -xp.arccos(
+      (x**2 + y**2 + z**2 - l_hip**2 - LOWER_LEG_LENGTH**2 -
+       UPPER_LEG_LENGTH**2) / (2 * LOWER_LEG_LENGTH * UPPER_LEG_LENGTH))
+  leg_distance = _leg_distance(xp, theta_knee)
+  theta_hip = xp.arcsin(-x / leg_distance) - theta_knee / 2
+  projected_distance = leg_distance * xp.cos(theta_hip + theta_knee / 2)
+  c1 = l_hip * y - projected_distance * z
+  s1 = projected_distance * y + l_hip * z
+  joint_angles = _empty(foot_positions, foot_positions.shape)
+  joint_angles[..., 0] = xp.arctan2(s1, c1)
+  joint_angles[..., 1] = theta_hip
+  joint_angles[..., 2] = theta_knee
+  return joint_angles
+
+
+def joint_angles_from_foot_positions_in_base_frame(foot_positions):
+  """Inverse kinematics, returns the joint angles of shape [..., 4, 3].
+
+  Args:
+    foot_positions: The foot positions in the base frame, of shape [..., 4, 3].
+  """
+  return joint_angles_from_foot_positions_in_hip_frame(
+      foot_positions - _constant('hip_offsets', foot_positions))
+
+
+def leg_jacobians(joint_angles):
+  """Returns the Jacobians of the foot positions, of shape [..., 4, 3, 3].
+
+  jacobians[..., leg, i, j] is the derivative of the coordinate i of the foot
+  position of the leg with respect to its joint angle j.
+
+  Args:
+    joint_angles: The joint angles of the legs, of shape [..., 4, 3].
+  """
+  xp = _array_module(joint_angles)
+  t1 = joint_angles[..., 0]
+  t2 = joint_angles[..., 1]
+  t3 = joint_angles[..., 2]
+  l_hip = _constant('hip_lengths', joint_angles)
+  l_eff = _leg_distance(xp, t3)
+  t_eff = t2 + t3 / 2
+  sin_t1 = xp.sin(t1)
+  cos_t1 = xp.cos(t1)
+  sin_t_eff = xp.sin(t_eff)
+  cos_t_eff = xp.cos(t_eff)
+  # Opposite of the derivative of l_eff with respect to t3
+  knee_term = LOWER_LEG_LENGTH * UPPER_LEG_LENGTH * xp.sin(t3) / l_eff
+
+  # Derivatives of the foot position in the plane of the leg, before the
+  # abduction rotation: (-l_eff sin(t_eff), -l_eff cos(t_eff))
+  dx_dt2 = -l_eff * cos_t_eff
+  dx_dt3 = knee_term * sin_t_eff + dx_dt2 / 2
+  dz_dt2 = l_eff * sin_t_eff
+  dz_dt3 = knee_term * cos_t_eff + dz_dt2 / 2
+  l_eff_cos = l_eff * cos_t_eff
+
+  jacobians = _empty(joint_angles, joint_angles.shape + (3,))
+  jacobians[..., 0, 0] = 0
+  jacobians[..., 0, 1] = dx_dt2
+  jacobians[..., 0, 2] = dx_dt3
+  jacobians[..., 1, 0] = -l_hip * sin_t1 + l_eff_cos * cos_t1
+  jacobians[..., 1, 1] = -dz_dt2 * sin_t1
+  jacobians[..., 1, 2] = -dz_dt3 * sin_t1
+  jacobians[..., 2, 0] = l_hip * cos_t1 + l_eff_cos * sin_t1
+  jacobians[..., 2, 1] = dz_dt2 * cos_t1
+  jacobians[..., 2, 2] = dz_dt3 * cos_t1
+  return jacobians
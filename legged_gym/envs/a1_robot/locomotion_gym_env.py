@@ -46,7 +46,8 @@ class LocomotionGymEnv(gym.Env):
                robot_sensors=None,
                task=None,
                env_randomizers=None,
-               robot_kwargs=None):
+               robot_kwargs=None,
+               flat_observation=False):
     """Initializes the locomotion gym environment.
 
     Args:
@@ -61,6 +62,10 @@ class LocomotionGymEnv(gym.Env):
         randomize the physical property of minitaur, change the terrrain during
         reset(), or add perturbation forces during step().
       robot_kwargs: An optional dictionary of arguments to pass to the robot.
+      flat_observation: Whether the observations are a flat float32 array, the
+        concatenation of the sensor values in the order of all_sensors(),
+        rather than a dictionary. The sensors write their values in place into
+        a preallocated array, returned by each reset() and step().
 
     Raises:
       ValueError: If the num_action_repeat is less than 1.
@@ -131,6 +136,14 @@ class LocomotionGymEnv(gym.Env):
     self._render_width = gym_config.simulation_parameters.render_width
     self._render_height = gym_config.simulation_parameters.render_height
 
+    # The flat observation is laid out at construction, the sensors of the
+    # robot are the same after a hard reset.
+    self._flat_observation = None
+    self._flat_observation_slices = None
+    if flat_observation:
+      self._build_flat_observation(
+          list(self._robot_sensors or []) + self._sensors)
+
     self._hard_reset = True
     self.reset()
 
@@ -138,9 +151,54 @@ class LocomotionGymEnv(gym.Env):
 
     # Construct the observation space from the list of sensors. Note that we
     # will reconstruct the observation_space after the robot is created.
-    self.observation_space = (
-        space_utils.convert_sensors_to_gym_space_dictionary(
-            self.all_sensors()))
+    if flat_observation:
+      self.observation_space = (
+          space_utils.convert_1d_box_sensors_to_gym_space(self.all_sensors()))
+    else:
+      self.observation_space = (
+          space_utils.convert_sensors_to_gym_space_dictionary(
+              self.all_sensors()))
+
+  def _build_flat_observation(self, sensors):
+    """Lays out the sensors in a preallocated flat observation."""
+    self._flat_observation_sensors = sensors
+    self._flat_observation_slices = collections.OrderedDict()
+    offset = 0
+    for s in sensors:
+      self._flat_observation_slices[s.get_name()] = slice(
+          offset, offset + s.get_size())
+      offset += s.get_size()
+    self.set_flat_observation_buffer(np.zeros(offset, dtype=np.float32))
+
+  def set_flat_observation_buffer(self, buffer):
+    """Sets the array the sensors write the flat observations into.
+
+    Args:
+      buffer: A flat array of the size of the flat observation, e.g. the numpy
+        view of a pinned torch tensor, to hand the observations to a policy
+        without copies.
+
+    Raises:
+      ValueError: If the environment has no flat observation, or the buffer
+        has the wrong shape.
+    """
+    if self._flat_observation_slices is None:
+      raise ValueError('the environment has no flat observation.')
+    size = sum(obs_slice.stop - obs_slice.start
+               for obs_slice in self._flat_observation_slices.values())
+    if buffer.shape != (size,):
+      raise ValueError('flat observation buffer of shape {}, expected '
+                       '({},).'.format(buffer.shape, size))
+    self._flat_observation = buffer
+    # Views of the sensor slots, sliced once rather than at each step.
+    self._flat_observation_views = [
+        buffer[obs_slice] for obs_slice in self._flat_observation_slices.values()
+    ]
+
+  @property
+  def flat_observation_slices(self):
+    """The slices of the sensors in the flat observation, by sensor name."""
+    return self._flat_observation_slices
 
   def _build_action_space(self):
     """Builds action space based on motor control mode."""
@@ -445,6 +503,12 @@ class LocomotionGymEnv(gym.Env):
     Returns:
       observations: sensory observation in the numpy array format
     """
+    if self._flat_observation is not None:
+      for s, out in zip(self._flat_observation_sensors,
+                        self._flat_observation_views):
+        s.write_observation(out)
+      return self._flat_observation
+
     sensors_dict = {}
     for s in self.all_sensors():
       sensors_dict[s.get_name()] = s.get_observation()
@@ -0,0 +1,189 @@
+"""Runs the policy and the robot control loop at their own rates."""
+
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+
+from legged_gym.envs.a1_robot import control_loop
+
+# Counters of TwoRateRuntime.
+ENV_STEPS = 0
+# Env steps which reused the action of the previous step, the policy had not
+# published a new one.
+STALE_ACTIONS = 1
+# Observations the policy skipped, because the env published a newer one before
+# the policy read it.
+DROPPED_OBSERVATIONS = 2
+NUM_COUNTERS = 3
+
+
+class SnapshotBuffer(object):
+  """Latest value of a float array, published by a writer for the readers.
+
+  The value is double buffered: the writer fills the slot which is not
+  published, then publishes it. Each slot has a version, odd while the writer
+  fills it, so readers retry in the rare case the writer published twice and
+  started filling their slot during their copy. The buffers are in shared
+  memory, without a lock, so the writer and the readers can be threads or
+  processes forked after the construction.
+  """
+
+  def __init__(self, size, dtype=np.float64):
+    self._slots = np.frombuffer(
+        multiprocessing.RawArray(np.ctypeslib.as_ctypes_type(dtype), 2 * size),
+        dtype=dtype).reshape(2, size)
+    self._versions = np.frombuffer(
+        multiprocessing.RawArray('q', 2), dtype=np.int64)
+    # Number of values published, the last one is in slot sequence % 2.
+    self._sequence = np.frombuffer(
+        multiprocessing.RawArray('q', 1), dtype=np.int64)
+
+  @property
+  def sequence(self):
+    return int(self._sequence[0])
+
+  def Write(self, value):
+    slot = (self._sequence[0] + 1) % 2
+    self._versions[slot] += 1
+    self._slots[slot] = value
+    self._versions[slot] += 1
+    self._sequence[0] += 1
+
+  def Read(self, out=None):
+    """Returns the sequence number and a copy of the last published value.
+
+    Args:
+      out: The array to copy the value into, a new array by default.
+
+    Returns:
+      The sequence number, 0 if no value was published yet, and the value.
+    """
+    while True:
+      sequence = int(self._sequence[0])
+      slot = sequence % 2
+      version = self._versions[slot]
+      if out is None:
+        value = self._slots[slot].copy()
+      else:
+        out[:] = self._slots[slot]
+        value = out
+      if version % 2 == 0 and self._versions[slot] == version:
+        return sequence, value
+
+
+class TwoRateRuntime(object):
+  """Steps the env with the latest action of a policy running in its own thread.
+
+  The motor loop, in the calling thread, steps the env (action_repeat ticks of
+  the robot) with the latest action the policy published, and publishes the
+  observation. It never waits for the policy: an inference hiccup only makes
+  it reuse the previous action, counted in STALE_ACTIONS. The policy thread
+  waits for each new observation, runs the policy on it and publishes the
+  action. The observations published while it runs are skipped, counted in
+  DROPPED_OBSERVATIONS.
+  """
+
+  def __init__(self, env, policy, num_obs, num_actions, observation_fn=None,
+               observation_buffer=None, env_period=None):
+    """Initializes the runtime.
+
+    Args:
+      env: The LocomotionGymEnv, stepped with the actions of the policy.
+      policy: Function from an observation array to an action array, run in
+        the policy thread.
+      num_obs: The size of the observation arrays.
+      num_actions: The size of the action arrays.
+      observation_fn: Function from an observation of the env to an
+        observation array, run in the motor loop. The observations are arrays
+        by default.
+      observation_buffer: The array the policy thread reads the observations
+        into and hands to the policy, e.g. the numpy view of a pinned torch
+        tensor. A new array for each observation by default.
+      env_period: If not None, paces the env steps with this period, for robots
+        which do not pace their control loop themselves, like the simulated
+        a1.A1. A1Robot paces its ticks.
+    """
+    self._env = env
+    self._policy = policy
+    self._observation_fn = observation_fn or np.asarray
+    self._observation_buffer = observation_buffer
+    self.observations = SnapshotBuffer(
+        num_obs, np.float64 if observation_buffer is None else
+        observation_buffer.dtype)
+    self.actions = SnapshotBuffer(num_actions)
+    self._num_actions = num_actions
+    self.counters = np.frombuffer(
+        multiprocessing.RawArray('q', NUM_COUNTERS), dtype=np.int64)
+    self.policy_inference = control_loop.LatencyHistogram()
+    self._scheduler = None
+    if env_period is not None:
+      self._scheduler = control_loop.ControlLoopScheduler(env_period)
+    self._stopped = threading.Event()
+
+  def _PolicyLoop(self):
+    last_sequence = 0
+    while not self._stopped.is_set():
+      if self.observations.sequence == last_sequence:
+        # Much shorter than the env steps, which are at least a ms
+        time.sleep(0.0001)
+        continue
+      sequence, obs = self.observations.Read(self._observation_buffer)
+      self.counters[DROPPED_OBSERVATIONS] += sequence - last_sequence - 1
+      last_sequence = sequence
+      start = time.perf_counter()
+      action = self._policy(obs)
+      self.policy_inference.Record(time.perf_counter() - start)
+      self.actions.Write(action)
+
+  def Run(self, initial_obs, num_steps, initial_action=None):
+    """Runs the motor loop for num_steps env steps, or until the episode ends.
+
+    Args:
+      initial_obs: The observation of the env after its reset.
+      num_steps: The maximum number of env steps.
+      initial_action: The action until the policy publishes its first one,
+        zeros by default.
+
+    Returns:
+      The number of env steps.
+    """
+    action = np.zeros(self._num_actions)
+    if initial_action is not None:
+      action = np.array(initial_action)
+    last_action_sequence = self.actions.sequence
+    self.observations.Write(self._observation_fn(initial_obs))
+    self._stopped.clear()
+    policy_thread = threading.Thread(target=self._PolicyLoop, daemon=True)
+    policy_thread.start()
+    if self._scheduler is not None:
+      self._scheduler.Restart()
+    try:
+      for _ in range(num_steps):
+        sequence, latest_action = self.actions.Read()
+        if sequence == last_action_sequence:
+          self.counters[STALE_ACTIONS] += 1
+        else:
+          action = latest_action
+          last_action_sequence = sequence
+        obs, _, done, _ = self._env.step(action)
+        self.observations.Write(self._observation_fn(obs))
+        self.counters[ENV_STEPS] += 1
+        if done:
+          break
+        if self._scheduler is not None:
+          self._scheduler.WaitForNextTick()
+    finally:
+      self._stopped.set()
+      policy_thread.join()
+    return int(self.counters[ENV_STEPS])
+
+  def Report(self):
+    """Returns the counters and the policy inference times, as a string."""
+    summary = self.policy_inference.Summary()
+    return ('{} env steps, {} stale actions, {} dropped observations, policy '
+            'inference mean {:.3f}, p99 {:.3f}, max {:.3f} ms'.format(
+                self.counters[ENV_STEPS], self.counters[STALE_ACTIONS],
+                self.counters[DROPPED_OBSERVATIONS], 1e3 * summary['mean'],
+                1e3 * summary['p99'], 1e3 * summary['max']))
@@ -78,6 +78,17 @@ class MotorAngleSensor(sensor.BoxSpaceSensor):
     else:
       return motor_angles
 
+  def write_observation(self, out: np.ndarray) -> None:
+    if self._observe_sine_cosine:
+      super(MotorAngleSensor, self).write_observation(out)
+      return
+    if self._noisy_reading:
+      motor_angles = self._robot.GetMotorAngles()
+    else:
+      motor_angles = self._robot.GetTrueMotorAngles()
+    np.subtract(motor_angles, self.default_pose, out=out)
+    out *= self.scales
+
 class MotorVelocitySensor(sensor.BoxSpaceSensor):
   """A sensor that reads motor angles from the robot."""
 
@@ -113,6 +124,13 @@ class MotorVelocitySensor(sensor.BoxSpaceSensor):
 
     return motor_vels.astype(self._dtype)
 
+  def write_observation(self, out: np.ndarray) -> None:
+    if self._noisy_reading:
+      motor_vels = self._robot.GetMotorVelocities()
+    else:
+      motor_vels = self._robot.GetTrueMotorVelocities()
+    np.multiply(motor_vels, self.scales, out=out)
+
 
 def quat_rotate_inverse(q, v):
     q_w = q[-1]
@@ -145,6 +163,13 @@ class ProjectedGravitySensor(sensor.BoxSpaceSensor):
     orn = np.array(self._robot.GetTrueBaseOrientation())
     return quat_rotate_inverse(orn,  np.array([0, 0, -1]).astype(self._dtype))
 
+  def write_observation(self, out: np.ndarray) -> None:
+    # quat_rotate_inverse of the gravity direction (0, 0, -1), expanded
+    x, y, z, w = self._robot.GetTrueBaseOrientation()
+    out[0] = 2.0 * (w * y - x * z)
+    out[1] = -2.0 * (w * x + y * z)
+    out[2] = 1.0 - 2.0 * (w * w + z * z)
+
 class FakeCommandSensor(sensor.BoxSpaceSensor):
   """A sensor that reads motor angles from the robot."""
 
@@ -167,6 +192,9 @@ class FakeCommandSensor(sensor.BoxSpaceSensor):
   def _get_observation(self) -> _ARRAY:
     return np.array([0, 0, 0])
 
+  def write_observation(self, out: np.ndarray) -> None:
+    out.fill(0)
+
 class MinitaurLegPoseSensor(sensor.BoxSpaceSensor):
   """A sensor that reads leg_pose from the Minitaur robot."""
 
@@ -538,3 +566,7 @@ class LastActionSensor(sensor.BoxSpaceSensor):
   def _get_observation(self) -> _ARRAY:
     """Returns the last action of the environment."""
     return (self._env.last_action - self.default_pose) / self.scale
+
+  def write_observation(self, out: np.ndarray) -> None:
+    np.subtract(self._env.last_action, self.default_pose, out=out)
+    out /= self.scale
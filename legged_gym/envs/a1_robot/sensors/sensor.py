@@ -142,6 +142,10 @@ class BoxSpaceSensor(Sensor):
   def get_dimension(self) -> int:
     return len(self._shape)
 
+  def get_size(self) -> int:
+    """Returns the number of sensor values."""
+    return int(np.prod(self._shape))
+
   def get_dtype(self):
     pass
 
@@ -163,3 +167,15 @@ class BoxSpaceSensor(Sensor):
 
   def get_observation(self) -> np.ndarray:
     return np.asarray(self._get_observation(), dtype=self._dtype)
+
+  def write_observation(self, out: np.ndarray) -> None:
+    """Writes the observation into a preallocated array.
+
+    Sensors override it to compute the observation in place, without
+    allocating arrays.
+
+    Args:
+      out: a flat array of get_size() values, e.g. the slot of the sensor in a
+        flat observation of the environment.
+    """
+    out[:] = np.ravel(self._get_observation())
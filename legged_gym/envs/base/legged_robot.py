@@ -43,6 +43,7 @@ from isaacgym.torch_utils import *
 from torch import Tensor
 
 import legged_gym.utils.kinematics.urdf as pk
+from legged_gym.utils.kinematics.batched_fk import BatchedSerialChainFK
 from legged_gym import LEGGED_GYM_ROOT_DIR, envs
 from legged_gym.envs.base.base_task import BaseTask
 from legged_gym.utils.helpers import class_to_dict, LowPassActionFilter
@@ -53,7 +54,7 @@ from legged_gym.utils.math import (
     get_scale_shift,
 )
 from legged_gym.utils.terrain import Terrain
-from rsl_rl.datasets.motion_loader import AMPLoader
+from rsl_rl.datasets.motion_loader import AMPLoader, get_amp_loader
 
 from .legged_robot_config import LeggedRobotCfg
 from legged_gym.envs.base import observation_buffer
@@ -95,6 +96,15 @@ class LeggedRobot(BaseTask):
                     ee_name,
                 ).to(device=sim_device)
             )
+        # BDX
+        ee_joint_indices = [list(range(0, 5)), list(range(10, 15))]
+        # A1
+        # ee_joint_indices = [
+        #     list(range(i * 3, i * 3 + 3)) for i in range(len(self.chain_ee))
+        # ]
+        self.ee_fk = BatchedSerialChainFK(
+            self.chain_ee, ee_joint_indices, device=sim_device
+        )
 
         self._get_commands_from_joystick = self.cfg.env.get_commands_from_joystick
         if self._get_commands_from_joystick:
@@ -117,7 +127,7 @@ class LeggedRobot(BaseTask):
         self.init_done = True
 
         # if self.cfg.env.reference_state_initialization:
-        self.amp_loader = AMPLoader(
+        self.amp_loader = get_amp_loader(
             motion_files=self.cfg.env.amp_motion_files,
             device=self.device,
             time_between_frames=self.dt,
@@ -220,7 +230,7 @@ class LeggedRobot(BaseTask):
 
         # return clipped obs, clipped states (None), rewards, dones and infos
         clip_obs = self.cfg.normalization.clip_observations
-        self.obs_buf = torch.clip(self.obs_buf, -clip_obs, clip_obs)
+        self.privileged_obs_buf.clamp_(-clip_obs, clip_obs)  # obs_buf is a view
         if self.cfg.env.include_history_steps is not None:
             self.obs_buf_history.reset(reset_env_ids, self.obs_buf[reset_env_ids])
             self.obs_buf_history.insert(self.obs_buf)
@@ -231,10 +241,6 @@ class LeggedRobot(BaseTask):
 
         # policy_obs = self.obs_buf
         policy_obs = self.get_observations()
-        if self.privileged_obs_buf is not None:
-            self.privileged_obs_buf = torch.clip(
-                self.privileged_obs_buf, -clip_obs, clip_obs
-            )
 
         if self.cfg.env.debug_save_obs:
             self.saved_obs.append(policy_obs[0].cpu().numpy())
@@ -430,17 +436,24 @@ class LeggedRobot(BaseTask):
                 ((self.randomized_observation_lag / 1000) / self.dt).long().squeeze()
             )
 
+        self._refresh_dynamics_state()
+
     def compute_reward(self):
         """Compute rewards
         Calls each reward function which had a non-zero scale (processed in self._prepare_reward_function())
         adds each terms to the episode sums and to the total reward
         """
-        self.rew_buf[:] = 0.0
-        for i in range(len(self.reward_functions)):
-            name = self.reward_names[i]
-            rew = self.reward_functions[i]() * self.reward_scales[name]
-            self.rew_buf += rew
-            self.episode_sums[name] += rew
+        if self._fused_reward_terms is not None:
+            rew = self._fused_reward_terms()
+            self.rew_buf[:] = rew.sum(dim=1)
+            self.episode_sums_buf[:, : rew.shape[1]] += rew
+        else:
+            self.rew_buf[:] = 0.0
+            for i in range(len(self.reward_functions)):
+                name = self.reward_names[i]
+                rew = self.reward_functions[i]() * self.reward_scales[name]
+                self.rew_buf += rew
+                self.episode_sums[name] += rew
         if self.cfg.rewards.only_positive_rewards:
             self.rew_buf[:] = torch.clip(self.rew_buf[:], min=0.0)
         # add termination reward after clipping
@@ -449,6 +462,40 @@ class LeggedRobot(BaseTask):
             self.rew_buf += rew
             self.episode_sums["termination"] += rew
 
+    def _scaled_reward_terms(self):
+        """Returns the scaled active reward terms as [num_envs, num_terms], in self.reward_names order.
+        Compiled into a single function when cfg.rewards.fused_reward_kernel is set.
+        """
+        terms = torch.stack(
+            [fn().to(torch.float) for fn in self.reward_functions], dim=1
+        )
+        return terms * self.reward_scales_t
+
+    def reward_timing_report(self, num_iters=100):
+        """Returns the mean time [ms] of each active reward term and of compute_reward.
+        Stateful terms (e.g. feet_air_time) are advanced num_iters times, episode sums are restored.
+        """
+
+        def timeit(fn):
+            fn()  # warmup, and compilation in fused mode
+            if self.device != "cpu":
+                torch.cuda.synchronize(self.device)
+            start = time()
+            for _ in range(num_iters):
+                fn()
+            if self.device != "cpu":
+                torch.cuda.synchronize(self.device)
+            return (time() - start) / num_iters * 1e3
+
+        episode_sums = self.episode_sums_buf.clone()
+        report = {
+            name: timeit(fn)
+            for name, fn in zip(self.reward_names, self.reward_functions)
+        }
+        report["compute_reward"] = timeit(self.compute_reward)
+        self.episode_sums_buf.copy_(episode_sums)
+        return report
+
     def compute_observations(self):
         """Computes observations"""
 
@@ -513,84 +560,61 @@ class LeggedRobot(BaseTask):
             print(self.commands[0])
             pygame.event.pump()  # process event queue
 
-        self.privileged_obs_buf = torch.cat(
-            (
-                self.base_lin_vel * self.obs_scales.lin_vel,
-                self.base_ang_vel * self.obs_scales.ang_vel,
-                self.projected_gravity,
-                self.commands[:, :3] * self.commands_scale,
-                (self.dof_pos - self.default_dof_pos) * self.obs_scales.dof_pos,
-                self.dof_vel * self.obs_scales.dof_vel,
-                self.actions,
-            ),
-            dim=-1,
+        # Write each component in place, at the offsets of self.obs_layout. The two
+        # buffers alternate, so the observations returned by the previous step stay valid.
+        self._obs_buf_idx ^= 1
+        buf = self._privileged_obs_bufs[self._obs_buf_idx]
+        layout = self.obs_layout
+        torch.mul(
+            self.base_lin_vel, self.obs_scales.lin_vel, out=buf[:, layout["lin_vel"]]
+        )
+        torch.mul(
+            self.base_ang_vel, self.obs_scales.ang_vel, out=buf[:, layout["ang_vel"]]
         )
+        buf[:, layout["gravity"]] = self.projected_gravity
+        torch.mul(
+            self.commands[:, :3], self.commands_scale, out=buf[:, layout["commands"]]
+        )
+        torch.sub(
+            self.dof_pos, self.default_dof_pos, out=buf[:, layout["dof_pos"]]
+        ).mul_(self.obs_scales.dof_pos)
+        torch.mul(self.dof_vel, self.obs_scales.dof_vel, out=buf[:, layout["dof_vel"]])
+        buf[:, layout["actions"]] = self.actions
         # add perceptive inputs if not blind
         if self.cfg.terrain.measure_heights:
-            heights = (
-                torch.clip(
-                    self.root_states[:, 2].unsqueeze(1) - 0.5 - self.measured_heights,
-                    -1,
-                    1.0,
-                )
-                * self.obs_scales.height_measurements
-            )
-            self.privileged_obs_buf = torch.cat(
-                (self.privileged_obs_buf, heights), dim=-1
-            )
+            torch.sub(
+                self.root_states[:, 2].unsqueeze(1) - 0.5,
+                self.measured_heights,
+                out=buf[:, layout["heights"]],
+            ).clamp_(-1, 1.0).mul_(self.obs_scales.height_measurements)
 
         # add noise if needed
         if self.add_noise:
-            self.privileged_obs_buf += (
-                2 * torch.rand_like(self.privileged_obs_buf) - 1
-            ) * self.noise_scale_vec
+            noise = torch.rand_like(buf)
+            buf += noise.mul_(2).sub_(1).mul_(self.noise_scale_vec)
 
-        # Remove velocity observations from policy observation.
-        if self.num_obs == self.num_privileged_obs - 6:
-            self.obs_buf = self.privileged_obs_buf[:, 6:]
-        else:
-            self.obs_buf = torch.clone(self.privileged_obs_buf)
+        # Remove velocity observations from policy observation (see _init_obs_buffers).
+        self.privileged_obs_buf = buf
+        self.obs_buf = buf[:, self._obs_offset : self._obs_offset + self.num_obs]
 
     def get_amp_observations(self):
+        # A new tensor per call: callers keep it across env steps
+        layout = self.amp_obs_layout
+        amp_obs = torch.empty(self.num_envs, self.num_amp_obs, device=self.device)
+        amp_obs[:, layout["dof_pos"]] = self.dof_pos
         if not self.cfg.env.no_feet:
-            foot_pos = []
             with torch.no_grad():
-                # BDX
-                foot_pos.append(
-                    self.chain_ee[0]
-                    .forward_kinematics(self.dof_pos[:, 0:5])
-                    .get_matrix()[:, :3, 3]
-                )
-                foot_pos.append(
-                    self.chain_ee[1]
-                    .forward_kinematics(self.dof_pos[:, 10:15])
-                    .get_matrix()[:, :3, 3]
-                )
-                # A1
-                # for i, chain_ee in enumerate(self.chain_ee):
-                #     foot_pos.append(
-                #         chain_ee.forward_kinematics(
-                #             self.dof_pos[:, i * 3 : i * 3 + 3]
-                #         ).get_matrix()[:, :3, 3]
-                #     )
-
-            foot_pos = torch.cat(foot_pos, dim=-1)
+                # All end effectors in one batch, see ee_joint_indices in __init__
+                amp_obs[:, layout["foot_pos"]] = self.ee_fk.forward_kinematics(
+                    self.dof_pos
+                ).flatten(1)
         else:
-            foot_pos = torch.zeros((self.num_envs, 6)).to(self.device)
-
-        z_pos = self.root_states[:, 2:3]
-
-        return torch.cat(
-            (
-                self.dof_pos,
-                foot_pos,
-                self.base_lin_vel,
-                self.base_ang_vel,
-                self.dof_vel,
-                z_pos,
-            ),
-            dim=-1,
-        )
+            amp_obs[:, layout["foot_pos"]] = 0.0
+        amp_obs[:, layout["base_lin_vel"]] = self.base_lin_vel
+        amp_obs[:, layout["base_ang_vel"]] = self.base_ang_vel
+        amp_obs[:, layout["dof_vel"]] = self.dof_vel
+        amp_obs[:, layout["z_pos"]] = self.root_states[:, 2:3]
+        return amp_obs
 
     def create_sim(self):
         """Creates simulation, terrain and evironments"""
@@ -1149,6 +1173,71 @@ class LeggedRobot(BaseTask):
                 self.randomized_d_gains,
             ) = self.compute_randomized_gains(self.num_envs)
 
+        self._init_obs_buffers()
+
+    def _init_obs_buffers(self):
+        """Computes the observation layouts once, and allocates the persistent buffers
+        compute_observations, get_amp_observations and _refresh_dynamics_state write into.
+        """
+
+        def make_layout(components):
+            layout, offset = {}, 0
+            for name, size in components:
+                layout[name] = slice(offset, offset + size)
+                offset += size
+            return layout, offset
+
+        # [NOTE]: _get_noise_scale_vec must be adapted when changing this layout
+        obs_components = [
+            ("lin_vel", 3),
+            ("ang_vel", 3),
+            ("gravity", 3),
+            ("commands", 3),
+            ("dof_pos", self.num_dof),
+            ("dof_vel", self.num_dof),
+            ("actions", self.num_actions),
+        ]
+        if self.cfg.terrain.measure_heights:
+            obs_components.append(("heights", self.num_height_points))
+        self.obs_layout, num_privileged_obs = make_layout(obs_components)
+        self._privileged_obs_bufs = [
+            torch.zeros(self.num_envs, num_privileged_obs, device=self.device)
+            for _ in range(2)
+        ]
+        self._obs_buf_idx = 0
+        self.privileged_obs_buf = self._privileged_obs_bufs[0]
+        # The policy observation is a view without the base linear velocity when
+        # num_observations == num_privileged_obs - 6
+        self._obs_offset = 6 if self.num_obs == num_privileged_obs - 6 else 0
+        self.obs_buf = self.privileged_obs_buf[
+            :, self._obs_offset : self._obs_offset + self.num_obs
+        ]
+
+        self.amp_obs_layout, self.num_amp_obs = make_layout(
+            [
+                ("dof_pos", self.num_dof),
+                ("foot_pos", 6),
+                ("base_lin_vel", 3),
+                ("base_ang_vel", 3),
+                ("dof_vel", self.num_dof),
+                ("z_pos", 1),
+            ]
+        )
+
+        self.dynamics_state_layout = self._get_dynamics_state_layout()
+        self._dynamics_state_bufs = None
+        self.dynamics_state_buf = None
+        num_dynamics_obs = sum(
+            get_value().shape[1] for get_value, _ in self.dynamics_state_layout
+        )
+        if num_dynamics_obs > 0:
+            self._dynamics_state_bufs = [
+                torch.zeros(self.num_envs, num_dynamics_obs, device=self.device)
+                for _ in range(2)
+            ]
+            self._dynamics_state_idx = 0
+            self._refresh_dynamics_state()
+
     def compute_randomized_gains(self, num_envs):
         p_mult = (
             (
@@ -1190,17 +1279,33 @@ class LeggedRobot(BaseTask):
             name = "_reward_" + name
             self.reward_functions.append(getattr(self, name))
 
-        # reward episode sums
+        # reward episode sums, views on one [num_envs, num_terms] buffer (termination last)
+        sum_names = list(self.reward_names)
+        if "termination" in self.reward_scales:
+            sum_names.append("termination")
+        self.episode_sums_buf = torch.zeros(
+            self.num_envs,
+            len(sum_names),
+            dtype=torch.float,
+            device=self.device,
+            requires_grad=False,
+        )
         self.episode_sums = {
-            name: torch.zeros(
-                self.num_envs,
-                dtype=torch.float,
-                device=self.device,
-                requires_grad=False,
-            )
-            for name in self.reward_scales.keys()
+            name: self.episode_sums_buf[:, i] for i, name in enumerate(sum_names)
         }
 
+        # fused mode: all terms evaluated, scaled and accumulated as [num_envs, num_terms]
+        self.reward_scales_t = torch.tensor(
+            [self.reward_scales[name] for name in self.reward_names],
+            dtype=torch.float,
+            device=self.device,
+        )
+        self._fused_reward_terms = None
+        if self.cfg.rewards.fused_reward_kernel and len(self.reward_functions) > 0:
+            self._fused_reward_terms = self._scaled_reward_terms
+            if hasattr(torch, "compile"):
+                self._fused_reward_terms = torch.compile(self._scaled_reward_terms)
+
     def _create_ground_plane(self):
         """Adds a ground plane to the simulation, sets friction and restitution based on the cfg."""
         plane_params = gymapi.PlaneParams()
@@ -1587,114 +1692,70 @@ class LeggedRobot(BaseTask):
 
         return heights.view(self.num_envs, -1) * self.terrain.cfg.vertical_scale
 
-    def _get_privileged_dynamics_state(self):
-        ## Collect a privileged obs buffer of dynamics parameters
-        if self.cfg.env.num_rma_obs == 0:
-            return None
-
-        priv_dynamics_obs = torch.empty(self.num_envs, 0).to(self.device)
-        if self.cfg.domain_rand.randomize_friction:
-            friction_coeffs_scale, friction_coeffs_shift = get_scale_shift(
-                self.cfg.domain_rand.friction_range
-            )
-            priv_dynamics_obs = torch.cat(
-                (
-                    priv_dynamics_obs,
-                    (
-                        (self.friction_coeffs[:, 0] - friction_coeffs_shift)
-                        * friction_coeffs_scale
-                    ).to(self.device),
-                ),
-                dim=1,
+    def _get_dynamics_state_layout(self):
+        """Returns the (getter, range) of each randomized dynamics parameter of the RMA observation, in order.
+        Each parameter is normalized to [-1, 1] over its randomization range.
+        """
+        domain_rand = self.cfg.domain_rand
+        layout = []
+        if domain_rand.randomize_friction:
+            layout.append(
+                (lambda: self.friction_coeffs[:, 0], domain_rand.friction_range)
             )
-
-        if self.cfg.domain_rand.randomize_base_mass:
-            mass_scale, mass_shift = get_scale_shift(
-                self.cfg.domain_rand.added_mass_range
+        if domain_rand.randomize_base_mass:
+            layout.append(
+                (lambda: self.randomize_mass.unsqueeze(1), domain_rand.added_mass_range)
             )
-            priv_dynamics_obs = torch.cat(
+        if domain_rand.randomize_com:
+            layout.append((lambda: self.randomize_com_values, domain_rand.com_range))
+        if domain_rand.randomize_torques:
+            layout.append(
                 (
-                    priv_dynamics_obs,
-                    ((self.randomize_mass.unsqueeze(1) - mass_shift) * mass_scale).to(
-                        self.device
-                    ),
-                ),
-                dim=1,
-            )
-
-        if self.cfg.domain_rand.randomize_com:
-            com_scale, com_shift = get_scale_shift(self.cfg.domain_rand.com_range)
-            priv_dynamics_obs = torch.cat(
-                (
-                    priv_dynamics_obs,
-                    ((self.randomize_com_values - com_shift) * com_scale).to(
-                        self.device
-                    ),
-                ),
-                dim=1,
-            )
-
-        if self.cfg.domain_rand.randomize_torques:
-            torque_factor_scale, torque_factor_shift = get_scale_shift(
-                self.cfg.domain_rand.torque_multiplier_range
+                    lambda: self.randomize_torques_factors,
+                    domain_rand.torque_multiplier_range,
+                )
             )
-            priv_dynamics_obs = torch.cat(
+        if domain_rand.randomize_gains:
+            layout.append(
                 (
-                    priv_dynamics_obs,
-                    (
-                        (self.randomize_torques_factors - torque_factor_shift)
-                        * torque_factor_scale
-                    ).to(self.device),
-                ),
-                dim=1,
-            )
-
-        if self.cfg.domain_rand.randomize_gains:
-            stiffness_factor_scale, stiffness_factor_shift = get_scale_shift(
-                self.cfg.domain_rand.stiffness_multiplier_range
-            )
-            damping_factor_scale, damping_factor_shift = get_scale_shift(
-                self.cfg.domain_rand.damping_multiplier_range
+                    lambda: self.randomized_p_gains,
+                    domain_rand.stiffness_multiplier_range,
+                )
             )
-            priv_dynamics_obs = torch.cat(
-                (
-                    priv_dynamics_obs,
-                    (
-                        (self.randomized_p_gains - stiffness_factor_shift)
-                        * stiffness_factor_scale
-                    ).to(self.device),
-                ),
-                dim=1,
+            layout.append(
+                (lambda: self.randomized_d_gains, domain_rand.damping_multiplier_range)
             )
-            priv_dynamics_obs = torch.cat(
+        if domain_rand.observation_lag:
+            layout.append(
                 (
-                    priv_dynamics_obs,
-                    (
-                        (self.randomized_d_gains - damping_factor_shift)
-                        * damping_factor_scale
-                    ).to(self.device),
-                ),
-                dim=1,
+                    lambda: self.randomized_observation_lag,
+                    domain_rand.observation_lag_range,
+                )
             )
+        return layout
 
-        if self.cfg.domain_rand.observation_lag:
-            lag_scale, lag_shift = get_scale_shift(
-                self.cfg.domain_rand.observation_lag_range
-            )
-            priv_dynamics_obs = torch.cat(
-                (
-                    priv_dynamics_obs,
-                    ((self.randomized_observation_lag - lag_shift) * lag_scale).to(
-                        self.device
-                    ),
-                ),
-                dim=1,
-            )
+    def _refresh_dynamics_state(self):
+        """Recomputes the RMA dynamics observation. Its inputs only change in reset_idx.
+        The two buffers alternate, so the state returned by the previous step stays valid.
+        """
+        if self._dynamics_state_bufs is None:
+            return
+        self._dynamics_state_idx ^= 1
+        buf = self._dynamics_state_bufs[self._dynamics_state_idx]
+        offset = 0
+        for get_value, value_range in self.dynamics_state_layout:
+            value = get_value()
+            scale, shift = get_scale_shift(value_range)
+            value_buf = buf[:, offset : offset + value.shape[1]]
+            value_buf.copy_(value).sub_(shift).mul_(scale)
+            offset += value.shape[1]
+        self.dynamics_state_buf = buf
 
-        if priv_dynamics_obs.shape[-1] == 0:
+    def _get_privileged_dynamics_state(self):
+        ## Privileged obs buffer of dynamics parameters, see _refresh_dynamics_state
+        if self.cfg.env.num_rma_obs == 0:
             return None
-
-        return priv_dynamics_obs
+        return self.dynamics_state_buf
 
     # ------------ reward functions----------------
     def _reward_lin_vel_z(self):
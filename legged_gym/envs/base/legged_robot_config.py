@@ -182,6 +182,8 @@ class LeggedRobotCfg(BaseConfig):
         soft_torque_limit = 1.0
         base_height_target = 1.0
         max_contact_force = 100.0  # forces above this value are penalized
+        # Evaluate, scale and accumulate all active terms in one compiled function
+        fused_reward_kernel = False
 
     class normalization:
         class obs_scales:
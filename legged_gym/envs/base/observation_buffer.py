@@ -2,6 +2,13 @@ import torch
 
 
 class ObservationBuffer:
+    """History of the last include_history_steps observations of each env.
+
+    The observations are stored in a ring buffer, so insert() only writes the new
+    observation instead of shifting the history. All the envs insert at the same
+    time, so they share the head, the slot of the latest observation.
+    """
+
     def __init__(self, num_envs, num_obs, include_history_steps, device):
         self.num_envs = num_envs
         self.num_obs = num_obs
@@ -10,21 +17,49 @@ class ObservationBuffer:
 
         self.num_obs_total = num_obs * include_history_steps
 
-        self.obs_buf = torch.zeros(
-            self.num_envs, self.num_obs_total, device=self.device, dtype=torch.float
+        self.slots = torch.zeros(
+            self.num_envs,
+            self.include_history_steps,
+            self.num_obs,
+            device=self.device,
+            dtype=torch.float,
         )
+        self.head = self.include_history_steps - 1
+        self.env_ids = torch.arange(self.num_envs, device=self.device)
+
+        # obs_buf is only materialized when it is read, at most once per insert/reset
+        self._ordered_slots = torch.zeros_like(self.slots)
+        self._obs_buf = self._ordered_slots.view(self.num_envs, self.num_obs_total)
+        self._obs_buf_stale = False
+
+    @property
+    def obs_buf(self):
+        """All the history, from the oldest to the latest observation, [num_envs, num_obs_total].
+
+        As with the previous shift buffer, it is always the same tensor, updated in place:
+        by the first read after an insert/reset.
+        """
+        if self._obs_buf_stale:
+            # Two contiguous copies, from the oldest slot to the end and from the start to the head
+            oldest = (self.head + 1) % self.include_history_steps
+            num_wrapped = self.include_history_steps - oldest
+            self._ordered_slots[:, :num_wrapped] = self.slots[:, oldest:]
+            self._ordered_slots[:, num_wrapped:] = self.slots[:, :oldest]
+            self._obs_buf_stale = False
+        return self._obs_buf
+
+    def _slot_ids(self, positions):
+        """Slots of the observations at positions of obs_buf, where 0 is the oldest."""
+        return (self.head + 1 + positions) % self.include_history_steps
 
     def reset(self, reset_idxs, new_obs):
-        self.obs_buf[reset_idxs] = new_obs.repeat(1, self.include_history_steps)
+        self.slots[reset_idxs] = new_obs.unsqueeze(1)
+        self._obs_buf_stale = True
 
     def insert(self, new_obs):
-        # Shift observations back.
-        self.obs_buf[
-            :, : self.num_obs * (self.include_history_steps - 1)
-        ] = self.obs_buf[:, self.num_obs : self.num_obs * self.include_history_steps]
-
-        # Add new observation.
-        self.obs_buf[:, -self.num_obs :] = new_obs
+        self.head = (self.head + 1) % self.include_history_steps
+        self.slots[:, self.head] = new_obs
+        self._obs_buf_stale = True
 
     def get_obs_vec(self, obs_ids):
         """Gets history of observations indexed by obs_ids.
@@ -35,22 +70,13 @@ class ObservationBuffer:
                 include_history_steps - 1 is the oldest observation.
         """
 
-        obs = []
-        for obs_id in reversed(sorted(obs_ids)):
-            slice_idx = self.include_history_steps - obs_id - 1
-            obs.append(
-                self.obs_buf[
-                    :, slice_idx * self.num_obs : (slice_idx + 1) * self.num_obs
-                ]
-            )
-
-        return torch.cat(obs, dim=-1)
+        positions = [
+            self.include_history_steps - obs_id - 1
+            for obs_id in reversed(sorted(obs_ids))
+        ]
+        positions = torch.tensor(positions, device=self.device)
+        return self.slots[:, self._slot_ids(positions)].flatten(1)
 
     def get_lagged_obs(self, indices):
-        indices_expanded = indices.unsqueeze(1).expand(-1, self.num_obs)
-        gather_indices = (
-            indices_expanded * self.num_obs
-            + torch.arange(self.num_obs, device=self.device)
-        ).view(self.num_envs, self.num_obs)
-        lagged_obs = torch.gather(self.obs_buf, 1, gather_indices)
-        return lagged_obs
+        """Gets the observation of each env at its position in obs_buf, where 0 is the oldest."""
+        return self.slots[self.env_ids, self._slot_ids(indices)]
@@ -272,10 +272,30 @@ class BDXAMPCfgPPO(LeggedRobotCfgPPO):
     class algorithm(LeggedRobotCfgPPO.algorithm):
         entropy_coef = 0.01
         amp_replay_buffer_size = 1000000
+        # "device", or "pinned" to keep the AMP replay buffer in pinned host memory
+        amp_replay_buffer_storage = "device"
+        # None (float32) or "float16" to halve the memory of the AMP replay buffer
+        amp_replay_buffer_dtype = None
+        # Draw the AMP replay buffer indices of all the mini batches at once
+        amp_replay_buffer_predraw = False
+        # "uniform" or "prioritized". Prioritized sampling favours recent transitions
+        # (weights decayed by recency_decay per step) and, with priority_alpha > 0, the
+        # ones the discriminator scores most like expert ones. With recency weighting a
+        # smaller amp_replay_buffer_size keeps the same effective history
+        amp_replay_buffer_sampling = "uniform"
+        amp_replay_buffer_recency_decay = 1.0
+        amp_replay_buffer_priority_alpha = 0.0
         num_learning_epochs = 5
         num_mini_batches = 4
         disc_coef = 5  # 5
         # bounds_loss_coef = 10  # commented
+        # Truncation of the importance ratio between the current policy and the
+        # (one update old) policy that collected the rollout, when pipelined
+        policy_lag_ratio_clip = 1.0
+        # None, "float16" or "bfloat16": run update() forward passes under autocast
+        mixed_precision = None
+        # Fused Adam with the adaptive learning rate kept on the device
+        fused_optimizer = False
 
     class runner(LeggedRobotCfgPPO.runner):
         run_name = ""
@@ -288,7 +308,16 @@ class BDXAMPCfgPPO(LeggedRobotCfgPPO):
 
         amp_reward_coef = 2.0  # 2.0
         amp_motion_files = MOTION_FILES
+        # Sample expert transitions on the fly instead of preloading them
+        amp_preload_transitions = False
         amp_num_preload_transitions = 2000000
+        amp_compile_sampler = False
+        # Ring pool of expert transitions, refreshed by this fraction every iteration
+        # (None samples every minibatch directly)
+        amp_transition_pool_size = None
+        amp_transition_pool_refresh = 0.05
+        # Collect rollout k + 1 with a snapshot of the policy while update k runs
+        pipelined = False
         amp_task_reward_lerp = 0.3  # 0.3
         amp_discr_hidden_dims = [1024, 512]
 
@@ -0,0 +1,34 @@
+"""CPU stand-in for Isaac Gym, to run the LeggedRobot pipeline without a GPU.
+
+    from legged_gym import null_physics
+    null_physics.install()  # before anything imports isaacgym
+    from legged_gym.envs import *
+
+install() registers this package as `isaacgym` (gymapi, gymtorch, gymutil,
+torch_utils and terrain_utils), so the envs run unchanged on top of NullGym,
+see null_physics/gym.py for what it simulates. It is also done when importing
+legged_gym with LEGGED_GYM_NULL_PHYSICS=1. Only plane terrains are supported
+and the viewer is not available (run headless).
+"""
+
+import importlib
+import sys
+
+MODULES = ["gymapi", "gymtorch", "gymutil", "torch_utils", "terrain_utils"]
+
+
+def is_installed():
+    return sys.modules.get("isaacgym") is sys.modules[__name__]
+
+
+def install():
+    """Registers the null physics modules as isaacgym. Fails if isaacgym is already imported."""
+    if is_installed():
+        return
+    if "isaacgym" in sys.modules:
+        raise RuntimeError(
+            "isaacgym is already imported, install the null physics backend first."
+        )
+    sys.modules["isaacgym"] = sys.modules[__name__]
+    for name in MODULES:
+        sys.modules["isaacgym." + name] = importlib.import_module(__name__ + "." + name)
@@ -0,0 +1,383 @@
+"""Torch stand-in for the Isaac Gym simulator.
+
+NullGym implements the subset of the gym API used by LeggedRobot: asset
+loading from URDF, env/actor creation, the tensor API (acquire/refresh/set)
+and simulate(). It does not do rigid body dynamics. Joints follow
+    (inertia + armature) * qdd = tau - damping * qd - friction * sign(qd)
+integrated with semi-implicit Euler and clamped to the position and velocity
+limits, where inertia is the child link inertia about the joint axis. The base
+is kinematic: it keeps the velocity it was last set to (decayed by the asset
+linear/angular damping), gravity is ignored and all contact forces are zero.
+
+This is enough to run the env step, rewards, resets and AMP observations
+without a GPU, for throughput benchmarks and smoke tests. It is not a
+simulator, trained policies are meaningless.
+"""
+
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import torch
+
+from legged_gym.null_physics import gymapi
+
+# Lower bound of the joint inertia, keeps the explicit PD integration stable
+# for joints whose child link is (almost) massless
+MIN_DOF_INERTIA = 1e-3
+
+
+class _Asset:
+    def __init__(
+        self, options, body_names, body_props, dof_names, dof_props, dof_inertia
+    ):
+        self.options = options
+        self.body_names = body_names
+        self.body_props = body_props
+        self.dof_names = dof_names
+        self.dof_props = dof_props
+        self.dof_inertia = dof_inertia
+        self.shape_props = [gymapi.RigidShapeProperties() for _ in body_names]
+
+
+class _Sim:
+    def __init__(self, device, params):
+        self.device = device
+        self.params = params
+        self.num_envs = 0
+        self.asset = None
+        self.start_poses = []
+        self.dof_props = []
+
+
+def _floats(text, default):
+    return [float(v) for v in text.split()] if text is not None else default
+
+
+def _parse_urdf(path, options):
+    root = ET.parse(path).getroot()
+    links = {}
+    for link in root.findall("link"):
+        mass, com, inertia = 0.0, np.zeros(3), np.zeros((3, 3))
+        inertial = link.find("inertial")
+        if inertial is not None:
+            if inertial.find("mass") is not None:
+                mass = float(inertial.find("mass").get("value"))
+            if inertial.find("origin") is not None:
+                com = np.array(_floats(inertial.find("origin").get("xyz"), [0, 0, 0]))
+            if inertial.find("inertia") is not None:
+                i = {k: float(v) for k, v in inertial.find("inertia").attrib.items()}
+                inertia = np.array(
+                    [
+                        [i["ixx"], i["ixy"], i["ixz"]],
+                        [i["ixy"], i["iyy"], i["iyz"]],
+                        [i["ixz"], i["iyz"], i["izz"]],
+                    ]
+                )
+        links[link.get("name")] = (mass, com, inertia)
+
+    children = {name: [] for name in links}
+    child_links = set()
+    for joint in root.findall("joint"):
+        children[joint.find("parent").get("link")].append(joint)
+        child_links.add(joint.find("child").get("link"))
+    base = [name for name in links if name not in child_links][0]
+
+    body_names, body_props = [], []
+    dof_names, dof_rows, dof_inertia = [], [], []
+
+    def visit(link, body):
+        mass, com, inertia = links[link]
+        if body is None:
+            body = len(body_names)
+            body_names.append(link)
+            body_props.append(
+                gymapi.RigidBodyProperties(mass, gymapi.Vec3(*com), inertia)
+            )
+        else:
+            body_props[body].mass += mass
+        # Depth first, children in joint name order, like the Isaac Gym importer
+        for joint in sorted(children[link], key=lambda j: j.get("name")):
+            joint_type = joint.get("type")
+            child = joint.find("child").get("link")
+            if joint_type == "fixed":
+                visit(child, body if options.collapse_fixed_joints else None)
+                continue
+            if joint_type not in ("revolute", "continuous", "prismatic"):
+                raise NotImplementedError(f"Unsupported joint type: {joint_type}")
+            axis = joint.find("axis")
+            axis = np.array(
+                _floats(None if axis is None else axis.get("xyz"), [1, 0, 0])
+            )
+            axis = axis / np.linalg.norm(axis)
+            limit = joint.find("limit")
+            limit = {} if limit is None else limit.attrib
+            dynamics = joint.find("dynamics")
+            dynamics = {} if dynamics is None else dynamics.attrib
+            dof_names.append(joint.get("name"))
+            dof_rows.append(
+                (
+                    joint_type != "continuous",
+                    float(limit.get("lower", 0.0)),
+                    float(limit.get("upper", 0.0)),
+                    options.default_dof_drive_mode,
+                    float(limit.get("velocity", 0.0)) or np.inf,
+                    float(limit.get("effort", 0.0)),
+                    0.0,
+                    float(dynamics.get("damping", 0.0)),
+                    float(dynamics.get("friction", 0.0)),
+                    options.armature,
+                )
+            )
+            child_mass, child_com, child_inertia = links[child]
+            if joint_type == "prismatic":
+                dof_inertia.append(child_mass)
+            else:
+                # Child link inertia about the joint axis (parallel axis theorem)
+                radial = child_com - np.dot(child_com, axis) * axis
+                dof_inertia.append(
+                    axis @ child_inertia @ axis + child_mass * np.dot(radial, radial)
+                )
+            visit(child, None)
+
+    visit(base, None)
+    dof_props = np.array(dof_rows, dtype=gymapi.DOF_PROPERTIES_DTYPE)
+    return _Asset(
+        options, body_names, body_props, dof_names, dof_props, np.array(dof_inertia)
+    )
+
+
+class NullGym:
+    """Headless, single asset, one actor per env. See the module docstring."""
+
+    # ------------- Sim -------------
+    def create_sim(self, compute_device, graphics_device, physics_engine, sim_params):
+        if sim_params.use_gpu_pipeline:
+            device = f"cuda:{compute_device}"
+        else:
+            device = "cpu"
+        return _Sim(device, sim_params)
+
+    def get_sim_params(self, sim):
+        return sim.params
+
+    def add_ground(self, sim, plane_params):
+        pass
+
+    def add_heightfield(self, sim, heightsamples, hf_params):
+        pass
+
+    def add_triangle_mesh(self, sim, vertices, triangles, tm_params):
+        pass
+
+    def create_viewer(self, sim, camera_properties):
+        raise RuntimeError("The null physics backend is headless, run with --headless.")
+
+    def destroy_sim(self, sim):
+        pass
+
+    # ------------- Assets -------------
+    def load_asset(self, sim, root, filename, options=None):
+        if not filename.endswith(".urdf"):
+            raise NotImplementedError(
+                "The null physics backend only loads URDF assets."
+            )
+        return _parse_urdf(
+            os.path.join(root, filename),
+            gymapi.AssetOptions() if options is None else options,
+        )
+
+    def get_asset_dof_count(self, asset):
+        return len(asset.dof_names)
+
+    def get_asset_rigid_body_count(self, asset):
+        return len(asset.body_names)
+
+    def get_asset_dof_names(self, asset):
+        return list(asset.dof_names)
+
+    def get_asset_rigid_body_names(self, asset):
+        return list(asset.body_names)
+
+    def get_asset_dof_properties(self, asset):
+        return asset.dof_props.copy()
+
+    def get_asset_rigid_shape_properties(self, asset):
+        return asset.shape_props
+
+    def set_asset_rigid_shape_properties(self, asset, props):
+        asset.shape_props = props
+        return True
+
+    # ------------- Envs and actors -------------
+    def create_env(self, sim, lower, upper, num_per_row):
+        sim.num_envs += 1
+        return (sim, sim.num_envs - 1)
+
+    def create_actor(
+        self, env, asset, pose, name, group=-1, filter=-1, segmentation_id=0
+    ):
+        sim, env_id = env
+        if sim.asset is None:
+            sim.asset = asset
+        elif sim.asset is not asset:
+            raise NotImplementedError(
+                "The null physics backend supports a single asset."
+            )
+        if len(sim.start_poses) != env_id:
+            raise NotImplementedError(
+                "The null physics backend supports one actor per env."
+            )
+        sim.start_poses.append(
+            [pose.p.x, pose.p.y, pose.p.z, pose.r.x, pose.r.y, pose.r.z, pose.r.w]
+        )
+        sim.dof_props.append(asset.dof_props.copy())
+        return 0
+
+    def set_actor_dof_properties(self, env, actor, props):
+        sim, env_id = env
+        sim.dof_props[env_id] = props.copy()
+        return True
+
+    def get_actor_dof_properties(self, env, actor):
+        sim, env_id = env
+        return sim.dof_props[env_id].copy()
+
+    def get_actor_rigid_body_properties(self, env, actor):
+        sim, _ = env
+        return [
+            gymapi.RigidBodyProperties(
+                p.mass, gymapi.Vec3(p.com.x, p.com.y, p.com.z), p.inertia
+            )
+            for p in sim.asset.body_props
+        ]
+
+    def set_actor_rigid_body_properties(
+        self, env, actor, props, recomputeInertia=False
+    ):
+        return True
+
+    def find_actor_rigid_body_handle(self, env, actor, name):
+        sim, _ = env
+        if name in sim.asset.body_names:
+            return sim.asset.body_names.index(name)
+        return -1
+
+    # ------------- Tensor API -------------
+    def prepare_sim(self, sim):
+        num_envs, device = sim.num_envs, sim.device
+        num_dof = len(sim.asset.dof_names)
+        num_bodies = len(sim.asset.body_names)
+
+        sim.root_states = torch.zeros(num_envs, 13, device=device)
+        sim.root_states[:, :7] = torch.tensor(sim.start_poses, device=device)
+        sim.dof_state = torch.zeros(num_envs * num_dof, 2, device=device)
+        sim.dof_actuation_force = torch.zeros(num_envs * num_dof, device=device)
+        sim.net_contact_forces = torch.zeros(num_envs * num_bodies, 3, device=device)
+        sim.rigid_body_states = torch.zeros(num_envs * num_bodies, 13, device=device)
+
+        props = np.stack(sim.dof_props)
+
+        def field(name, dtype=torch.float):
+            return torch.tensor(
+                np.ascontiguousarray(props[name]), dtype=dtype, device=device
+            )
+
+        sim.dof_has_limits = field("hasLimits", torch.bool)
+        sim.dof_lower = field("lower")
+        sim.dof_upper = field("upper")
+        sim.dof_velocity = field("velocity")
+        sim.dof_damping = field("damping")
+        sim.dof_friction = field("friction")
+        sim.dof_inertia = (
+            torch.tensor(sim.asset.dof_inertia, dtype=torch.float, device=device)
+            + field("armature")
+        ).clamp(min=MIN_DOF_INERTIA)
+        sim.prepared = True
+        return True
+
+    def acquire_actor_root_state_tensor(self, sim):
+        return sim.root_states
+
+    def acquire_dof_state_tensor(self, sim):
+        return sim.dof_state
+
+    def acquire_net_contact_force_tensor(self, sim):
+        return sim.net_contact_forces
+
+    def acquire_rigid_body_state_tensor(self, sim):
+        return sim.rigid_body_states
+
+    def refresh_actor_root_state_tensor(self, sim):
+        return True
+
+    def refresh_dof_state_tensor(self, sim):
+        return True
+
+    def refresh_net_contact_force_tensor(self, sim):
+        return True
+
+    def refresh_rigid_body_state_tensor(self, sim):
+        return True
+
+    def set_dof_actuation_force_tensor(self, sim, forces):
+        sim.dof_actuation_force.copy_(forces.view(-1))
+        return True
+
+    def set_actor_root_state_tensor(self, sim, root_states):
+        sim.root_states.copy_(root_states)
+        return True
+
+    def set_actor_root_state_tensor_indexed(self, sim, root_states, actor_ids, count):
+        ids = actor_ids[:count].long()
+        sim.root_states[ids] = root_states[ids]
+        return True
+
+    def set_dof_state_tensor_indexed(self, sim, dof_states, actor_ids, count):
+        ids = actor_ids[:count].long()
+        state = sim.dof_state.view(sim.num_envs, -1, 2)
+        state[ids] = dof_states.view(sim.num_envs, -1, 2)[ids]
+        return True
+
+    # ------------- Stepping -------------
+    def simulate(self, sim):
+        dt = sim.params.dt / max(1, sim.params.substeps)
+        dof_state = sim.dof_state.view(sim.num_envs, -1, 2)
+        dof_pos, dof_vel = dof_state[..., 0], dof_state[..., 1]
+        tau = sim.dof_actuation_force.view(sim.num_envs, -1)
+        for _ in range(max(1, sim.params.substeps)):
+            dof_acc = (
+                tau - sim.dof_damping * dof_vel - sim.dof_friction * torch.sign(dof_vel)
+            ) / sim.dof_inertia
+            dof_vel += dof_acc * dt
+            torch.clamp(dof_vel, -sim.dof_velocity, sim.dof_velocity, out=dof_vel)
+            dof_pos += dof_vel * dt
+            clamped = torch.where(
+                sim.dof_has_limits,
+                torch.clamp(dof_pos, sim.dof_lower, sim.dof_upper),
+                dof_pos,
+            )
+            dof_vel.masked_fill_(clamped != dof_pos, 0.0)
+            dof_pos.copy_(clamped)
+            if not sim.asset.options.fix_base_link:
+                self._integrate_root(sim, dt)
+        return True
+
+    def _integrate_root(self, sim, dt):
+        root = sim.root_states
+        root[:, 0:3] += root[:, 7:10] * dt
+        # q_dot = 0.5 * [w, 0] * q, with the angular velocity in the world frame
+        quat, ang_vel = root[:, 3:7], root[:, 10:13]
+        xyz, w = quat[:, :3], quat[:, 3:4]
+        d_xyz = 0.5 * (w * ang_vel + torch.cross(ang_vel, xyz, dim=-1))
+        d_w = -0.5 * (ang_vel * xyz).sum(dim=-1, keepdim=True)
+        quat += torch.cat((d_xyz, d_w), dim=-1) * dt
+        quat /= quat.norm(dim=-1, keepdim=True)
+        root[:, 7:10] /= 1.0 + sim.asset.options.linear_damping * dt
+        root[:, 10:13] /= 1.0 + sim.asset.options.angular_damping * dt
+
+    def fetch_results(self, sim, wait=True):
+        pass
+
+    def step_graphics(self, sim):
+        pass
@@ -0,0 +1,182 @@
+"""Subset of isaacgym.gymapi used by LeggedRobot, backed by NullGym."""
+
+import numpy as np
+
+# Physics engines
+SIM_FLEX = 0
+SIM_PHYSX = 1
+
+# Up axis
+UP_AXIS_Y = 0
+UP_AXIS_Z = 1
+
+# DOF drive modes (GymDofDriveModeFlags)
+DOF_MODE_NONE = 0
+DOF_MODE_POS = 1
+DOF_MODE_VEL = 2
+DOF_MODE_EFFORT = 3
+
+# DOF types
+DOF_INVALID = -1
+DOF_ROTATION = 0
+DOF_TRANSLATION = 1
+
+# Keyboard events, only used to subscribe viewer shortcuts
+KEY_ESCAPE = 0
+KEY_V = 1
+
+# Same fields as the structured array returned by isaacgym
+DOF_PROPERTIES_DTYPE = np.dtype(
+    [
+        ("hasLimits", "?"),
+        ("lower", "f4"),
+        ("upper", "f4"),
+        ("driveMode", "i4"),
+        ("velocity", "f4"),
+        ("effort", "f4"),
+        ("stiffness", "f4"),
+        ("damping", "f4"),
+        ("friction", "f4"),
+        ("armature", "f4"),
+    ]
+)
+
+
+class Vec3:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
+    def __add__(self, other):
+        return Vec3(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vec3(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, scalar):
+        return Vec3(self.x * scalar, self.y * scalar, self.z * scalar)
+
+    def __repr__(self):
+        return f"Vec3({self.x}, {self.y}, {self.z})"
+
+
+class Quat:
+    def __init__(self, x=0.0, y=0.0, z=0.0, w=1.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+        self.w = float(w)
+
+
+class Transform:
+    def __init__(self, p=None, r=None):
+        self.p = Vec3() if p is None else p
+        self.r = Quat() if r is None else r
+
+
+class PhysXParams:
+    def __init__(self):
+        self.num_threads = 0
+        self.solver_type = 1
+        self.num_position_iterations = 4
+        self.num_velocity_iterations = 1
+        self.contact_offset = 0.02
+        self.rest_offset = 0.0
+        self.bounce_threshold_velocity = 0.2
+        self.max_depenetration_velocity = 100.0
+        self.max_gpu_contact_pairs = 1024 * 1024
+        self.default_buffer_size_multiplier = 2.0
+        self.contact_collection = 2
+        self.num_subscenes = 0
+        self.use_gpu = False
+
+
+class SimParams:
+    def __init__(self):
+        self.dt = 1.0 / 60.0
+        self.substeps = 2
+        self.gravity = Vec3(0.0, 0.0, -9.81)
+        self.up_axis = UP_AXIS_Z
+        self.use_gpu_pipeline = False
+        self.physx = PhysXParams()
+
+
+class PlaneParams:
+    def __init__(self):
+        self.normal = Vec3(0.0, 0.0, 1.0)
+        self.distance = 0.0
+        self.static_friction = 1.0
+        self.dynamic_friction = 1.0
+        self.restitution = 0.0
+
+
+class HeightFieldProperties:
+    def __init__(self):
+        self.column_scale = 1.0
+        self.row_scale = 1.0
+        self.vertical_scale = 1.0
+        self.nbRows = 0
+        self.nbColumns = 0
+        self.transform = Transform()
+        self.static_friction = 1.0
+        self.dynamic_friction = 1.0
+        self.restitution = 0.0
+
+
+class TriangleMeshParams:
+    def __init__(self):
+        self.nb_vertices = 0
+        self.nb_triangles = 0
+        self.transform = Transform()
+        self.static_friction = 1.0
+        self.dynamic_friction = 1.0
+        self.restitution = 0.0
+
+
+class AssetOptions:
+    def __init__(self):
+        self.default_dof_drive_mode = DOF_MODE_NONE
+        self.collapse_fixed_joints = False
+        self.replace_cylinder_with_capsule = False
+        self.flip_visual_attachments = False
+        self.fix_base_link = False
+        self.density = 1000.0
+        self.angular_damping = 0.5
+        self.linear_damping = 0.0
+        self.max_angular_velocity = 64.0
+        self.max_linear_velocity = 1000.0
+        self.armature = 0.0
+        self.thickness = 0.02
+        self.disable_gravity = False
+
+
+class CameraProperties:
+    def __init__(self):
+        self.width = 1600
+        self.height = 900
+
+
+class RigidShapeProperties:
+    def __init__(self):
+        self.friction = 1.0
+        self.rolling_friction = 0.0
+        self.torsion_friction = 0.0
+        self.restitution = 0.0
+        self.compliance = 0.0
+        self.thickness = 0.0
+        self.filter = 0
+
+
+class RigidBodyProperties:
+    def __init__(self, mass=1.0, com=None, inertia=None):
+        self.mass = mass
+        self.com = Vec3() if com is None else com
+        self.inertia = np.eye(3, dtype=np.float32) if inertia is None else inertia
+        self.flags = 0
+
+
+def acquire_gym():
+    from legged_gym.null_physics.gym import NullGym
+
+    return NullGym()
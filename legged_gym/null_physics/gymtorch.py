@@ -0,0 +1,9 @@
+"""isaacgym.gymtorch for NullGym, whose state tensors already are torch tensors."""
+
+
+def wrap_tensor(gym_tensor, offsets=None, counts=None):
+    return gym_tensor
+
+
+def unwrap_tensor(torch_tensor):
+    return torch_tensor
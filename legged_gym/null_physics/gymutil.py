@@ -0,0 +1,119 @@
+"""Subset of isaacgym.gymutil used by legged_gym, for NullGym."""
+
+import argparse
+
+from legged_gym.null_physics import gymapi
+
+
+def parse_device_str(device_str):
+    # Defaults to cpu, like Isaac Gym
+    device = "cpu"
+    device_id = 0
+    if device_str == "cpu" or device_str == "cuda":
+        device = device_str
+    else:
+        device_args = device_str.split(":")
+        assert (
+            len(device_args) == 2 and device_args[0] == "cuda"
+        ), f'Invalid device string "{device_str}"'
+        device, device_id = device_args[0], int(device_args[1])
+    return device, device_id
+
+
+def parse_arguments(
+    description="Isaac Gym Example",
+    headless=False,
+    no_graphics=False,
+    custom_parameters=[],
+):
+    """Same arguments and post-processing as isaacgym.gymutil.parse_arguments."""
+    parser = argparse.ArgumentParser(description=description)
+    if headless:
+        parser.add_argument("--headless", action="store_true", help="Run headless")
+    if no_graphics:
+        parser.add_argument(
+            "--nographics", action="store_true", help="Disable graphics"
+        )
+    parser.add_argument(
+        "--sim_device", type=str, default="cuda:0", help="Physics Device"
+    )
+    parser.add_argument(
+        "--pipeline", type=str, default="gpu", help="Tensor API pipeline (cpu/gpu)"
+    )
+    parser.add_argument(
+        "--graphics_device_id", type=int, default=0, help="Graphics Device ID"
+    )
+    physics_group = parser.add_mutually_exclusive_group()
+    physics_group.add_argument(
+        "--flex", action="store_true", help="Use FleX for physics"
+    )
+    physics_group.add_argument(
+        "--physx", action="store_true", help="Use PhysX for physics"
+    )
+    parser.add_argument(
+        "--num_threads", type=int, default=0, help="Number of cores used by PhysX"
+    )
+    parser.add_argument(
+        "--subscenes", type=int, default=0, help="Number of PhysX subscenes"
+    )
+    parser.add_argument("--slices", type=int, help="Number of client threads")
+
+    for argument in custom_parameters:
+        if "name" in argument and ("type" in argument or "action" in argument):
+            help_str = argument.get("help", "")
+            if "type" in argument:
+                if "default" in argument:
+                    parser.add_argument(
+                        argument["name"],
+                        type=argument["type"],
+                        default=argument["default"],
+                        help=help_str,
+                    )
+                else:
+                    parser.add_argument(
+                        argument["name"], type=argument["type"], help=help_str
+                    )
+            else:
+                parser.add_argument(
+                    argument["name"], action=argument["action"], help=help_str
+                )
+        else:
+            print(
+                "ERROR: command line argument name, type/action must be defined, argument not added to parser"
+            )
+            print(f"supported keys: name, type, default, action, help, got {argument}")
+
+    args = parser.parse_args()
+
+    args.sim_device_type, args.compute_device_id = parse_device_str(args.sim_device)
+    pipeline = args.pipeline.lower()
+    assert pipeline in ("cpu", "gpu", "cuda"), f"Invalid pipeline '{args.pipeline}'"
+    args.use_gpu_pipeline = pipeline in ("gpu", "cuda")
+    if args.sim_device_type != "cuda" and args.use_gpu_pipeline:
+        print(
+            "GPU pipeline can only be used with GPU simulation. Forcing CPU pipeline."
+        )
+        args.pipeline = "CPU"
+        args.use_gpu_pipeline = False
+
+    args.physics_engine = gymapi.SIM_FLEX if args.flex else gymapi.SIM_PHYSX
+    args.use_gpu = args.sim_device_type == "cuda"
+    if no_graphics and args.nographics:
+        args.headless = True
+    if args.slices is None:
+        args.slices = args.subscenes
+    return args
+
+
+def parse_sim_config(cfg, sim_params):
+    """Copies the cfg["sim"] dict (see LeggedRobotCfg.sim) into the SimParams."""
+    for key, value in cfg.items():
+        if key == "physx":
+            for physx_key, physx_value in value.items():
+                setattr(sim_params.physx, physx_key, physx_value)
+        elif key == "gravity":
+            sim_params.gravity = gymapi.Vec3(*value)
+        elif key == "up_axis":
+            sim_params.up_axis = gymapi.UP_AXIS_Z if value == 1 else gymapi.UP_AXIS_Y
+        else:
+            setattr(sim_params, key, value)
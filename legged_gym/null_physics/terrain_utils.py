@@ -0,0 +1,11 @@
+"""Placeholder for isaacgym.terrain_utils: the null physics backend only supports
+plane terrains (cfg.terrain.mesh_type = "plane" or None)."""
+
+
+def __getattr__(name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+    raise NotImplementedError(
+        f"terrain_utils.{name} is not available with the null physics backend, "
+        'set cfg.terrain.mesh_type = "plane".'
+    )
@@ -0,0 +1,153 @@
+"""Per-tick cost of A1Robot.ReceiveObservation and ApplyAction, against a stub interface.
+
+Compares the former per-motor Python loops, copied here, with the vectorized
+unpacking of the motor states and the preallocated commands, on an A1Robot
+talking to a FakeRobotInterface without latency. Checks that both give the
+same states and commands. Does not require Isaac Gym nor a robot.
+
+    python legged_gym/scripts/benchmark_a1_robot_io.py
+"""
+
+import argparse
+import time
+
+from legged_gym import null_physics
+
+# legged_gym.envs imports Isaac Gym, which the A1Robot does not use
+null_physics.install()
+
+import numpy as np
+import pybullet
+from pybullet_utils import bullet_client
+
+from legged_gym.envs.a1_robot import a1, a1_robot, robot_config
+from legged_gym.envs.a1_robot.fake_robot_interface import FakeRobotInterface
+
+
+def legacy_unpack_state(robot, state):
+    """The former A1Robot._UnpackState, inlined in ReceiveObservation."""
+    q = state.imu.quaternion
+    robot._base_orientation = np.array([q[1], q[2], q[3], q[0]])
+    robot._accelerometer_reading = np.array(state.imu.accelerometer)
+    robot._motor_angles = np.array([motor.q for motor in state.motorState[:12]])
+    robot._motor_velocities = np.array([motor.dq for motor in state.motorState[:12]])
+    robot._joint_states = np.array(
+        list(zip(robot._motor_angles, robot._motor_velocities))
+    )
+    robot._observed_motor_torques = np.array(
+        [motor.tauEst for motor in state.motorState[:12]]
+    )
+    robot._motor_temperatures = np.array(
+        [motor.temperature for motor in state.motorState[:12]]
+    )
+
+
+def legacy_receive_observation(robot):
+    state = robot._robot_interface.receive_observation()
+    robot._raw_state = state
+    legacy_unpack_state(robot, state)
+    robot._velocity_estimator.update(state.tick / 1000.0)
+    robot._UpdatePosition()
+
+
+def legacy_apply_action(robot, motor_commands, motor_control_mode):
+    """The former ApplyAction."""
+    motor_commands = robot._ClipMotorCommands(motor_commands, motor_control_mode)
+    command = np.zeros(60, dtype=np.float32)
+    if motor_control_mode == robot_config.MotorControlMode.POSITION:
+        for motor_id in range(a1.NUM_MOTORS):
+            command[motor_id * 5] = motor_commands[motor_id]
+            command[motor_id * 5 + 1] = a1.MOTOR_KPS[motor_id]
+            command[motor_id * 5 + 3] = a1.MOTOR_KDS[motor_id]
+    elif motor_control_mode == robot_config.MotorControlMode.TORQUE:
+        for motor_id in range(a1.NUM_MOTORS):
+            command[motor_id * 5 + 4] = motor_commands[motor_id]
+    with robot._robot_command_lock:
+        robot._robot_interface.send_command(command)
+
+
+def state_arrays(robot):
+    return [
+        robot._base_orientation,
+        robot._accelerometer_reading,
+        robot._motor_angles,
+        robot._motor_velocities,
+        robot._joint_states,
+        robot._observed_motor_torques,
+        robot._motor_temperatures,
+    ]
+
+
+def timeit(fn, num_iters):
+    fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    return 1e6 * (time.perf_counter() - start) / num_iters
+
+
+def main(args):
+    pybullet_client = bullet_client.BulletClient(pybullet.DIRECT)
+    interface = FakeRobotInterface(initial_motor_angles=a1.INIT_MOTOR_ANGLES)
+    robot = a1_robot.A1Robot(
+        pybullet_client,
+        urdf_filename=args.urdf,
+        robot_interface=interface,
+        motor_control_mode=robot_config.MotorControlMode.POSITION,
+        reset_time=-1,
+    )
+    position = np.array(a1.INIT_MOTOR_ANGLES)
+    torque = np.linspace(-1.0, 1.0, a1.NUM_MOTORS)
+    position_mode = robot_config.MotorControlMode.POSITION
+    torque_mode = robot_config.MotorControlMode.TORQUE
+
+    # Same states and commands
+    state = interface.receive_observation()
+    legacy_unpack_state(robot, state)
+    expected = state_arrays(robot)
+    robot._UnpackState(state)
+    for actual, expected_array in zip(state_arrays(robot), expected):
+        np.testing.assert_array_equal(actual, expected_array)
+    for motor_commands, mode in ((position, position_mode), (torque, torque_mode)):
+        legacy_apply_action(robot, motor_commands, mode)
+        expected_command = interface._command
+        robot.ApplyAction(motor_commands, mode)
+        np.testing.assert_array_equal(interface._command, expected_command)
+
+    benchmarks = [
+        (
+            "unpack motor states",
+            lambda: legacy_unpack_state(robot, state),
+            lambda: robot._UnpackState(state),
+        ),
+        (
+            "ReceiveObservation",
+            lambda: legacy_receive_observation(robot),
+            robot.ReceiveObservation,
+        ),
+        (
+            "ApplyAction POSITION",
+            lambda: legacy_apply_action(robot, position, position_mode),
+            lambda: robot.ApplyAction(position, position_mode),
+        ),
+        (
+            "ApplyAction TORQUE",
+            lambda: legacy_apply_action(robot, torque, torque_mode),
+            lambda: robot.ApplyAction(torque, torque_mode),
+        ),
+    ]
+    print(f"{'us per call':>22} {'loops':>10} {'vectorized':>12} {'speedup':>8}")
+    for name, legacy, vectorized in benchmarks:
+        legacy_time = timeit(legacy, args.num_iters)
+        vectorized_time = timeit(vectorized, args.num_iters)
+        print(
+            f"{name:>22} {legacy_time:>10.1f} {vectorized_time:>12.1f} "
+            f"{legacy_time / vectorized_time:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num_iters", type=int, default=10000)
+    parser.add_argument("--urdf", default=a1.URDF_FILENAME)
+    main(parser.parse_args())
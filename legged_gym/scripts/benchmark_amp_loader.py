@@ -0,0 +1,58 @@
+"""Micro-benchmark of AMPLoader batched frame interpolation.
+
+Reports get_full_frame_at_time_batch throughput for an increasing number of
+motion clips and batch sizes. Does not require Isaac Gym.
+
+    python legged_gym/scripts/benchmark_amp_loader.py
+"""
+import glob
+import os
+import time
+
+import numpy as np
+import torch
+
+from legged_gym import LEGGED_GYM_ROOT_DIR
+from rsl_rl.datasets.motion_loader import AMPLoader
+
+
+def synchronize(device):
+    if "cuda" in device:
+        torch.cuda.synchronize(device)
+
+
+def benchmark(loader, batch_size, num_iters):
+    traj_idxs = loader.weighted_traj_idx_sample_batch(batch_size)
+    times = loader.traj_time_sample_batch(traj_idxs)
+    # warmup
+    loader.get_full_frame_at_time_batch(traj_idxs, times)
+    synchronize(loader.device)
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        loader.get_full_frame_at_time_batch(traj_idxs, times)
+    synchronize(loader.device)
+    return num_iters * batch_size / (time.perf_counter() - start)
+
+
+def main():
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    motion_files = sorted(glob.glob(os.path.join(LEGGED_GYM_ROOT_DIR, MOTION_FILES)))
+
+    print(f"Device: {device}")
+    print(f"{'clips':>8} {'batch size':>12} {'frames/s':>14}")
+    for num_clips in NUM_CLIPS:
+        loader = AMPLoader(
+            device, time_between_frames=0.02, motion_files=motion_files[:num_clips]
+        )
+        for batch_size in BATCH_SIZES:
+            fps = benchmark(loader, batch_size, NUM_ITERS)
+            print(f"{num_clips:>8} {batch_size:>12} {fps:>14.3e}")
+
+
+if __name__ == "__main__":
+    MOTION_FILES = "datasets/bdx/many_placo_walk_examples/*"
+    NUM_CLIPS = [1, 10, 100]
+    BATCH_SIZES = [1024, 16384, 262144]
+    NUM_ITERS = 10
+    np.random.seed(0)
+    main()
@@ -0,0 +1,122 @@
+"""Jitter of the A1Robot control loop, against a local FakeRobotInterface.
+
+Runs the 1 kHz loop of A1Robot, with an MLP policy every action_repeat ticks,
+first paced by the former sleep based _Nap, then by its ControlLoopScheduler,
+and reports the histograms of the loop period, of ReceiveObservation,
+ApplyAction and of the policy inference. Does not require Isaac Gym nor a robot.
+
+    python legged_gym/scripts/benchmark_control_loop.py --seconds 10
+"""
+
+import argparse
+import time
+
+from legged_gym import null_physics
+
+# legged_gym.envs imports Isaac Gym, which the A1Robot does not use
+null_physics.install()
+
+import numpy as np
+import pybullet
+import torch
+from pybullet_utils import bullet_client
+
+from legged_gym.envs.a1_robot import a1, a1_robot, control_loop, robot_config
+from legged_gym.envs.a1_robot.fake_robot_interface import FakeRobotInterface
+
+
+class SleepNap:
+    """The former A1Robot._Nap, which sleeps for the remainder of time_step."""
+
+    def __init__(self, robot):
+        self.robot = robot
+        self.periods = control_loop.LatencyHistogram()
+        self.last_tick = None
+
+    def __call__(self):
+        now = time.time()
+        sleep_time = self.robot.time_step - (now - self.robot._last_step_time_wall)
+        self.robot._last_step_time_wall = now
+        if sleep_time >= 0:
+            time.sleep(sleep_time)
+        # Periods between the ends of the naps, like ControlLoopScheduler's
+        tick = time.perf_counter()
+        if self.last_tick is not None:
+            self.periods.Record(tick - self.last_tick)
+        self.last_tick = tick
+
+
+def run(robot, policy, num_steps):
+    obs = torch.zeros(1, policy[0].in_features)
+    for _ in range(num_steps):
+        with robot.control_loop.Measure(control_loop.POLICY_INFERENCE):
+            with torch.inference_mode():
+                actions = policy(obs)
+        action = a1.INIT_MOTOR_ANGLES + 0.1 * np.tanh(actions[0].numpy())
+        robot.Step(action, robot_config.MotorControlMode.POSITION)
+
+
+def main(args):
+    torch.set_num_threads(1)
+    pybullet_client = bullet_client.BulletClient(pybullet.DIRECT)
+    robot = a1_robot.A1Robot(
+        pybullet_client,
+        urdf_filename=args.urdf,
+        time_step=args.time_step,
+        action_repeat=args.action_repeat,
+        robot_interface=FakeRobotInterface(
+            latency=args.latency, initial_motor_angles=a1.INIT_MOTOR_ANGLES
+        ),
+        motor_control_mode=robot_config.MotorControlMode.POSITION,
+        reset_time=-1,
+    )
+    robot.control_loop = control_loop.ControlLoopScheduler(
+        args.time_step, spin_time=args.spin_time
+    )
+    policy = torch.nn.Sequential(
+        torch.nn.Linear(NUM_OBS, 512),
+        torch.nn.ELU(),
+        torch.nn.Linear(512, 256),
+        torch.nn.ELU(),
+        torch.nn.Linear(256, 128),
+        torch.nn.ELU(),
+        torch.nn.Linear(128, a1.NUM_MOTORS),
+    )
+    num_steps = int(args.seconds / (args.time_step * args.action_repeat))
+
+    scheduler_nap = robot._Nap
+    robot._Nap = sleep_nap = SleepNap(robot)
+    run(robot, policy, num_steps)
+    robot._Nap = scheduler_nap
+    summary = sleep_nap.periods.Summary()
+    print(
+        "Sleep based _Nap: period mean {:.3f}, p50 {:.3f}, p99 {:.3f}, "
+        "max {:.3f} ms".format(
+            1e3 * summary["mean"],
+            1e3 * summary["p50"],
+            1e3 * summary["p99"],
+            1e3 * summary["max"],
+        )
+    )
+
+    robot.control_loop.Clear()
+    robot.control_loop.Restart()
+    run(robot, policy, num_steps)
+    print(robot.control_loop.Report())
+
+
+if __name__ == "__main__":
+    NUM_OBS = 42
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--time_step", type=float, default=0.001)
+    parser.add_argument("--action_repeat", type=int, default=20)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Emulated latency of each robot interface call, in seconds.",
+    )
+    parser.add_argument("--spin_time", type=float, default=0.0002)
+    parser.add_argument("--urdf", default=a1.URDF_FILENAME)
+    main(parser.parse_args())
@@ -0,0 +1,78 @@
+"""Throughput of the LeggedRobot pipeline on the null physics backend.
+
+Runs env.step with random actions, reports the time of each reward term,
+then runs a few AMPOnPolicyRunner.learn iterations, on top of NullGym (see
+legged_gym/null_physics) instead of Isaac Gym. Physics is a stand-in, so this measures everything around the simulator:
+torques, observations, rewards, resets, AMP observations and the learner.
+Does not require Isaac Gym nor a GPU.
+
+    python legged_gym/scripts/benchmark_env.py --task bdx_amp --num_envs 4096 \
+        --sim_device cpu --pipeline cpu --rl_device cpu --headless
+"""
+
+import tempfile
+import time
+
+from legged_gym import null_physics
+
+null_physics.install()
+
+import torch
+
+from legged_gym.envs import *
+from legged_gym.utils import get_args, task_registry
+
+
+def synchronize(device):
+    if "cuda" in str(device):
+        torch.cuda.synchronize(device)
+
+
+def main(args):
+    env_cfg, train_cfg = task_registry.get_cfgs(args.task)
+    if env_cfg.terrain.mesh_type not in ["plane", None]:
+        print(f"Null physics: replacing {env_cfg.terrain.mesh_type} terrain by a plane")
+        env_cfg.terrain.mesh_type = "plane"
+        env_cfg.terrain.curriculum = False
+        env_cfg.terrain.measure_heights = False
+    env, env_cfg = task_registry.make_env(args.task, args, env_cfg)
+    env.reset()
+
+    actions = torch.zeros(env.num_envs, env.num_actions, device=env.device)
+    for _ in range(NUM_WARMUP_STEPS):
+        env.step(actions.normal_())
+    synchronize(env.device)
+    start = time.perf_counter()
+    for _ in range(NUM_STEPS):
+        env.step(actions.normal_())
+    synchronize(env.device)
+    step_time = (time.perf_counter() - start) / NUM_STEPS
+    print(
+        f"env.step: {step_time * 1e3:.3f} ms, "
+        f"{env.num_envs / step_time:.0f} env steps/s ({env.num_envs} envs)"
+    )
+
+    print("Reward terms [ms]:")
+    for name, ms in env.reward_timing_report().items():
+        print(f"  {name:>24}: {ms:.3f}")
+
+    with tempfile.TemporaryDirectory() as log_root:
+        runner, train_cfg = task_registry.make_alg_runner(
+            env=env, name=args.task, args=args, log_root=log_root
+        )
+        num_iterations = args.max_iterations or NUM_ITERATIONS
+        start = time.perf_counter()
+        runner.learn(num_learning_iterations=num_iterations)
+        synchronize(args.rl_device)
+        learn_time = (time.perf_counter() - start) / num_iterations
+    num_steps = env.num_envs * train_cfg.runner.num_steps_per_env
+    print(
+        f"learn: {learn_time:.3f} s/iteration, {num_steps / learn_time:.0f} env steps/s"
+    )
+
+
+if __name__ == "__main__":
+    NUM_WARMUP_STEPS = 10
+    NUM_STEPS = 100
+    NUM_ITERATIONS = 5
+    main(get_args())
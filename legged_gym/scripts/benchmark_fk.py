@@ -0,0 +1,84 @@
+"""Per-step timing of the AMP foot position forward kinematics.
+
+Compares one SerialChain.forward_kinematics call per foot (the previous
+get_amp_observations code path) against BatchedSerialChainFK, eager and
+compiled, on the BDX end effector chains for several numbers of environments.
+
+    python legged_gym/scripts/benchmark_fk.py
+"""
+
+import os
+import time
+
+import torch
+
+# legged_gym.utils imports legged_gym.envs, which must be imported first
+import legged_gym.envs
+import legged_gym.utils.kinematics.urdf as pk
+from legged_gym import LEGGED_GYM_ROOT_DIR
+from legged_gym.utils.kinematics.batched_fk import BatchedSerialChainFK
+
+
+def synchronize(device):
+    if "cuda" in device:
+        torch.cuda.synchronize(device)
+
+
+def timeit(fn, device):
+    fn()  # warmup, and compilation for torch.compile
+    synchronize(device)
+    start = time.perf_counter()
+    for _ in range(NUM_ITERS):
+        fn()
+    synchronize(device)
+    return (time.perf_counter() - start) / NUM_ITERS
+
+
+def main():
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    urdf = open(os.path.join(LEGGED_GYM_ROOT_DIR, URDF)).read()
+    chains = [
+        pk.build_serial_chain_from_urdf(urdf, ee_name).to(device=device)
+        for ee_name in EE_NAMES
+    ]
+    fk = BatchedSerialChainFK(chains, JOINT_INDICES, device=device)
+    fk_compiled = BatchedSerialChainFK(
+        chains, JOINT_INDICES, device=device, compile=True
+    )
+
+    def chain_fk(dof_pos):
+        return torch.cat(
+            [
+                chain.forward_kinematics(dof_pos[:, idx]).get_matrix()[:, :3, 3]
+                for chain, idx in zip(chains, JOINT_INDICES)
+            ],
+            dim=-1,
+        )
+
+    print(f"Device: {device}")
+    print(
+        f"{'N':>7} {'chain [ms]':>11} {'batched [ms]':>13} {'compiled [ms]':>14} {'speedup':>8}"
+    )
+    for num_envs in NUM_ENVS:
+        dof_pos = (torch.rand(num_envs, NUM_DOF, device=device) - 0.5) * 2
+        assert torch.allclose(
+            chain_fk(dof_pos), fk.forward_kinematics(dof_pos).flatten(1), atol=1e-5
+        )
+        chain_time = timeit(lambda: chain_fk(dof_pos), device)
+        batched_time = timeit(lambda: fk.forward_kinematics(dof_pos), device)
+        compiled_time = timeit(lambda: fk_compiled.forward_kinematics(dof_pos), device)
+        print(
+            f"{num_envs:>7} {chain_time * 1e3:>11.3f} {batched_time * 1e3:>13.3f} "
+            f"{compiled_time * 1e3:>14.3f} {chain_time / compiled_time:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    URDF = "resources/robots/bdx/urdf/bdx.urdf"
+    EE_NAMES = ["left_foot", "right_foot"]
+    JOINT_INDICES = [list(range(0, 5)), list(range(10, 15))]
+    NUM_DOF = 15
+    NUM_ENVS = [1024, 4096, 16384]
+    NUM_ITERS = 20
+    torch.manual_seed(0)
+    main()
@@ -0,0 +1,91 @@
+"""Micro-benchmark of RolloutStorage.compute_returns.
+
+Compares the scripted GAE against the reference per-step Python loop for several
+rollout lengths and numbers of environments, and checks that both produce
+identical returns and advantages. Does not require Isaac Gym.
+
+    python legged_gym/scripts/benchmark_gae.py
+"""
+
+import time
+
+import torch
+
+from rsl_rl.storage import RolloutStorage
+
+
+def compute_returns_loop(storage, last_values, gamma, lam):
+    """Reference implementation: the original per-step GAE loop."""
+    returns = torch.zeros_like(storage.returns)
+    advantage = 0
+    for step in reversed(range(storage.num_transitions_per_env)):
+        if step == storage.num_transitions_per_env - 1:
+            next_values = last_values
+        else:
+            next_values = storage.values[step + 1]
+        next_is_not_terminal = 1.0 - storage.dones[step].float()
+        delta = (
+            storage.rewards[step]
+            + next_is_not_terminal * gamma * next_values
+            - storage.values[step]
+        )
+        advantage = delta + next_is_not_terminal * gamma * lam * advantage
+        returns[step] = advantage + storage.values[step]
+
+    advantages = returns - storage.values
+    advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+    return returns, advantages
+
+
+def synchronize(device):
+    if "cuda" in device:
+        torch.cuda.synchronize(device)
+
+
+def timeit(fn, device):
+    fn()  # warmup
+    synchronize(device)
+    start = time.perf_counter()
+    for _ in range(NUM_ITERS):
+        fn()
+    synchronize(device)
+    return (time.perf_counter() - start) / NUM_ITERS
+
+
+def main():
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    print(f"Device: {device}")
+    print(f"{'T':>4} {'N':>7} {'loop [ms]':>10} {'scripted [ms]':>16} {'speedup':>8}")
+    for num_steps in NUM_STEPS:
+        for num_envs in NUM_ENVS:
+            storage = RolloutStorage(num_envs, num_steps, [1], [None], [1], device)
+            storage.rewards.normal_()
+            storage.values.normal_()
+            storage.dones.copy_(torch.rand_like(storage.rewards) < 0.02)
+            last_values = torch.randn(num_envs, 1, device=device)
+
+            returns, advantages = compute_returns_loop(storage, last_values, GAMMA, LAM)
+            storage.compute_returns(last_values, GAMMA, LAM)
+            assert torch.equal(storage.returns, returns)
+            assert torch.equal(storage.advantages, advantages)
+
+            loop_time = timeit(
+                lambda: compute_returns_loop(storage, last_values, GAMMA, LAM), device
+            )
+            scripted_time = timeit(
+                lambda: storage.compute_returns(last_values, GAMMA, LAM), device
+            )
+            print(
+                f"{num_steps:>4} {num_envs:>7} {loop_time * 1e3:>10.3f} "
+                f"{scripted_time * 1e3:>16.3f} {loop_time / scripted_time:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    NUM_STEPS = [24, 48, 96]
+    NUM_ENVS = [1024, 4096, 16384]
+    GAMMA = 0.998
+    LAM = 0.95
+    NUM_ITERS = 20
+    torch.manual_seed(0)
+    main()
@@ -0,0 +1,132 @@
+"""Batched A1 leg kinematics against the per-leg functions of a1.py.
+
+Times the foot positions, inverse kinematics and Jacobians of the legs, for one
+state of the robot, as in the velocity estimator at each control tick, and for
+a clip of frames, as in offline retargeting: per-leg functions in Python loops,
+then leg_kinematics on numpy arrays and torch tensors. Checks that they agree.
+Does not require Isaac Gym nor a robot.
+
+    python legged_gym/scripts/benchmark_leg_kinematics.py --num_frames 10000
+"""
+
+import argparse
+import time
+
+from legged_gym import null_physics
+
+# legged_gym.envs imports Isaac Gym, which the A1 kinematics do not use
+null_physics.install()
+
+import numpy as np
+import torch
+
+from legged_gym.envs.a1_robot import a1, leg_kinematics
+
+LEG_IDS = range(a1.NUM_LEGS)
+
+
+def loop_foot_positions(joint_angles):
+    return np.stack(
+        [a1.foot_positions_in_base_frame(angles) for angles in joint_angles]
+    )
+
+
+def loop_inverse_kinematics(foot_positions):
+    return np.stack(
+        [
+            [
+                a1.foot_position_in_hip_frame_to_joint_angle(
+                    positions[leg_id] - a1.HIP_OFFSETS[leg_id],
+                    l_hip_sign=(-1) ** (leg_id + 1),
+                )
+                for leg_id in LEG_IDS
+            ]
+            for positions in foot_positions
+        ]
+    )
+
+
+def loop_jacobians(joint_angles):
+    return np.stack(
+        [
+            [a1.analytical_leg_jacobian(angles[leg_id], leg_id) for leg_id in LEG_IDS]
+            for angles in joint_angles
+        ]
+    )
+
+
+def timeit(fn, min_time=0.2):
+    """Returns the time per call, in us."""
+    fn()
+    num_iters = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        fn()
+        num_iters += 1
+    return 1e6 * (time.perf_counter() - start) / num_iters
+
+
+def main(args):
+    torch.set_num_threads(args.num_threads)
+    rng = np.random.default_rng(0)
+    joint_angles = np.stack(
+        [
+            rng.uniform(-0.6, 0.6, (args.num_frames, a1.NUM_LEGS)),
+            rng.uniform(0.2, 1.2, (args.num_frames, a1.NUM_LEGS)),
+            rng.uniform(-2.3, -1.0, (args.num_frames, a1.NUM_LEGS)),
+        ],
+        -1,
+    )
+    foot_positions = leg_kinematics.foot_positions_in_base_frame(joint_angles)
+
+    functions = [
+        (
+            "foot positions",
+            loop_foot_positions,
+            leg_kinematics.foot_positions_in_base_frame,
+            joint_angles,
+        ),
+        (
+            "inverse kinematics",
+            loop_inverse_kinematics,
+            leg_kinematics.joint_angles_from_foot_positions_in_base_frame,
+            foot_positions,
+        ),
+        (
+            "jacobians",
+            loop_jacobians,
+            leg_kinematics.leg_jacobians,
+            joint_angles,
+        ),
+    ]
+    for _, loop_fn, batched_fn, inputs in functions:
+        expected = loop_fn(inputs)
+        np.testing.assert_allclose(batched_fn(inputs), expected, atol=1e-10)
+        torch.testing.assert_close(
+            batched_fn(torch.as_tensor(inputs)).numpy(), expected, rtol=0, atol=1e-10
+        )
+
+    print(
+        f"{'us per call':>28} {'loops':>10} {'numpy':>10} {'torch':>10} "
+        f"{'speedup':>8}"
+    )
+    for num_frames in (1, args.num_frames):
+        for name, loop_fn, batched_fn, inputs in functions:
+            # One state of the robot is [4, 3], a clip [num_frames, 4, 3]
+            batch = inputs[0] if num_frames == 1 else inputs[:num_frames]
+            loop_time = timeit(lambda: loop_fn(batch.reshape(-1, a1.NUM_LEGS, 3)))
+            numpy_time = timeit(lambda: batched_fn(batch))
+            tensor = torch.as_tensor(batch, dtype=torch.float32)
+            torch_time = timeit(lambda: batched_fn(tensor))
+            label = f"{name} x{num_frames}"
+            print(
+                f"{label:>28} {loop_time:>10.1f} {numpy_time:>10.1f} "
+                f"{torch_time:>10.1f} {loop_time / min(numpy_time, torch_time):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num_frames", type=int, default=10000)
+    parser.add_argument("--num_threads", type=int, default=1)
+    main(parser.parse_args())
@@ -0,0 +1,117 @@
+"""Cost of assembling the LocomotionGymEnv observation for the policy, per control step.
+
+Compares the observation dictionary of the sensors, concatenated and copied
+into a tensor like play_real formerly did, with the flat observation the
+sensors write in place, viewed as a tensor without a copy. Reports the time and
+the memory allocated per observation, traced by tracemalloc (numpy arrays and
+Python objects, torch allocations are not traced). Checks that both give the
+same observation. Runs the simulated A1 in PyBullet, does not require Isaac Gym.
+
+    python legged_gym/scripts/benchmark_observation.py
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from legged_gym import null_physics
+
+# legged_gym.envs imports Isaac Gym, which the PyBullet env does not use
+null_physics.install()
+
+import numpy as np
+import torch
+
+from legged_gym.envs.a1_robot import a1, env_builder, locomotion_gym_config
+from legged_gym.envs.a1_robot import robot_config
+
+
+class ObsScales:
+    dof_pos = 1.0
+    dof_vel = 0.05
+
+
+SENSOR_NAMES = [
+    "ProjectedGravity",
+    "FakeCommand",
+    "MotorAngle",
+    "MotorVelocity",
+    "LastAction",
+]
+
+
+def build_env(args, flat_observation):
+    sim_params = locomotion_gym_config.SimulationParameters()
+    sim_params.enable_rendering = False
+    sim_params.motor_control_mode = robot_config.MotorControlMode.POSITION
+    sim_params.enable_action_filter = False
+    sim_params.enable_clip_motor_commands = False
+    sim_params.enable_action_interpolation = False
+    return env_builder.build_env_isaac(
+        sim_params=sim_params,
+        default_pose=a1.INIT_MOTOR_ANGLES,
+        obs_scales=ObsScales,
+        action_scale=0.25,
+        flat_observation=flat_observation,
+        urdf_filename=args.urdf,
+    )
+
+
+def dict_observation(env):
+    obs = env._get_observation()
+    return torch.tensor(np.concatenate([obs[name] for name in SENSOR_NAMES])).float()
+
+
+def flat_observation(env):
+    return torch.from_numpy(env._get_observation())
+
+
+def measure(fn, num_iters):
+    """Returns the time in us and the memory in bytes allocated per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(num_iters):
+        fn()
+    duration = 1e6 * (time.perf_counter() - start) / num_iters
+
+    # Peak of the traced memory during a call, above the memory before it
+    tracemalloc.start()
+    allocated = []
+    for _ in range(100):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        allocated.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return duration, int(np.median(allocated))
+
+
+def main(args):
+    dict_env = build_env(args, flat_observation=False)
+    flat_env = build_env(args, flat_observation=True)
+    assert list(flat_env.flat_observation_slices) == SENSOR_NAMES
+
+    # Same observations, after a few steps with the same actions
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        action = rng.uniform(-0.5, 0.5, a1.NUM_MOTORS)
+        dict_env.step(action)
+        flat_env.step(action)
+    torch.testing.assert_close(
+        flat_observation(flat_env), dict_observation(dict_env), rtol=1e-5, atol=1e-6
+    )
+
+    print(f"{'per observation':>16} {'us':>8} {'bytes allocated':>16}")
+    for name, fn, env in (
+        ("dict + concat", dict_observation, dict_env),
+        ("flat in place", flat_observation, flat_env),
+    ):
+        duration, allocated = measure(lambda: fn(env), args.num_iters)
+        print(f"{name:>16} {duration:>8.1f} {allocated:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--num_iters", type=int, default=10000)
+    parser.add_argument("--urdf", default=a1.URDF_FILENAME)
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+"""Per-step timing of the ObservationBuffer ring buffer against the previous shift buffer.
+
+Times the env step usage: reset of the terminated envs, insert, and either
+get_lagged_obs (observation lag buffer) or a copy of obs_buf into the rollout
+storage (RMA history), for several numbers of environments.
+
+    python legged_gym/scripts/benchmark_observation_buffer.py
+"""
+
+import time
+
+import torch
+
+from legged_gym.envs.base.observation_buffer import ObservationBuffer
+
+
+class ShiftObservationBuffer(ObservationBuffer):
+    """The previous implementation, shifting the whole history on each insert."""
+
+    def __init__(self, num_envs, num_obs, include_history_steps, device):
+        self.num_envs = num_envs
+        self.num_obs = num_obs
+        self.include_history_steps = include_history_steps
+        self.device = device
+        self.num_obs_total = num_obs * include_history_steps
+        self._obs_buf = torch.zeros(
+            self.num_envs, self.num_obs_total, device=self.device, dtype=torch.float
+        )
+
+    @property
+    def obs_buf(self):
+        return self._obs_buf
+
+    def reset(self, reset_idxs, new_obs):
+        self._obs_buf[reset_idxs] = new_obs.repeat(1, self.include_history_steps)
+
+    def insert(self, new_obs):
+        self._obs_buf[:, : self.num_obs * (self.include_history_steps - 1)] = (
+            self._obs_buf[:, self.num_obs : self.num_obs * self.include_history_steps]
+        )
+        self._obs_buf[:, -self.num_obs :] = new_obs
+
+    def get_lagged_obs(self, indices):
+        indices_expanded = indices.unsqueeze(1).expand(-1, self.num_obs)
+        gather_indices = (
+            indices_expanded * self.num_obs
+            + torch.arange(self.num_obs, device=self.device)
+        ).view(self.num_envs, self.num_obs)
+        return torch.gather(self._obs_buf, 1, gather_indices)
+
+
+def synchronize(device):
+    if "cuda" in device:
+        torch.cuda.synchronize(device)
+
+
+def timeit(buffer_cls, num_envs, device, read):
+    buffer = buffer_cls(num_envs, NUM_OBS, HISTORY_STEPS, device)
+    obs = torch.randn(NUM_ITERS, num_envs, NUM_OBS, device=device)
+    reset_ids = torch.randint(0, num_envs, (NUM_ITERS, num_envs // 100), device=device)
+    indices = torch.randint(0, HISTORY_STEPS, (num_envs,), device=device)
+    storage = torch.zeros(num_envs, NUM_OBS * HISTORY_STEPS, device=device)
+
+    synchronize(device)
+    start = time.perf_counter()
+    for i in range(NUM_ITERS):
+        buffer.reset(reset_ids[i], obs[i, reset_ids[i]])
+        buffer.insert(obs[i])
+        if read == "lagged":
+            buffer.get_lagged_obs(indices)
+        elif read == "obs_buf":
+            storage.copy_(buffer.obs_buf)  # as the rollout storage
+    synchronize(device)
+    return (time.perf_counter() - start) / NUM_ITERS, buffer
+
+
+def main():
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    print(f"Device: {device}, {NUM_OBS} obs, {HISTORY_STEPS} history steps")
+    print(f"{'N':>7} {'read':>8} {'shift [ms]':>11} {'ring [ms]':>10} {'speedup':>8}")
+    for num_envs in NUM_ENVS:
+        for read in ["none", "lagged", "obs_buf"]:
+            torch.manual_seed(0)
+            shift_time, shift_buffer = timeit(
+                ShiftObservationBuffer, num_envs, device, read
+            )
+            torch.manual_seed(0)
+            ring_time, ring_buffer = timeit(ObservationBuffer, num_envs, device, read)
+            assert torch.equal(shift_buffer.obs_buf, ring_buffer.obs_buf)
+            print(
+                f"{num_envs:>7} {read:>8} {shift_time * 1e3:>11.3f} "
+                f"{ring_time * 1e3:>10.3f} {shift_time / ring_time:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    NUM_OBS = 51
+    HISTORY_STEPS = 15
+    NUM_ENVS = [1024, 4096, 16384]
+    NUM_ITERS = 100
+    main()
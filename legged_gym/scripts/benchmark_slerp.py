@@ -0,0 +1,97 @@
+"""Timing of the batched quaternion_slerp on 1M quaternion pairs.
+
+Compares the rsl_rl quaternion_slerp, eager and compiled, against the previous
+implementation based on boolean masks and masked assignments.
+
+    python legged_gym/scripts/benchmark_slerp.py
+"""
+
+import time
+
+import numpy as np
+import torch
+
+from rsl_rl.utils.utils import quaternion_slerp
+
+_EPS = np.finfo(float).eps * 4.0
+
+
+def quaternion_slerp_masked(q0, q1, fraction, spin=0, shortestpath=True):
+    """The previous implementation, modifies q0 and q1."""
+    out = torch.zeros_like(q0)
+
+    zero_mask = torch.isclose(fraction, torch.zeros_like(fraction)).squeeze()
+    ones_mask = torch.isclose(fraction, torch.ones_like(fraction)).squeeze()
+    out[zero_mask] = q0[zero_mask]
+    out[ones_mask] = q1[ones_mask]
+
+    d = torch.sum(q0 * q1, dim=-1, keepdim=True)
+    dist_mask = (torch.abs(torch.abs(d) - 1.0) < _EPS).squeeze()
+    out[dist_mask] = q0[dist_mask]
+
+    if shortestpath:
+        d_old = torch.clone(d)
+        d = torch.where(d_old < 0, -d, d)
+        q1 = torch.where(d_old < 0, -q1, q1)
+
+    angle = torch.acos(d) + spin * torch.pi
+    angle_mask = (torch.abs(angle) < _EPS).squeeze()
+    out[angle_mask] = q0[angle_mask]
+
+    final_mask = torch.logical_or(zero_mask, ones_mask)
+    final_mask = torch.logical_or(final_mask, dist_mask)
+    final_mask = torch.logical_or(final_mask, angle_mask)
+    final_mask = torch.logical_not(final_mask)
+
+    isin = 1.0 / angle
+    q0 *= torch.sin((1.0 - fraction) * angle) * isin
+    q1 *= torch.sin(fraction * angle) * isin
+    q0 += q1
+    out[final_mask] = q0[final_mask]
+    return out
+
+
+def synchronize(device):
+    if "cuda" in device:
+        torch.cuda.synchronize(device)
+
+
+def timeit(fn, device):
+    fn()  # warmup, and compilation for torch.compile
+    synchronize(device)
+    start = time.perf_counter()
+    for _ in range(NUM_ITERS):
+        fn()
+    synchronize(device)
+    return (time.perf_counter() - start) / NUM_ITERS
+
+
+def main():
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    q0 = torch.nn.functional.normalize(torch.randn(NUM_PAIRS, 4, device=device), dim=-1)
+    q1 = torch.nn.functional.normalize(torch.randn(NUM_PAIRS, 4, device=device), dim=-1)
+    fraction = torch.rand(NUM_PAIRS, 1, device=device)
+    compiled_slerp = torch.compile(quaternion_slerp, fullgraph=True)
+
+    # The previous implementation needs clones, as it modifies its inputs
+    masked_time = timeit(
+        lambda: quaternion_slerp_masked(q0.clone(), q1.clone(), fraction), device
+    )
+    eager_time = timeit(lambda: quaternion_slerp(q0, q1, fraction), device)
+    compiled_time = timeit(lambda: compiled_slerp(q0, q1, fraction), device)
+
+    print(f"Device: {device}, {NUM_PAIRS} quaternion pairs")
+    print(
+        f"{'masked [ms]':>12} {'eager [ms]':>11} {'compiled [ms]':>14} {'speedup':>8}"
+    )
+    print(
+        f"{masked_time * 1e3:>12.3f} {eager_time * 1e3:>11.3f} "
+        f"{compiled_time * 1e3:>14.3f} {masked_time / compiled_time:>8.2f}"
+    )
+
+
+if __name__ == "__main__":
+    NUM_PAIRS = 1_000_000
+    NUM_ITERS = 20
+    torch.manual_seed(0)
+    main()
@@ -8,16 +8,12 @@ from legged_gym.envs.a1_robot import env_builder
 from legged_gym.envs.a1_robot import locomotion_gym_config
 from legged_gym.envs.a1_robot import robot_config
 from legged_gym.envs.a1_robot import a1
+from legged_gym.envs.a1_robot import policy_runtime
 
 import numpy as np
 import torch
 
 
-_convert_obs_dict_to_tensor = lambda obs, device: torch.tensor(np.concatenate([
-        obs["ProjectedGravity"], obs["FakeCommand"], obs["MotorAngle"],
-        obs["MotorVelocity"], obs["LastAction"]]), device=device).float()
-
-
 def play(args):
     env_cfg, train_cfg = task_registry.get_cfgs(name=args.task)
     # override some parameters for testing
@@ -75,25 +71,40 @@ def play(args):
         default_pose=a1.INIT_MOTOR_ANGLES,
         obs_scales=env_cfg.normalization.obs_scales,
         action_scale=env_cfg.control.action_scale,
-        use_real_robot=False)
-    # Dict -> Tensor.
-    obs = _convert_obs_dict_to_tensor(pyb_env.reset(), ppo_runner.device)
-
-
-    for i in range(int(10e4)):
-        # Evaluate policy and act.
-        actions = policy(obs.detach())
-        obs, _, _, _ = pyb_env.step(actions.detach().cpu().numpy())
-
+        use_real_robot=USE_REAL_ROBOT,
+        flat_observation=True)
+    # The sensors write into a flat array, in the order of the policy
+    # observations: ProjectedGravity, FakeCommand, MotorAngle, MotorVelocity
+    # and LastAction.
+    obs = pyb_env.reset()
+    command_slice = pyb_env.flat_observation_slices["FakeCommand"]
+
+    # The policy thread reads the observations into a pinned tensor.
+    obs_tensor = torch.zeros(len(obs))
+    if torch.device(ppo_runner.device).type == 'cuda':
+        obs_tensor = obs_tensor.pin_memory()
+
+    def run_policy(obs):
         # Update commands to get latest from joystick.
         env.compute_observations()
-        commands = np.squeeze(env.obs_buf[..., 3:6].detach().cpu().numpy())
-        obs["FakeCommand"] = commands
+        obs[command_slice] = np.squeeze(env.obs_buf[..., 3:6].detach().cpu().numpy())
+
+        actions = policy(obs_tensor.to(ppo_runner.device, non_blocking=True))
+        return actions.detach().cpu().numpy()
 
-        # Dict -> Tensor.
-        obs = _convert_obs_dict_to_tensor(obs, ppo_runner.device)
+    # The robot steps at its own rate with the latest actions, the policy runs
+    # in a thread on the latest observations.
+    runtime = policy_runtime.TwoRateRuntime(
+        pyb_env, run_policy,
+        num_obs=len(obs),
+        num_actions=a1.NUM_MOTORS,
+        observation_buffer=obs_tensor.numpy())
+    runtime.Run(obs, int(10e4))
+    print(runtime.Report())
 
 if __name__ == '__main__':
     EXPORT_POLICY = True
+    # Runs the policy on the A1 rather than on its simulation in PyBullet.
+    USE_REAL_ROBOT = False
     args = get_args()
     play(args)
@@ -0,0 +1,304 @@
+"""Local inference server for exported policies, micro-batching the requests of many clients.
+
+Clients (robots, evaluation rollouts) connect with PolicyClient and send observations,
+one or a few at a time. The server gathers the requests that arrive within max_wait_ms,
+up to max_batch_size observations, runs the policy once on the batch and replies to each
+client with its actions. It periodically reports the throughput and the latency of the
+requests (p50/p99, from the arrival of a request to its reply).
+
+Serve the ONNX policy exported by play.py, or its TorchScript version policy_1.pt:
+
+    python legged_gym/scripts/policy_server.py --model ONNX.onnx
+
+With --authkey, only the PolicyClients given the same key can connect.
+
+Benchmark the server with local client threads, against unbatched policy calls:
+
+    python legged_gym/scripts/policy_server.py --model ONNX.onnx --bench_clients 64
+
+Does not require Isaac Gym: only numpy, and onnxruntime or torch to run the model.
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+
+class OnnxPolicy:
+    def __init__(self, path):
+        import onnxruntime
+
+        self.session = onnxruntime.InferenceSession(
+            path, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        # [batch, num_obs] -> [batch, num_actions], the batch axis is dynamic
+        self.num_obs = self.session.get_inputs()[0].shape[1]
+        self.num_actions = self.session.get_outputs()[0].shape[1]
+
+    def __call__(self, obs):
+        return self.session.run(None, {self.input_name: obs})[0]
+
+
+class TorchScriptPolicy:
+    def __init__(self, path):
+        import torch
+
+        self.torch = torch
+        self.model = torch.jit.load(path, map_location="cpu")
+        self.num_obs = getattr(self.model, "0").in_features
+        self.num_actions = self(np.zeros((1, self.num_obs), dtype=np.float32)).shape[1]
+
+    def __call__(self, obs):
+        with self.torch.inference_mode():
+            return self.model(self.torch.from_numpy(obs)).numpy()
+
+
+def load_policy(path):
+    if path.endswith(".onnx"):
+        return OnnxPolicy(path)
+    return TorchScriptPolicy(path)
+
+
+def format_stats(latencies, batch_sizes, elapsed):
+    """Throughput and p50/p99 latency of the requests served in elapsed seconds."""
+    if not latencies:
+        return "no requests"
+    p50, p99 = 1e3 * np.percentile(latencies, [50, 99])
+    return (
+        f"{len(latencies) / elapsed:.0f} requests/s, "
+        f"{sum(batch_sizes) / elapsed:.0f} obs/s, "
+        f"mean batch size {np.mean(batch_sizes):.1f}, "
+        f"latency p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+    )
+
+
+class PolicyServer:
+    """Serves a policy to the PolicyClients connected to address, in batches.
+
+    A thread per client receives its requests into a single queue, and serve_forever
+    runs the policy on the batches of requests it takes from the queue.
+    """
+
+    def __init__(
+        self,
+        policy,
+        address=("localhost", 6000),
+        max_batch_size=256,
+        max_wait_ms=1.0,
+        authkey=None,
+    ):
+        self.policy = policy
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1e3
+        # The default backlog of 1 drops the connections of clients starting together
+        self.listener = Listener(address, backlog=1024, authkey=authkey)
+        # The port is chosen by the OS if it is 0
+        self.address = self.listener.address
+        self.requests = queue.SimpleQueue()
+        self.stopped = threading.Event()
+        self.reset_stats()
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def reset_stats(self):
+        self.latencies = []
+        self.batch_sizes = []
+        self.stats_start = time.perf_counter()
+
+    def _accept(self):
+        while not self.stopped.is_set():
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                logging.warning("Refused a client with a wrong authkey.")
+                continue
+            except OSError:
+                return
+            conn.send((self.policy.num_obs, self.policy.num_actions))
+            threading.Thread(target=self._receive, args=(conn,), daemon=True).start()
+
+    def _receive(self, conn):
+        while True:
+            try:
+                data = conn.recv_bytes()
+            except (EOFError, OSError):
+                conn.close()
+                return
+            try:
+                obs = np.frombuffer(data, dtype=np.float32).reshape(
+                    -1, self.policy.num_obs
+                )
+            except ValueError:
+                logging.warning(
+                    "Closing the connection of a client that sent %d bytes, "
+                    "not a whole number of observations of %d floats.",
+                    len(data),
+                    self.policy.num_obs,
+                )
+                conn.close()
+                return
+            self.requests.put((conn, obs, time.perf_counter()))
+
+    def _next_batch(self, timeout):
+        """Waits for a request, then takes the next ones until the batch is full or max_wait_ms passed."""
+        try:
+            request = self.requests.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        batch = [request]
+        batch_size = len(request[1])
+        deadline = request[2] + self.max_wait
+        while batch_size < self.max_batch_size:
+            # Past the deadline, still take the requests already in the queue
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    request = self.requests.get(timeout=remaining)
+                else:
+                    request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            batch_size += len(request[1])
+        return batch
+
+    def serve_batch(self, batch):
+        obs = np.concatenate([request_obs for _, request_obs, _ in batch])
+        actions = self.policy(obs)
+        end = 0
+        for conn, request_obs, _ in batch:
+            start, end = end, end + len(request_obs)
+            try:
+                conn.send_bytes(np.ascontiguousarray(actions[start:end]))
+            except OSError:
+                # The client disconnected, its receive thread closes the connection
+                pass
+        now = time.perf_counter()
+        self.latencies.extend(now - arrival for _, _, arrival in batch)
+        self.batch_sizes.append(len(obs))
+
+    def serve_forever(self, report_interval=5.0):
+        """Serves the requests until close(), printing the stats every report_interval seconds."""
+        while not self.stopped.is_set():
+            batch = self._next_batch(timeout=0.1)
+            if batch:
+                self.serve_batch(batch)
+            elapsed = time.perf_counter() - self.stats_start
+            if report_interval and elapsed >= report_interval:
+                print(format_stats(self.latencies, self.batch_sizes, elapsed))
+                self.reset_stats()
+
+    def close(self):
+        self.stopped.set()
+        self.listener.close()
+
+
+class PolicyClient:
+    def __init__(self, address=("localhost", 6000), authkey=None):
+        self.conn = Client(address, authkey=authkey)
+        self.num_obs, self.num_actions = self.conn.recv()
+
+    def infer(self, obs):
+        """Actions for one observation [num_obs] or a few [n, num_obs]."""
+        obs = np.ascontiguousarray(obs, dtype=np.float32)
+        self.conn.send_bytes(obs)
+        actions = np.frombuffer(self.conn.recv_bytes(), dtype=np.float32)
+        return actions.reshape(*obs.shape[:-1], self.num_actions)
+
+    def close(self):
+        self.conn.close()
+
+
+def benchmark(policy, args):
+    rng = np.random.default_rng(0)
+    obs = rng.uniform(-1.0, 1.0, (args.bench_requests, policy.num_obs))
+    obs = obs.astype(np.float32)
+
+    start = time.perf_counter()
+    for observation in obs:
+        policy(observation[None])
+    elapsed = time.perf_counter() - start
+    print(f"unbatched: {args.bench_requests / elapsed:.0f} requests/s")
+
+    authkey = args.authkey and args.authkey.encode()
+    server = PolicyServer(
+        policy, ("localhost", 0), args.max_batch_size, args.max_wait_ms, authkey
+    )
+    threading.Thread(
+        target=server.serve_forever, kwargs={"report_interval": 0}, daemon=True
+    ).start()
+    latencies = []
+
+    def run_client():
+        client = PolicyClient(server.address, authkey)
+        for observation in obs:
+            start = time.perf_counter()
+            client.infer(observation)
+            latencies.append(time.perf_counter() - start)
+        client.close()
+
+    clients = [threading.Thread(target=run_client) for _ in range(args.bench_clients)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+    server.close()
+    # Latencies seen by the clients, including the round trip to the server
+    print(
+        f"server, {args.bench_clients} clients: {format_stats(latencies, server.batch_sizes, elapsed)}"
+    )
+
+
+def main(args):
+    policy = load_policy(args.model)
+    print(f"{args.model}: {policy.num_obs} observations, {policy.num_actions} actions")
+    if args.bench_clients:
+        benchmark(policy, args)
+        return
+    server = PolicyServer(
+        policy,
+        (args.host, args.port),
+        args.max_batch_size,
+        args.max_wait_ms,
+        args.authkey and args.authkey.encode(),
+    )
+    print(f"Serving on {server.address[0]}:{server.address[1]}")
+    try:
+        server.serve_forever(args.report_interval)
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--model", required=True, help="ONNX or TorchScript policy.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6000)
+    parser.add_argument(
+        "--authkey",
+        help="Secret the clients must know to connect, unauthenticated if not set.",
+    )
+    parser.add_argument("--max_batch_size", type=int, default=256)
+    parser.add_argument(
+        "--max_wait_ms",
+        type=float,
+        default=1.0,
+        help="Time a request waits for others to batch with.",
+    )
+    parser.add_argument("--report_interval", type=float, default=5.0)
+    parser.add_argument(
+        "--bench_clients",
+        type=int,
+        default=0,
+        help="Benchmark the server with this many local clients instead of serving.",
+    )
+    parser.add_argument("--bench_requests", type=int, default=1000)
+    main(parser.parse_args())
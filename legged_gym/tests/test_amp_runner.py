@@ -0,0 +1,47 @@
+"""AMPOnPolicyRunner.learn on the BDX AMP task, run on the null physics backend.
+
+LEGGED_GYM_NULL_PHYSICS=1 python -m pytest legged_gym/tests/test_amp_runner.py
+"""
+
+import sys
+
+# legged_gym.utils imports legged_gym.envs, which must be imported first
+from legged_gym.envs import *
+from legged_gym.utils import get_args, task_registry
+
+TASK = "bdx_amp"
+
+
+def make_runner(monkeypatch, log_root, **runner_cfg):
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "train.py",
+            f"--task={TASK}",
+            "--num_envs=16",
+            "--sim_device=cpu",
+            "--rl_device=cpu",
+            "--headless",
+        ],
+    )
+    args = get_args()
+    env_cfg, train_cfg = task_registry.get_cfgs(TASK)
+    for name, value in runner_cfg.items():
+        setattr(train_cfg.runner, name, value)
+    env, _ = task_registry.make_env(TASK, args, env_cfg)
+    runner, _ = task_registry.make_alg_runner(
+        env=env, args=args, train_cfg=train_cfg, log_root=str(log_root)
+    )
+    return runner
+
+
+def test_pipelined_learn_twice(monkeypatch, tmp_path):
+    runner = make_runner(monkeypatch, tmp_path, pipelined=True)
+    runner.learn(num_learning_iterations=2)
+    # The rollout collected during the last iteration is not left in the storage
+    assert runner.alg.rollout_storage.step == 0
+    assert not runner.alg.pending_amp_transitions
+
+    runner.learn(num_learning_iterations=1)
+    assert runner.current_learning_iteration == 3
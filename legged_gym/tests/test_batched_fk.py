@@ -0,0 +1,61 @@
+"""Equivalence of BatchedSerialChainFK with the SerialChain forward kinematics.
+
+python -m pytest legged_gym/tests/test_batched_fk.py
+"""
+
+import os
+
+import pytest
+import torch
+
+# legged_gym.utils imports legged_gym.envs, which must be imported first
+import legged_gym.envs
+import legged_gym.utils.kinematics.urdf as pk
+from legged_gym import LEGGED_GYM_ROOT_DIR
+from legged_gym.utils.kinematics.batched_fk import BatchedSerialChainFK
+
+ROBOTS = {
+    "bdx": (["left_foot", "right_foot"], [range(0, 5), range(10, 15)], 15),
+    "a1": (
+        ["FL_foot", "FR_foot", "RL_foot", "RR_foot"],
+        [range(i * 3, i * 3 + 3) for i in range(4)],
+        12,
+    ),
+}
+
+
+def build_chains(robot):
+    ee_names, joint_indices, num_dof = ROBOTS[robot]
+    urdf = open(
+        os.path.join(
+            LEGGED_GYM_ROOT_DIR, "resources/robots", robot, "urdf", robot + ".urdf"
+        )
+    ).read()
+    chains = [pk.build_serial_chain_from_urdf(urdf, ee_name) for ee_name in ee_names]
+    return chains, [list(idx) for idx in joint_indices], num_dof
+
+
+@pytest.mark.parametrize("robot", sorted(ROBOTS))
+@pytest.mark.parametrize("compile", [False, True])
+def test_matches_serial_chain(robot, compile):
+    chains, joint_indices, num_dof = build_chains(robot)
+    fk = BatchedSerialChainFK(chains, joint_indices, compile=compile)
+
+    torch.manual_seed(0)
+    dof_pos = (torch.rand(1024, num_dof) - 0.5) * 2 * torch.pi
+    expected = torch.stack(
+        [
+            chain.forward_kinematics(dof_pos[:, idx]).get_matrix()[:, :3, 3]
+            for chain, idx in zip(chains, joint_indices)
+        ],
+        dim=1,
+    )
+    torch.testing.assert_close(
+        fk.forward_kinematics(dof_pos), expected, atol=1e-5, rtol=1e-5
+    )
+
+
+def test_wrong_number_of_joints():
+    chains, joint_indices, _ = build_chains("bdx")
+    with pytest.raises(ValueError):
+        BatchedSerialChainFK(chains, [joint_indices[0][:-1], joint_indices[1]])
@@ -0,0 +1,138 @@
+"""Equivalence of the batched MotionLib.get_motion_state with MotionData.calc_frame/calc_frame_vel.
+
+python -m pytest legged_gym/tests/test_bdx_motion_data.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+import torch
+import yaml
+from scipy.spatial.transform import Rotation as R
+
+from legged_gym import LEGGED_GYM_ROOT_DIR
+from legged_gym.utilities.bdx_motion_data import MotionData, MotionLib
+
+MOTION_FILES = [
+    "datasets/bdx/placo_moves/bdx_turn_left.txt",
+    "datasets/bdx/placo_moves/bdx_walk_forward.txt",
+    # cycle offset rotation enabled
+    "datasets/mocap_motions/leftturn0.txt",
+]
+NUM_SAMPLES = 1000
+
+
+def scalar_motion_state(motion_lib, motion_ids, motion_times, z_rots=None):
+    """The per sample implementation of get_motion_state."""
+    num_dof = motion_lib._num_dof
+    states = []
+    for i, (motion_id, motion_time) in enumerate(zip(motion_ids, motion_times)):
+        motion = motion_lib.get_motion(motion_id)
+        frame = motion.calc_frame(motion_time)
+        frame_vel = motion.calc_frame_vel(motion_time)
+        root_pos, root_rot = frame[:3], frame[3:7]
+        if z_rots is not None:
+            rot_euler = R.from_quat(root_rot).as_euler("xyz", degrees=True)
+            rot_euler[2] += z_rots[i]
+            root_rot = R.from_euler("xyz", rot_euler, degrees=True).as_quat()
+            root_pos = R.from_euler("z", z_rots[i], degrees=True).as_matrix() @ root_pos
+        states.append(
+            np.concatenate(
+                [
+                    root_pos,
+                    root_rot,
+                    frame[7 : 7 + num_dof],
+                    frame_vel[:3],
+                    frame_vel[3:6],
+                    frame_vel[6 : 6 + num_dof],
+                ]
+            )
+        )
+    states = torch.tensor(np.array(states), dtype=torch.float)
+    return torch.split(states, [3, 4, num_dof, 3, 3, num_dof], dim=1)
+
+
+def write_motion_files(tmp_path):
+    """Copies the motion files to tmp_path (the motion caches are written next to them),
+    with a clamped copy of the last one, and returns the path of a yaml listing them."""
+    motion_files = []
+    for motion_file in MOTION_FILES:
+        with open(os.path.join(LEGGED_GYM_ROOT_DIR, motion_file)) as f:
+            motion_json = json.load(f)
+        motion_files.append(str(tmp_path / os.path.basename(motion_file)))
+        with open(motion_files[-1], "w") as f:
+            json.dump(motion_json, f)
+    # A clamped motion, to cover the first/last frame and the clipped cycle count
+    motion_json["LoopMode"] = "Clamp"
+    motion_files.append(str(tmp_path / "clamp.txt"))
+    with open(motion_files[-1], "w") as f:
+        json.dump(motion_json, f)
+
+    motion_file = tmp_path / "motions.yaml"
+    with open(motion_file, "w") as f:
+        yaml.dump({"motions": [{"file": f, "weight": 1.0} for f in motion_files]}, f)
+    return str(motion_file)
+
+
+@pytest.fixture(scope="module")
+def motion_lib(tmp_path_factory):
+    return MotionLib(write_motion_files(tmp_path_factory.mktemp("motions")), "cpu")
+
+
+@pytest.mark.parametrize("random_z_rot", [False, True])
+def test_matches_scalar_path(motion_lib, random_z_rot):
+    np.random.seed(0)
+    motion_ids = np.random.randint(0, motion_lib.num_motions(), NUM_SAMPLES)
+    # Up to 3 cycles before and after the motion
+    duration = motion_lib.get_motion_length(motion_ids)
+    motion_times = np.random.uniform(-3.0, 4.0, NUM_SAMPLES) * duration
+    motion_times[:10] = 0.0
+    motion_times[10:20] = duration[10:20]
+
+    np.random.seed(1)
+    state = motion_lib.get_motion_state(motion_ids, motion_times, random_z_rot)
+    np.random.seed(1)
+    z_rots = np.random.uniform(-180, 180, NUM_SAMPLES) if random_z_rot else None
+    expected = scalar_motion_state(motion_lib, motion_ids, motion_times, z_rots)
+
+    names = ["root_pos", "root_rot", "dof_pos", "root_vel", "root_ang_vel", "dof_vel"]
+    for name, value, expected_value in zip(names, state, expected):
+        if name == "root_rot":
+            # q and -q are the same rotation
+            expected_value = torch.where(
+                expected_value[:, 3:] < 0, -expected_value, expected_value
+            )
+        torch.testing.assert_close(
+            value, expected_value, atol=1e-4, rtol=1e-5, msg=name
+        )
+
+
+def test_cache(tmp_path):
+    motion_file = write_motion_files(tmp_path)
+    motion_lib = MotionLib(motion_file, "cpu", preload=True, num_workers=2)
+    motion_files = motion_lib._motion_files
+    for f in motion_files:
+        assert os.path.isfile(f + MotionData._CACHE_SUFFIX)
+
+    # Loaded from the caches, in the main process
+    cached_motion_lib = MotionLib(motion_file, "cpu", preload=True, num_workers=1)
+    for motion, cached_motion in zip(motion_lib._motions, cached_motion_lib._motions):
+        np.testing.assert_array_equal(motion.get_frames(), cached_motion.get_frames())
+        np.testing.assert_array_equal(
+            motion.get_frame_vels(), cached_motion.get_frame_vels()
+        )
+        assert motion.enable_loop() == cached_motion.enable_loop()
+
+    # A modified motion file invalidates its cache
+    with open(motion_files[0]) as f:
+        motion_json = json.load(f)
+    motion_json["FrameDuration"] *= 2
+    with open(motion_files[0], "w") as f:
+        json.dump(motion_json, f)
+    motion = MotionData(motion_files[0])
+    assert motion.get_frame_duration() == motion_json["FrameDuration"]
+    np.testing.assert_allclose(
+        motion.get_frame_vels(), motion_lib.get_motion(0).get_frame_vels() / 2
+    )
@@ -0,0 +1,49 @@
+"""LatencyHistogram statistics and ControlLoopScheduler overrun accounting.
+
+python -m pytest legged_gym/tests/test_control_loop.py
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from legged_gym.envs.a1_robot.control_loop import (
+    PERIOD,
+    ControlLoopScheduler,
+    LatencyHistogram,
+)
+
+
+def test_histogram_summary():
+    durations = np.random.default_rng(0).lognormal(np.log(1e-3), 0.5, 10000)
+    histogram = LatencyHistogram()
+    for duration in durations:
+        histogram.Record(duration)
+
+    summary = histogram.Summary()
+    assert summary["count"] == len(durations)
+    assert summary["mean"] == pytest.approx(durations.mean())
+    assert summary["max"] == durations.max()
+    for quantile in (50, 90, 99):
+        assert summary[f"p{quantile}"] == pytest.approx(
+            np.percentile(durations, quantile), rel=5e-3
+        )
+
+
+def test_scheduler_period_and_overruns():
+    period = 0.002
+    scheduler = ControlLoopScheduler(period)
+    scheduler.Restart()
+    start = time.perf_counter()
+    for _ in range(50):
+        scheduler.WaitForNextTick()
+    # Absolute deadlines: no drift over the ticks
+    assert time.perf_counter() - start == pytest.approx(50 * period, rel=0.05)
+
+    # A stall of 4.5 periods past the deadline skips 4 ticks
+    time.sleep(5.5 * period)
+    scheduler.WaitForNextTick()
+    assert scheduler.num_overruns >= 1
+    assert scheduler.num_missed_ticks >= 4
+    assert scheduler.histograms[PERIOD].Summary()["count"] == 51
@@ -0,0 +1,79 @@
+"""Batched A1 leg kinematics: inverse kinematics, Jacobians and numpy/torch agreement.
+
+python -m pytest legged_gym/tests/test_leg_kinematics.py
+"""
+
+import numpy as np
+import torch
+
+from legged_gym.envs.a1_robot import leg_kinematics
+
+
+def random_joint_angles(shape, seed=0):
+    """Joint angles within the A1 limits, away from the knee singularities.
+
+    The hip swings less than pi / 2 from the vertical, the range of the inverse
+    kinematics.
+    """
+    rng = np.random.default_rng(seed)
+    return np.stack(
+        [
+            rng.uniform(-0.6, 0.6, shape),
+            rng.uniform(0.2, 1.2, shape),
+            rng.uniform(-2.3, -1.0, shape),
+        ],
+        -1,
+    )
+
+
+def test_foot_positions_of_straight_legs():
+    positions = leg_kinematics.foot_positions_in_hip_frame(np.zeros((4, 3)))
+    expected = np.zeros((4, 3))
+    expected[:, 1] = leg_kinematics.HIP_LENGTH * leg_kinematics.LEG_HIP_SIGNS
+    expected[:, 2] = -(
+        leg_kinematics.UPPER_LEG_LENGTH + leg_kinematics.LOWER_LEG_LENGTH
+    )
+    np.testing.assert_allclose(positions, expected, atol=1e-12)
+
+
+def test_inverse_kinematics_round_trip():
+    joint_angles = random_joint_angles((100, 4))
+    positions = leg_kinematics.foot_positions_in_base_frame(joint_angles)
+    assert positions.shape == (100, 4, 3)
+    np.testing.assert_allclose(
+        leg_kinematics.joint_angles_from_foot_positions_in_base_frame(positions),
+        joint_angles,
+        atol=1e-9,
+    )
+
+
+def test_jacobians_match_finite_differences():
+    joint_angles = random_joint_angles((10, 4))
+    jacobians = leg_kinematics.leg_jacobians(joint_angles)
+    assert jacobians.shape == (10, 4, 3, 3)
+    eps = 1e-6
+    for joint in range(3):
+        delta = np.zeros(3)
+        delta[joint] = eps
+        derivative = (
+            leg_kinematics.foot_positions_in_hip_frame(joint_angles + delta)
+            - leg_kinematics.foot_positions_in_hip_frame(joint_angles - delta)
+        ) / (2 * eps)
+        np.testing.assert_allclose(jacobians[..., joint], derivative, atol=1e-7)
+
+
+def test_torch_matches_numpy():
+    joint_angles = random_joint_angles((7, 4))
+    positions = leg_kinematics.foot_positions_in_hip_frame(joint_angles)
+    for fn, inputs in (
+        (leg_kinematics.foot_positions_in_base_frame, joint_angles),
+        (leg_kinematics.joint_angles_from_foot_positions_in_hip_frame, positions),
+        (leg_kinematics.leg_jacobians, joint_angles),
+    ):
+        expected = fn(inputs)
+        for dtype in (torch.float64, torch.float32):
+            actual = fn(torch.as_tensor(inputs, dtype=dtype))
+            assert actual.dtype == dtype
+            torch.testing.assert_close(
+                actual, torch.as_tensor(expected, dtype=dtype), rtol=1e-4, atol=1e-5
+            )
@@ -0,0 +1,61 @@
+"""Compilation of AMP motion files by rsl_rl.datasets.motion_cache.
+
+python -m pytest legged_gym/tests/test_motion_cache.py
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from rsl_rl.datasets import motion_cache
+
+NUM_FRAMES = 5
+FRAME_DIM = 10
+
+
+def write_motion_file(path, frames):
+    with open(path, "w") as f:
+        json.dump(
+            {"FrameDuration": 0.03, "MotionWeight": 1.0, "Frames": frames.tolist()}, f
+        )
+    return str(path)
+
+
+def random_frames(seed=0):
+    return np.random.default_rng(seed).uniform(-1.0, 1.0, (NUM_FRAMES, FRAME_DIM))
+
+
+def test_load_motions(tmp_path):
+    frames = random_frames()
+    motion_file = write_motion_file(tmp_path / "motion.txt", frames)
+    cache_dir = tmp_path / "cache"
+    motions = motion_cache.load_motions([motion_file], str(cache_dir))
+    assert len(motions) == 1
+    np.testing.assert_allclose(
+        motions.get_motion(0)[:, motion_cache.ROOT_ROT_END_IDX :],
+        frames[:, motion_cache.ROOT_ROT_END_IDX :],
+        rtol=1e-6,
+    )
+    assert os.listdir(cache_dir) == [os.path.basename(motions.path)]
+
+
+def test_no_motion_files(tmp_path):
+    cache_dir = tmp_path / "cache"
+    with pytest.raises(ValueError, match="No motion files"):
+        motion_cache.load_motions([], str(cache_dir))
+    assert not cache_dir.exists()
+
+
+def test_failed_compilation_leaves_no_directory(tmp_path, monkeypatch):
+    motion_file = write_motion_file(tmp_path / "motion.txt", random_frames())
+    cache_dir = tmp_path / "cache"
+
+    def fail(*args, **kwargs):
+        raise ValueError("write failed")
+
+    monkeypatch.setattr(np, "save", fail)
+    with pytest.raises(ValueError, match="write failed"):
+        motion_cache.load_motions([motion_file], str(cache_dir))
+    assert os.listdir(cache_dir) == []
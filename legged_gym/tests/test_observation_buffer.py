@@ -0,0 +1,55 @@
+"""ObservationBuffer against a plain list of the past observations of each env.
+
+python -m pytest legged_gym/tests/test_observation_buffer.py
+"""
+
+import torch
+
+from legged_gym.envs.base.observation_buffer import ObservationBuffer
+
+NUM_ENVS = 8
+NUM_OBS = 5
+HISTORY_STEPS = 4
+
+
+def test_matches_history():
+    torch.manual_seed(0)
+    buffer = ObservationBuffer(NUM_ENVS, NUM_OBS, HISTORY_STEPS, "cpu")
+    obs = torch.randn(NUM_ENVS, NUM_OBS)
+    buffer.reset(torch.arange(NUM_ENVS), obs)
+    # history[env] is the list of the observations of env, the latest last
+    history = [[obs[env]] * HISTORY_STEPS for env in range(NUM_ENVS)]
+
+    for step in range(3 * HISTORY_STEPS + 1):
+        previous_obs_buf = buffer.obs_buf
+
+        obs = torch.randn(NUM_ENVS, NUM_OBS)
+        reset_ids = torch.randperm(NUM_ENVS)[: step % 3]
+        buffer.reset(reset_ids, obs[reset_ids])
+        buffer.insert(obs)
+        for env in range(NUM_ENVS):
+            if env in reset_ids:
+                history[env] = [obs[env]] * HISTORY_STEPS
+            history[env] = history[env][1:] + [obs[env]]
+
+        expected = torch.stack([torch.cat(h) for h in history])
+        assert torch.equal(buffer.obs_buf, expected)
+        # As the shift buffer, the obs_buf returned before the insert is updated in place
+        assert buffer.obs_buf is previous_obs_buf
+
+        obs_ids = [0, 2, 3]
+        assert torch.equal(
+            buffer.get_obs_vec(obs_ids),
+            torch.stack(
+                [
+                    torch.cat([h[HISTORY_STEPS - 1 - i] for i in reversed(obs_ids)])
+                    for h in history
+                ]
+            ),
+        )
+
+        indices = torch.randint(0, HISTORY_STEPS, (NUM_ENVS,))
+        assert torch.equal(
+            buffer.get_lagged_obs(indices),
+            torch.stack([h[i] for h, i in zip(history, indices)]),
+        )
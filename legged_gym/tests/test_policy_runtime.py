@@ -0,0 +1,73 @@
+"""SnapshotBuffer publishing and TwoRateRuntime stale action accounting.
+
+python -m pytest legged_gym/tests/test_policy_runtime.py
+"""
+
+import time
+
+import numpy as np
+
+from legged_gym.envs.a1_robot.policy_runtime import (
+    DROPPED_OBSERVATIONS,
+    ENV_STEPS,
+    STALE_ACTIONS,
+    SnapshotBuffer,
+    TwoRateRuntime,
+)
+
+
+class CountingEnv:
+    """Env whose observation is the number of steps and the last action."""
+
+    def __init__(self):
+        self.num_steps = 0
+        self.actions = []
+
+    def step(self, action):
+        self.num_steps += 1
+        self.actions.append(action)
+        return np.array([self.num_steps, action[0]]), 0.0, False, {}
+
+
+def test_snapshot_buffer():
+    buffer = SnapshotBuffer(3)
+    sequence, value = buffer.Read()
+    assert sequence == 0
+    np.testing.assert_array_equal(value, np.zeros(3))
+    for i in range(1, 4):
+        buffer.Write(np.full(3, i))
+        sequence, value = buffer.Read()
+        assert sequence == i
+        np.testing.assert_array_equal(value, np.full(3, i))
+
+
+def run(policy_time, num_steps=100, env_period=0.002):
+    env = CountingEnv()
+
+    def policy(obs):
+        time.sleep(policy_time)
+        return np.full(1, obs[0])
+
+    runtime = TwoRateRuntime(env, policy, 2, 1, env_period=env_period)
+    assert runtime.Run(np.zeros(2), num_steps) == num_steps
+    assert runtime.counters[ENV_STEPS] == num_steps
+    return env, runtime
+
+
+def test_fast_policy_keeps_up():
+    env, runtime = run(policy_time=0.0)
+    # The env only waits for the first action
+    assert runtime.counters[STALE_ACTIONS] < 10
+    assert runtime.counters[DROPPED_OBSERVATIONS] < 10
+    # Actions are computed on the observations of the previous steps
+    steps_of_actions = np.array([action[0] for action in env.actions])
+    assert np.all(steps_of_actions < np.arange(1, len(env.actions) + 1))
+
+
+def test_slow_policy_makes_stale_actions():
+    # The policy takes 3 env steps: the env reuses each action about 3 times
+    # and the policy skips about 2 observations out of 3
+    env, runtime = run(policy_time=0.006)
+    assert runtime.counters[STALE_ACTIONS] > 40
+    assert runtime.counters[DROPPED_OBSERVATIONS] > 30
+    assert runtime.policy_inference.Summary()["count"] < 50
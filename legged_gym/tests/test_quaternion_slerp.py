@@ -0,0 +1,64 @@
+"""Accuracy of the batched rsl_rl quaternion_slerp against pybullet_utils.transformations.
+
+python -m pytest legged_gym/tests/test_quaternion_slerp.py
+"""
+
+import numpy as np
+import pytest
+import torch
+from pybullet_utils import transformations
+
+from rsl_rl.utils.utils import quaternion_slerp
+
+NUM_SAMPLES = 2000
+
+
+def random_quaternion_pairs(num_samples):
+    rng = np.random.default_rng(0)
+    q0 = rng.normal(size=(num_samples, 4))
+    q0 /= np.linalg.norm(q0, axis=-1, keepdims=True)
+    q1 = rng.normal(size=(num_samples, 4))
+    q1 /= np.linalg.norm(q1, axis=-1, keepdims=True)
+    n = num_samples // 4
+    # Identical, opposite (same rotation) and almost identical quaternions
+    q1[:n] = q0[:n]
+    q1[n : 2 * n] = -q0[n : 2 * n]
+    q1[2 * n : 3 * n] = q0[2 * n : 3 * n] + rng.normal(scale=1e-5, size=(n, 4))
+    q1[2 * n : 3 * n] /= np.linalg.norm(q1[2 * n : 3 * n], axis=-1, keepdims=True)
+    fraction = rng.uniform(size=(num_samples, 1))
+    fraction[::10] = 0.0
+    fraction[1::10] = 1.0
+    return q0, q1, fraction
+
+
+@pytest.mark.parametrize("dtype", [torch.float64, torch.float32])
+@pytest.mark.parametrize("compile", [False, True])
+def test_matches_transformations(dtype, compile):
+    q0, q1, fraction = random_quaternion_pairs(NUM_SAMPLES)
+    expected = np.array(
+        [
+            transformations.quaternion_slerp(*args)
+            for args in zip(q0, q1, fraction[:, 0])
+        ]
+    )
+    slerp = (
+        torch.compile(quaternion_slerp, fullgraph=True) if compile else quaternion_slerp
+    )
+
+    q0_t, q1_t, fraction_t = (torch.tensor(x, dtype=dtype) for x in (q0, q1, fraction))
+    q0_copy, q1_copy = q0_t.clone(), q1_t.clone()
+    out = slerp(q0_t, q1_t, fraction_t)
+
+    assert torch.equal(q0_t, q0_copy) and torch.equal(q1_t, q1_copy)
+    assert torch.isfinite(out).all()
+    torch.testing.assert_close(out.norm(dim=-1), torch.ones(NUM_SAMPLES, dtype=dtype))
+    # q and -q are the same rotation: transformations does not take the shortest
+    # path when fraction is exactly 1
+    sign = torch.sign(torch.sum(out * torch.tensor(expected, dtype=dtype), dim=-1))
+    atol = 1e-10 if dtype == torch.float64 else 1e-5
+    torch.testing.assert_close(
+        out * sign.unsqueeze(-1),
+        torch.tensor(expected, dtype=dtype),
+        atol=atol,
+        rtol=0.0,
+    )
@@ -0,0 +1,67 @@
+"""Prioritized sampling of the AMP policy ReplayBuffer and its SumTree.
+
+python -m pytest legged_gym/tests/test_replay_buffer.py
+"""
+
+import pytest
+import torch
+
+from rsl_rl.storage.replay_buffer import ReplayBuffer
+from rsl_rl.storage.sum_tree import SumTree
+
+NUM_SAMPLES = 200000
+
+
+def sample_frequencies(sample, num_items):
+    torch.manual_seed(0)
+    return (
+        torch.bincount(sample((NUM_SAMPLES,)), minlength=num_items).double()
+        / NUM_SAMPLES
+    )
+
+
+@pytest.mark.parametrize("capacity", [1, 5, 64, 1000])
+def test_sum_tree(capacity):
+    tree = SumTree(capacity, "cpu")
+    priorities = torch.rand(capacity, dtype=torch.float64)
+    priorities[::3] = 0.0
+    tree.update(torch.arange(capacity), priorities)
+    priorities[1::2] *= 2.0
+    tree.update(torch.arange(1, capacity, 2), priorities[1::2])
+
+    torch.testing.assert_close(tree.total(), priorities.sum())
+    if priorities.sum() > 0:
+        expected = priorities / priorities.sum()
+        torch.testing.assert_close(
+            sample_frequencies(tree.sample, capacity), expected, atol=0.01, rtol=0
+        )
+
+
+def test_recency_weights():
+    decay = 0.5
+    buffer = ReplayBuffer(1, 8, "cpu", sampling="prioritized", recency_decay=decay)
+    buffer._MAX_RECENCY_WEIGHT = 10.0  # rescaled during the inserts
+    for i in range(12):
+        buffer.insert(torch.full((2, 1), float(i)), torch.zeros(2, 1))
+
+    # The 4 last inserts are stored, with weights decayed by their age
+    ages = torch.tensor([3, 3, 2, 2, 1, 1, 0, 0], dtype=torch.float64)
+    expected = decay**ages / (decay**ages).sum()
+    frequencies = sample_frequencies(buffer.sample_idxs, 8)
+    torch.testing.assert_close(frequencies, expected, atol=0.01, rtol=0)
+
+
+def test_update_priorities():
+    buffer = ReplayBuffer(
+        1, 4, "cpu", sampling="prioritized", priority_alpha=1.0, priority_eps=0.0
+    )
+    buffer.insert(torch.zeros(4, 1), torch.zeros(4, 1))
+    # Policy transitions scored close to -1 are well classified, and rarely sampled
+    buffer.update_priorities(
+        torch.tensor([0, 1, 2, 3]), torch.tensor([[-1.0], [0.0], [1.0], [-1.0]])
+    )
+
+    expected = torch.tensor([0.0, 0.2, 0.8, 0.0], dtype=torch.float64)
+    frequencies = sample_frequencies(buffer.sample_idxs, 4)
+    torch.testing.assert_close(frequencies, expected, atol=0.01, rtol=0)
+    assert buffer.max_priority.item() == 4.0
@@ -0,0 +1,68 @@
+"""In place write_observation of the A1 sensors, against their get_observation.
+
+python -m pytest legged_gym/tests/test_sensors.py
+"""
+
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from legged_gym.envs.a1_robot.sensors import robot_sensors
+
+NUM_MOTORS = 12
+
+
+class StubRobot:
+    def __init__(self, rng):
+        self.orientation = Rotation.random(random_state=1).as_quat()
+        self.motor_angles = rng.uniform(-1.0, 1.0, NUM_MOTORS)
+        self.motor_velocities = rng.uniform(-10.0, 10.0, NUM_MOTORS)
+
+    def GetTrueBaseOrientation(self):
+        return tuple(self.orientation)
+
+    def GetTrueMotorAngles(self):
+        return self.motor_angles
+
+    GetMotorAngles = GetTrueMotorAngles
+
+    def GetTrueMotorVelocities(self):
+        return self.motor_velocities
+
+    GetMotorVelocities = GetTrueMotorVelocities
+
+
+class StubEnv:
+    def __init__(self, rng):
+        self.last_action = rng.uniform(-1.0, 1.0, NUM_MOTORS)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_write_observation(dtype):
+    rng = np.random.default_rng(0)
+    default_pose = rng.uniform(-1.0, 1.0, NUM_MOTORS)
+    sensors = [
+        robot_sensors.ProjectedGravitySensor(),
+        robot_sensors.FakeCommandSensor(),
+        robot_sensors.MotorAngleSensor(
+            num_motors=NUM_MOTORS, default_pose=default_pose, scales=1.0
+        ),
+        robot_sensors.MotorVelocitySensor(num_motors=NUM_MOTORS, scales=0.05),
+        robot_sensors.LastActionSensor(
+            num_actions=NUM_MOTORS, scale=0.25, default_pose=default_pose
+        ),
+    ]
+    robot = StubRobot(rng)
+    for sensor in sensors:
+        sensor.set_robot(robot)
+        sensor.on_reset(StubEnv(rng))
+
+        out = np.full(sensor.get_size(), np.nan, dtype=dtype)
+        sensor.write_observation(out)
+        np.testing.assert_allclose(
+            out,
+            sensor.get_observation(),
+            rtol=1e-6,
+            atol=1e-6,
+            err_msg=sensor.get_name(),
+        )
@@ -14,22 +14,41 @@
 # limitations under the License.
 
 """Motion data class for processing motion clips."""
+
+import concurrent.futures
 import enum
+import hashlib
 import json
 import logging
 import math
+import multiprocessing
 import os
+import tempfile
+import zipfile
 
 import numpy as np
 import torch
 import yaml
-from isaacgym.torch_utils import to_torch
+from isaacgym.torch_utils import quat_mul, quat_rotate, to_torch
 from pybullet_utils import transformations
-from scipy.spatial.transform import Rotation as R
+from rsl_rl.utils.utils import quaternion_slerp
 
 from legged_gym.utilities import motion_util, pose3d
 
 
+def _standardize_quaternion(q):
+    """Batched motion_util.standardize_quaternion, q.w >= 0."""
+    return torch.where(q[:, 3:4] < 0, -q, q)
+
+
+def _yaw_quaternion(angle):
+    """Quaternions of the rotations of angle (radians) around z, [N, 4] (x, y, z, w)."""
+    q = torch.zeros(angle.shape[0], 4, dtype=angle.dtype, device=angle.device)
+    q[:, 2] = torch.sin(0.5 * angle)
+    q[:, 3] = torch.cos(0.5 * angle)
+    return q
+
+
 class LoopMode(enum.Enum):
     """Specifies if a motion should loop or stop at the last frame."""
 
@@ -38,11 +57,22 @@ class LoopMode(enum.Enum):
 
 
 class MotionLib(object):
-    def __init__(self, motion_file, device, sample_dt=None):
+    def __init__(
+        self, motion_file, device, sample_dt=None, preload=False, num_workers=None
+    ):
+        """Library of the motions of motion_file, a motion file or a yaml list of motion files.
+
+        The motions are loaded lazily, in process, when first sampled. With preload,
+        they are all loaded here instead, by a pool of num_workers spawned processes
+        (os.cpu_count() if None).
+        """
         self._num_dof = 15
         self._device = device
         self._dataset_name_to_id = {}
+        self._num_workers = num_workers
         self._load_motions(motion_file)
+        if preload:
+            self._load_all_motions(use_pool=True)
         # root_pos, root_rot, root_vel, root_ang_vel, dof_pos, dof_vel
         self.observation_dim = 3 + 4 + 3 + 3 + self._num_dof + self._num_dof
         self._sample_dt = sample_dt
@@ -51,9 +81,13 @@ class MotionLib(object):
         return len(self._motions)
 
     def get_total_length(self):
+        self._load_all_motions()
         return sum(self._motion_lengths)
 
     def get_motion(self, motion_id):
+        if self._motions[motion_id] is None:
+            print("Loading motion file: {:s}".format(self._motion_files[motion_id]))
+            self._motions[motion_id] = MotionData(self._motion_files[motion_id])
         return self._motions[motion_id]
 
     def sample_motions(self, n) -> torch.Tensor:
@@ -63,6 +97,7 @@ class MotionLib(object):
         return motion_ids
 
     def sample_time(self, motion_ids, truncate_time=None):
+        self._load_all_motions()
         n = len(motion_ids)
         phase = np.random.uniform(low=0.0, high=1.0, size=motion_ids.shape)
 
@@ -76,109 +111,203 @@ class MotionLib(object):
         return motion_time
 
     def get_motion_length(self, motion_ids):
+        self._load_all_motions()
         return self._motion_lengths[motion_ids]
 
     def get_motion_state(self, motion_ids, motion_times, random_z_rot=False):
-        """Interpolate the motion-capture data to get motion state at arbitrary time"""
-        n = len(motion_ids)
-        root_pos = np.empty([n, 3])
-        root_rot = np.empty([n, 4])
-        root_vel = np.empty([n, 3])
-        root_ang_vel = np.empty([n, 3])
-        dof_pos = np.empty([n, self._num_dof])
-        dof_vel = np.empty([n, self._num_dof])
+        """Interpolate the motion-capture data to get motion state at arbitrary time.
 
-        if random_z_rot:
-            z_rots = {}
-            for id in range(len(motion_ids)):
-                z_rots[id] = np.random.uniform(-180, 180)
-
-        # TODO: Implement vectorized version
-        for i, (motion_id, motion_time) in enumerate(zip(motion_ids, motion_times)):
-            motion: MotionData = self.get_motion(motion_id)
-            frame_t = motion.calc_frame(motion_time)
-            frame_vel_t = motion.calc_frame_vel(motion_time)
-
-            rot_quat = frame_t[3:7]
-            tmp_root_pos = frame_t[:3]
-
-            if random_z_rot:
-                rot_euler = R.from_quat(rot_quat).as_euler("xyz", degrees=True)
-                rot_euler[2] += z_rots[i]
-                rot_quat = R.from_euler("xyz", rot_euler, degrees=True).as_quat()
-
-                # rotate root position too around z at origin
-                tmp_root_pos = (
-                    R.from_euler("z", z_rots[i], degrees=True).as_matrix()
-                    @ tmp_root_pos
-                )
+        Batched version of MotionData.calc_frame and calc_frame_vel, on the padded
+        motion tensors (see _build_motion_tensors). With random_z_rot, the root
+        position and rotation are rotated by a random yaw around the origin.
+        """
+        self._load_all_motions()
+        motion_ids = torch.as_tensor(motion_ids, dtype=torch.long, device=self._device)
+        motion_times = torch.as_tensor(
+            motion_times, dtype=torch.float64, device=self._device
+        )
+        f0, f1, blend, cycle_count = self._calc_blend_idx(motion_ids, motion_times)
+        blend = blend.to(torch.float).unsqueeze(-1)
 
-            root_rot[i, :] = rot_quat
-            root_pos[i, :] = tmp_root_pos
-            dof_pos[i, :] = frame_t[7:]
+        frame0 = self._frames[motion_ids, f0]
+        frame1 = self._frames[motion_ids, f1]
+        frame_vel0 = self._frame_vels[motion_ids, f0]
+        frame_vel1 = self._frame_vels[motion_ids, f1]
 
-            root_vel[i, :] = frame_vel_t[:3]
-            root_ang_vel[i, :] = frame_vel_t[3:6]
-            dof_vel[i, :] = frame_vel_t[6:]
+        root_pos = (1.0 - blend) * frame0[:, 0:3] + blend * frame1[:, 0:3]
+        root_rot = _standardize_quaternion(
+            quaternion_slerp(frame0[:, 3:7], frame1[:, 3:7], blend)
+        )
+        dof_pos = (1.0 - blend) * frame0[:, 7 : 7 + self._num_dof] + blend * frame1[
+            :, 7 : 7 + self._num_dof
+        ]
+        frame_vel = (1.0 - blend) * frame_vel0 + blend * frame_vel1
+
+        cycle_offset_pos, cycle_offset_rot = self._calc_cycle_offset(
+            motion_ids, cycle_count
+        )
+        root_pos = quat_rotate(cycle_offset_rot, root_pos) + cycle_offset_pos
+        root_rot = _standardize_quaternion(quat_mul(cycle_offset_rot, root_rot))
+        root_vel = quat_rotate(cycle_offset_rot, frame_vel[:, 0:3])
+        root_ang_vel = quat_rotate(cycle_offset_rot, frame_vel[:, 3:6])
+        dof_vel = frame_vel[:, 6 : 6 + self._num_dof]
 
-        root_pos = to_torch(root_pos, device=self._device)
-        root_rot = to_torch(root_rot, device=self._device)
-        dof_pos = to_torch(dof_pos, device=self._device)
-        root_vel = to_torch(root_vel, device=self._device)
-        root_ang_vel = to_torch(root_ang_vel, device=self._device)
-        dof_vel = to_torch(dof_vel, device=self._device)
+        if random_z_rot:
+            z_rots = np.random.uniform(-180, 180, size=len(motion_ids))
+            z_rots = torch.as_tensor(
+                np.radians(z_rots), dtype=torch.float, device=self._device
+            )
+            z_rot = _yaw_quaternion(z_rots)
+            root_rot = _standardize_quaternion(quat_mul(z_rot, root_rot))
+            # rotate root position too around z at origin
+            root_pos = quat_rotate(z_rot, root_pos)
 
         return root_pos, root_rot, dof_pos, root_vel, root_ang_vel, dof_vel
 
-    def _load_motions(self, motion_file):
-        self._motions = []
-        self._motion_lengths = []
-        self._motion_weights = []
-        self._motion_fps = []
-        self._motion_dt = []
-        self._motion_num_frames = []
-        self._motion_files = []
+    def _calc_blend_idx(self, motion_ids, motion_times):
+        """Batched MotionData.calc_blend_idx and calc_cycle_count, in float64."""
+        duration = self._motion_durations[motion_ids]
+        num_frames = self._motion_num_frames_t[motion_ids]
+        loop = self._motion_loop[motion_ids]
+
+        phase = motion_times / duration
+        cycle_count = torch.floor(phase).long()
+        phase = torch.where(loop, phase - torch.floor(phase), phase.clamp(0.0, 1.0))
+        cycle_count = torch.where(loop, cycle_count, cycle_count.clamp(0, 1))
+
+        f0 = (phase * (num_frames - 1)).long()
+        f1 = torch.minimum(f0 + 1, num_frames - 1)
+        frame_duration = self._motion_dt_t[motion_ids]
+        time0 = f0 * frame_duration
+        time1 = f1 * frame_duration
+        blend = (phase * duration - time0) / torch.where(
+            f1 > f0, time1 - time0, torch.ones_like(time0)
+        )
 
-        total_len = 0.0
+        # Clamped motions stay on their first/last frame out of [0, duration]
+        before = ~loop & (motion_times <= 0)
+        after = ~loop & (motion_times >= duration)
+        f0 = torch.where(before, 0, torch.where(after, num_frames - 1, f0))
+        f1 = torch.where(before, 0, torch.where(after, num_frames - 1, f1))
+        blend = torch.where(before | after, 0.0, blend)
+        return f0, f1, blend, cycle_count
+
+    def _calc_cycle_offset(self, motion_ids, cycle_count):
+        """Batched MotionData._calc_cycle_offset_pos and _calc_cycle_offset_rot."""
+        delta_pos = self._cycle_delta_pos[motion_ids]
+        delta_heading = self._cycle_delta_heading[motion_ids]
+        enable_pos = self._enable_cycle_offset_pos[motion_ids].unsqueeze(-1)
+        enable_rot = self._enable_cycle_offset_rot[motion_ids]
+
+        heading = torch.where(enable_rot, cycle_count * delta_heading, 0.0)
+        cycle_offset_rot = _yaw_quaternion(heading.to(torch.float))
+
+        # Sum of the cycle deltas rotated by i * delta_heading, for i < cycle_count:
+        # the rotation by (cycle_count - 1) * delta_heading / 2 of the delta, scaled
+        # by sin(cycle_count * delta_heading / 2) / sin(delta_heading / 2).
+        num_cycles = cycle_count.clamp(min=0).to(torch.float64)
+        half_heading = 0.5 * delta_heading
+        sin_half_heading = torch.sin(half_heading)
+        small = sin_half_heading.abs() < 1e-9
+        scale = torch.where(
+            small,
+            num_cycles,
+            torch.sin(num_cycles * half_heading)
+            / torch.where(small, 1.0, sin_half_heading),
+        )
+        rotated_offset_pos = quat_rotate(
+            _yaw_quaternion(((num_cycles - 1) * half_heading).to(torch.float)),
+            delta_pos,
+        ) * scale.to(torch.float).unsqueeze(-1)
+
+        cycle_offset_pos = torch.where(
+            enable_rot.unsqueeze(-1),
+            rotated_offset_pos,
+            cycle_count.to(torch.float).unsqueeze(-1) * delta_pos,
+        )
+        cycle_offset_pos = torch.where(
+            enable_pos, cycle_offset_pos, torch.zeros_like(cycle_offset_pos)
+        )
+        return cycle_offset_pos, cycle_offset_rot
 
-        motion_files, motion_weights = self._fetch_motion_files(motion_file)
-        num_motion_files = len(motion_files)
-        for f in range(num_motion_files):
-            curr_file = motion_files[f]
-            print(
-                "Loading {:d}/{:d} motion files: {:s}".format(
-                    f + 1, num_motion_files, curr_file
-                )
+    def _build_motion_tensors(self):
+        """Packs the frames of all the motions in tensors on the device, padded to
+        the longest motion, and the per motion values used by get_motion_state."""
+        num_motions = self.num_motions()
+        max_num_frames = self._motion_num_frames.max()
+        frame_size = max(motion.get_frame_size() for motion in self._motions)
+        frame_vel_size = max(motion.get_frame_vel_size() for motion in self._motions)
+        frames = np.zeros([num_motions, max_num_frames, frame_size])
+        frame_vels = np.zeros([num_motions, max_num_frames, frame_vel_size])
+        for i, motion in enumerate(self._motions):
+            motion_frames = motion.get_frames()
+            motion_frame_vels = motion.get_frame_vels()
+            frames[i, : len(motion_frames), : motion_frames.shape[1]] = motion_frames
+            frame_vels[i, : len(motion_frame_vels), : motion_frame_vels.shape[1]] = (
+                motion_frame_vels
             )
-            curr_motion = MotionData(curr_file)
-            motion_fps = curr_motion.get_fps()
-            curr_dt = curr_motion.get_frame_duration()
-
-            num_frames = curr_motion.get_num_frames()
-            curr_len = curr_motion.get_duration()
+        self._frames = to_torch(frames, device=self._device)
+        self._frame_vels = to_torch(frame_vels, device=self._device)
 
-            self._motion_fps.append(motion_fps)
-            self._motion_dt.append(curr_dt)
-            self._motion_num_frames.append(num_frames)
+        def per_motion(values, dtype):
+            return torch.tensor(np.array(values), dtype=dtype, device=self._device)
 
-            # TODO: Figure out what this is doing and replicate
-            # curr_dof_vels = self._compute_motion_dof_vels(curr_motion)
-            # curr_motion.dof_vels = curr_dof_vels
+        self._motion_durations = per_motion(self._motion_lengths, torch.float64)
+        self._motion_dt_t = per_motion(self._motion_dt, torch.float64)
+        self._motion_num_frames_t = per_motion(self._motion_num_frames, torch.long)
+        self._motion_loop = per_motion(
+            [motion.enable_loop() for motion in self._motions], torch.bool
+        )
+        self._enable_cycle_offset_pos = per_motion(
+            [motion._enable_cycle_offset_pos for motion in self._motions], torch.bool
+        )
+        self._enable_cycle_offset_rot = per_motion(
+            [motion._enable_cycle_offset_rot for motion in self._motions], torch.bool
+        )
+        self._cycle_delta_pos = per_motion(
+            [motion._cycle_delta_pos for motion in self._motions], torch.float
+        )
+        self._cycle_delta_heading = per_motion(
+            [motion._cycle_delta_heading for motion in self._motions], torch.float64
+        )
 
-            self._motions.append(curr_motion)
-            self._motion_lengths.append(curr_len)
+    def _load_motions(self, motion_file):
+        """Lists the motion files and their weights, the motions are loaded by _load_all_motions."""
+        motion_files, motion_weights = self._fetch_motion_files(motion_file)
+        self._motion_files = motion_files
+        self._motions = [None] * len(motion_files)
+        self._motion_weights = np.array(motion_weights, dtype=np.float64)
+        self._motion_weights /= np.sum(self._motion_weights)
+        self._motion_lengths = None
 
-            curr_weight = motion_weights[f]
-            self._motion_weights.append(curr_weight)
-            self._motion_files.append(curr_file)
+    def _load_all_motions(self, use_pool=False):
+        """Loads the motions not loaded yet, and the per motion values and tensors.
 
-        self._motion_lengths = np.array(self._motion_lengths)
-        self._motion_weights = np.array(self._motion_weights)
-        self._motion_weights /= np.sum(self._motion_weights)
+        With use_pool, the motions are loaded by a pool of spawned processes. The lazy
+        loads happen in process: they can run mid-training, when forking after CUDA,
+        torch or OpenMP threads started could deadlock.
+        """
+        if self._motion_lengths is not None:
+            return
+
+        missing_ids = [i for i, motion in enumerate(self._motions) if motion is None]
+        missing_files = [self._motion_files[i] for i in missing_ids]
+        print("Loading {:d} motion files".format(len(missing_files)))
+        if use_pool and len(missing_files) > 1 and self._num_workers != 1:
+            with concurrent.futures.ProcessPoolExecutor(
+                self._num_workers, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                motions = list(pool.map(MotionData, missing_files))
+        else:
+            motions = [MotionData(f) for f in missing_files]
+        for i, motion in zip(missing_ids, motions):
+            self._motions[i] = motion
 
-        self._motion_fps = np.array(self._motion_fps)
-        self._motion_dt = np.array(self._motion_dt)
-        self._motion_num_frames = np.array(self._motion_num_frames)
+        self._motion_fps = np.array([m.get_fps() for m in self._motions])
+        self._motion_dt = np.array([m.get_frame_duration() for m in self._motions])
+        self._motion_num_frames = np.array([m.get_num_frames() for m in self._motions])
+        self._motion_lengths = np.array([m.get_duration() for m in self._motions])
+        self._build_motion_tensors()
 
         num_motions = self.num_motions()
         total_len = self.get_total_length()
@@ -222,7 +351,6 @@ class MotionLib(object):
 
         return motion_files, motion_weights
 
-    # TODO this is probably the culprit
     def feed_forward_generator(self, nb_mini_batch, mini_batch_size):
         """Generates a batch of AMP transitions."""
         for _ in range(nb_mini_batch):
@@ -233,15 +361,7 @@ class MotionLib(object):
             )
 
             s = torch.cat(
-                [
-                    root_pos.copy(),
-                    root_rot.copy(),
-                    dof_pos.copy(),
-                    root_vel.copy(),
-                    root_ang_vel.copy(),
-                    dof_vel.copy(),
-                ],
-                dim=1,
+                [root_pos, root_rot, dof_pos, root_vel, root_ang_vel, dof_vel], dim=1
             )
 
             if self._sample_dt is not None:
@@ -253,15 +373,7 @@ class MotionLib(object):
             )
 
             s_next = torch.cat(
-                [
-                    root_pos.copy(),
-                    root_rot.copy(),
-                    dof_pos.copy(),
-                    root_vel.copy(),
-                    root_ang_vel.copy(),
-                    dof_vel.copy(),
-                ],
-                dim=1,
+                [root_pos, root_rot, dof_pos, root_vel, root_ang_vel, dof_vel], dim=1
             )
             yield s, s_next
 
@@ -283,6 +395,11 @@ class MotionData(object):
     _ENABLE_CYCLE_OFFSET_POSITION_KEY = "EnableCycleOffsetPosition"
     _ENABLE_CYCLE_OFFSET_ROTATION_KEY = "EnableCycleOffsetRotation"
 
+    # The processed frames and frame velocities are cached next to the motion file.
+    # Increment the version when changing how they are computed.
+    _CACHE_SUFFIX = ".cache.npz"
+    _CACHE_VERSION = 1
+
     def __init__(self, motion_file):
         """Initialize motion data.
         Args:
@@ -310,41 +427,103 @@ class MotionData(object):
         """
 
         logging.info("Loading motion from: {:s}".format(motion_file))
-        with open(motion_file, "r") as f:
-            motion_json = json.load(f)
-
-            self._loop_mode = LoopMode[motion_json[self._LOOP_MODE_KEY]]
-            self._frame_duration = float(motion_json[self._FRAME_DURATION_KEY])
-
-            if self._ENABLE_CYCLE_OFFSET_POSITION_KEY in motion_json:
-                self._enable_cycle_offset_pos = bool(
-                    motion_json[self._ENABLE_CYCLE_OFFSET_POSITION_KEY]
-                )
-            else:
-                self._enable_cycle_offset_pos = False
+        with open(motion_file, "rb") as f:
+            motion_content = f.read()
+        source_hash = hashlib.sha1(motion_content).hexdigest()
+        cache_file = motion_file + self._CACHE_SUFFIX
+        if self._load_cache(cache_file, source_hash):
+            logging.info("Loaded motion from cache {:s}.".format(cache_file))
+            return
+
+        motion_json = json.loads(motion_content)
+
+        self._loop_mode = LoopMode[motion_json[self._LOOP_MODE_KEY]]
+        self._frame_duration = float(motion_json[self._FRAME_DURATION_KEY])
+
+        if self._ENABLE_CYCLE_OFFSET_POSITION_KEY in motion_json:
+            self._enable_cycle_offset_pos = bool(
+                motion_json[self._ENABLE_CYCLE_OFFSET_POSITION_KEY]
+            )
+        else:
+            self._enable_cycle_offset_pos = False
 
-            if self._ENABLE_CYCLE_OFFSET_ROTATION_KEY in motion_json:
-                self._enable_cycle_offset_rot = bool(
-                    motion_json[self._ENABLE_CYCLE_OFFSET_ROTATION_KEY]
-                )
-            else:
-                self._enable_cycle_offset_rot = False
+        if self._ENABLE_CYCLE_OFFSET_ROTATION_KEY in motion_json:
+            self._enable_cycle_offset_rot = bool(
+                motion_json[self._ENABLE_CYCLE_OFFSET_ROTATION_KEY]
+            )
+        else:
+            self._enable_cycle_offset_rot = False
 
-            self._frames = np.array(motion_json[self._FRAMES_KEY])
-            self._postprocess_frames(self._frames)
+        self._frames = np.array(motion_json[self._FRAMES_KEY])
+        self._postprocess_frames(self._frames)
 
-            self._frame_vels = self._calc_frame_vels()
+        self._frame_vels = self._calc_frame_vels()
 
-            assert self._frames.shape[0] > 0, "Must have at least 1 frame."
-            assert (
-                self._frames.shape[1] > self.POS_SIZE + self.ROT_SIZE
-            ), "Frames have too few degrees of freedom."
-            assert self._frame_duration > 0, "Frame duration must be positive."
+        assert self._frames.shape[0] > 0, "Must have at least 1 frame."
+        assert (
+            self._frames.shape[1] > self.POS_SIZE + self.ROT_SIZE
+        ), "Frames have too few degrees of freedom."
+        assert self._frame_duration > 0, "Frame duration must be positive."
 
-            logging.info("Loaded motion from {:s}.".format(motion_file))
+        self._save_cache(cache_file, source_hash)
+        logging.info("Loaded motion from {:s}.".format(motion_file))
 
         return
 
+    def _load_cache(self, cache_file, source_hash):
+        """Loads the motion from cache_file, if it is a cache of the same version
+        computed from a motion file with the same content hash.
+        Returns:
+          Boolean indicating if the motion was loaded.
+        """
+        if not os.path.isfile(cache_file):
+            return False
+        try:
+            with np.load(cache_file) as cache:
+                if (
+                    int(cache["version"]) != self._CACHE_VERSION
+                    or str(cache["source_hash"]) != source_hash
+                ):
+                    return False
+                self._loop_mode = LoopMode[str(cache["loop_mode"])]
+                self._frame_duration = float(cache["frame_duration"])
+                self._enable_cycle_offset_pos = bool(cache["enable_cycle_offset_pos"])
+                self._enable_cycle_offset_rot = bool(cache["enable_cycle_offset_rot"])
+                self._frames = cache["frames"]
+                self._frame_vels = cache["frame_vels"]
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            logging.warning("Ignoring invalid motion cache {:s}.".format(cache_file))
+            return False
+        return True
+
+    def _save_cache(self, cache_file, source_hash):
+        """Writes the motion to cache_file. It is first written under a temporary
+        name and then renamed, so concurrent loads never read a partial cache."""
+        try:
+            fd, tmp_file = tempfile.mkstemp(
+                suffix=self._CACHE_SUFFIX, dir=os.path.dirname(cache_file) or "."
+            )
+        except OSError:
+            logging.warning("Cannot write the motion cache {:s}.".format(cache_file))
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=self._CACHE_VERSION,
+                    source_hash=source_hash,
+                    loop_mode=self._loop_mode.name,
+                    frame_duration=self._frame_duration,
+                    enable_cycle_offset_pos=self._enable_cycle_offset_pos,
+                    enable_cycle_offset_rot=self._enable_cycle_offset_rot,
+                    frames=self._frames,
+                    frame_vels=self._frame_vels,
+                )
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            logging.warning("Cannot write the motion cache {:s}.".format(cache_file))
+            os.remove(tmp_file)
+
     def get_num_frames(self):
         """Get the number of frames in the motion data.
         Returns:
@@ -398,6 +577,13 @@ class MotionData(object):
         """
         return self._frame_vels[f, :]
 
+    def get_frame_vels(self):
+        """Get the velocities of all frames.
+        Returns:
+          All frame velocities in reference motion.
+        """
+        return self._frame_vels
+
     def get_frame_time(self, f):
         """Get the start time of a specified frame
         Args:
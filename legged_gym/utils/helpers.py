@@ -245,45 +245,35 @@ def export_policy_as_jit(actor_critic, path, rma=False):
         exporter.export(path)
     else:
         os.makedirs(path, exist_ok=True)
-        # path = os.path.join(path, "policy_1.pt")
         model = copy.deepcopy(actor_critic.actor).to("cpu")
         traced_script_module = torch.jit.script(model)
-        # traced_script_module.save(path)
+        traced_script_module.save(os.path.join(path, "policy_1.pt"))
+
+        # The input sizes come from the first layers: with RMA, the actor takes the
+        # observations and the latent of the adaptation module, which takes the history
+        export_onnx(model, "ONNX.onnx", "obs", "actions")
 
         if rma:
             adaptation_module = copy.deepcopy(actor_critic.adaptation_module).to("cpu")
             traced_script_module_adaptation = torch.jit.script(adaptation_module)
-
-        nb_obs = 51
-        nb_history_steps = 15
-        nb_latent = 18
-
-        if rma:
-            dummy_input_model = torch.zeros((nb_obs + nb_latent), device="cpu")
-            dummy_input_model_adaptation = torch.zeros(
-                (nb_obs * nb_history_steps), device="cpu"
-            )
-        else:
-            dummy_input_model = torch.zeros((nb_obs), device="cpu")
-
-        torch.onnx.export(
-            traced_script_module,
-            dummy_input_model,
-            "ONNX.onnx",
-            verbose=True,
-            input_names=["obs"],
-            output_names=["actions"],
-        )
-
-        if rma:
-            torch.onnx.export(
-                traced_script_module_adaptation,
-                dummy_input_model_adaptation,
-                "ADAPTATION.onnx",
-                verbose=True,
-                input_names=["obs_history"],
-                output_names=["latent"],
+            traced_script_module_adaptation.save(
+                os.path.join(path, "adaptation_module_1.pt")
             )
+            export_onnx(adaptation_module, "ADAPTATION.onnx", "obs_history", "latent")
+
+
+def export_onnx(model, path, input_name, output_name):
+    """Exports an MLP to ONNX with a dynamic batch axis, to run it on batches of inputs."""
+    dummy_input = torch.zeros(1, model[0].in_features)
+    torch.onnx.export(
+        model,
+        dummy_input,
+        path,
+        verbose=True,
+        input_names=[input_name],
+        output_names=[output_name],
+        dynamic_axes={input_name: {0: "batch"}, output_name: {0: "batch"}},
+    )
 
 
 class PolicyExporterLSTM(torch.nn.Module):
@@ -1,3 +1,4 @@
 from legged_gym.utils.kinematics.urdf import *
 from legged_gym.utils.kinematics.transforms import *
 from legged_gym.utils.kinematics.chain import *
+from legged_gym.utils.kinematics.batched_fk import *
@@ -0,0 +1,100 @@
+import torch
+
+
+def _rotate(rot, vec):
+    return (rot * vec.unsqueeze(-2)).sum(-1)
+
+
+class BatchedSerialChainFK(object):
+    """End effector positions of several serial chains, for a batch of joint states.
+
+    The fixed part of every chain (joint offsets, axes, types and end link
+    offset) is extracted once from the SerialChain objects and stacked into
+    tensors, chains being padded with fixed identity frames to the same length.
+    forward_kinematics then evaluates all chains for all envs at once, with one
+    batched rotation-vector product per frame, instead of building and
+    composing Transform3d objects joint by joint.
+    """
+
+    def __init__(self, chains, joint_indices, device="cpu", compile=False):
+        """
+        Args:
+            chains: SerialChain objects (see kinematics.urdf.build_serial_chain_from_urdf).
+            joint_indices: For each chain, the indices in the joint position vector
+                of its movable joints, in chain order.
+            device: Device of the joint positions.
+            compile: Compile the evaluation with torch.compile (torch >= 2.0).
+        """
+        num_frames = max(len(chain._serial_frames) for chain in chains)
+        eye = torch.eye(4)
+        offsets = eye.repeat(len(chains), num_frames, 1, 1)
+        end_offsets = eye.repeat(len(chains), 1, 1)
+        axes = torch.zeros(len(chains), num_frames, 3)
+        revolute = torch.zeros(len(chains), num_frames)
+        prismatic = torch.zeros(len(chains), num_frames)
+        dof_idx = torch.zeros(len(chains), num_frames, dtype=torch.long)
+        for c, (chain, indices) in enumerate(zip(chains, joint_indices)):
+            if len(indices) != len(chain.get_joint_parameter_names()):
+                raise ValueError(
+                    "Chain %d has %d movable joints, got %d joint indices."
+                    % (c, len(chain.get_joint_parameter_names()), len(indices))
+                )
+            cnt = 0
+            for f, frame in enumerate(chain._serial_frames):
+                offsets[c, f] = frame.joint.offset.get_matrix()[0].cpu()
+                if frame.joint.joint_type == "fixed":
+                    continue
+                axes[c, f] = frame.joint.axis.cpu()
+                if frame.joint.joint_type == "revolute":
+                    revolute[c, f] = 1.0
+                else:
+                    prismatic[c, f] = 1.0
+                dof_idx[c, f] = indices[cnt]
+                cnt += 1
+            end_offsets[c] = chain._serial_frames[-1].link.offset.get_matrix()[0].cpu()
+
+        self.device = device
+        self.num_chains = len(chains)
+        self.offset_rot = offsets[..., :3, :3].to(device)
+        self.offset_pos = offsets[..., :3, 3].to(device)
+        self.end_pos = end_offsets[..., :3, 3].to(device)
+        self.revolute = revolute.to(device)
+        self.prismatic = prismatic.to(device)
+        self.dof_idx = dof_idx.to(device)
+        # Rodrigues' rotation formula, premultiplied by the offset rotation:
+        # R_offset @ R(axis, angle) = R_offset + sin(angle) R_offset K + (1 - cos(angle)) R_offset K^2
+        x, y, z = axes.to(device).unbind(-1)
+        zeros = torch.zeros_like(x)
+        skew = torch.stack((zeros, -z, y, z, zeros, -x, -y, x, zeros), dim=-1)
+        skew = skew.view(*x.shape, 3, 3)
+        self.offset_rot_skew = self.offset_rot @ skew
+        self.offset_rot_skew_sq = self.offset_rot_skew @ skew
+        self.offset_axes = _rotate(self.offset_rot, axes.to(device))
+
+        self._forward_kinematics = self._positions
+        if compile and hasattr(torch, "compile"):
+            self._forward_kinematics = torch.compile(self._positions)
+
+    def _positions(self, joint_pos):
+        theta = joint_pos[:, self.dof_idx]  # [num_envs, num_chains, num_frames]
+        angle = (theta * self.revolute).unsqueeze(-1).unsqueeze(-1)
+        # Frame transform: joint offset followed by the joint motion, with the
+        # offset rotation folded into the precomputed Rodrigues terms
+        frame_rot = (
+            self.offset_rot
+            + torch.sin(angle) * self.offset_rot_skew
+            + (1.0 - torch.cos(angle)) * self.offset_rot_skew_sq
+        )
+        frame_pos = (theta * self.prismatic).unsqueeze(-1) * self.offset_axes
+        frame_pos = frame_pos + self.offset_pos
+
+        # Only the position is needed: map the end link origin back to the root
+        # frame by frame, which takes rotation-vector products only
+        pos = self.end_pos
+        for f in reversed(range(frame_rot.shape[2])):
+            pos = frame_pos[:, :, f] + _rotate(frame_rot[:, :, f], pos)
+        return pos
+
+    def forward_kinematics(self, joint_pos):
+        """Returns the [num_envs, num_chains, 3] end effector positions in the chains' root frame."""
+        return self._forward_kinematics(joint_pos)
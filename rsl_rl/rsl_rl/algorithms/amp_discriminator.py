@@ -37,15 +37,18 @@ class AMPDiscriminator(nn.Module):
                          expert_state,
                          expert_next_state,
                          lambda_=10):
-        expert_data = torch.cat([expert_state, expert_next_state], dim=-1)
+        expert_data = torch.cat([expert_state, expert_next_state], dim=-1).float()
         expert_data.requires_grad = True
 
-        disc = self.amp_linear(self.trunk(expert_data))
-        ones = torch.ones(disc.size(), device=disc.device)
-        grad = autograd.grad(
-            outputs=disc, inputs=expert_data,
-            grad_outputs=ones, create_graph=True,
-            retain_graph=True, only_inputs=True)[0]
+        # The penalty backpropagates through an input gradient, which easily
+        # underflows or overflows in reduced precision: always use float32.
+        with torch.autocast(device_type=expert_data.device.type, enabled=False):
+            disc = self.amp_linear(self.trunk(expert_data))
+            ones = torch.ones(disc.size(), device=disc.device)
+            grad = autograd.grad(
+                outputs=disc, inputs=expert_data,
+                grad_outputs=ones, create_graph=True,
+                retain_graph=True, only_inputs=True)[0]
 
         # Enforce that the grad norm approaches 0.
         grad_pen = lambda_ * (grad.norm(2, dim=1) - 0).pow(2).mean()
@@ -28,6 +28,9 @@
 #
 # Copyright (c) 2021 ETH Zurich, Nikita Rudin
 
+import contextlib
+import copy
+
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -61,12 +64,21 @@ class AMPPPO:
         desired_kl=0.01,
         device="cpu",
         amp_replay_buffer_size=100000,
+        amp_replay_buffer_storage="device",
+        amp_replay_buffer_dtype=None,
+        amp_replay_buffer_predraw=False,
+        amp_replay_buffer_sampling="uniform",
+        amp_replay_buffer_recency_decay=1.0,
+        amp_replay_buffer_priority_alpha=0.0,
         min_std=None,
         disc_grad_penalty=10.0,
         disc_coef=5,
         bounds_loss_coef=None,
         num_rma_obs=0,
         num_history_obs=0,
+        policy_lag_ratio_clip=1.0,
+        mixed_precision=None,
+        fused_optimizer=False,
     ):
         self.device = device
 
@@ -79,8 +91,21 @@ class AMPPPO:
         self.discriminator = discriminator
         self.discriminator.to(self.device)
         self.amp_transition = RolloutStorage.Transition()
+        # Storage: "device" or "pinned" (host), dtype: None (float32) or e.g. "float16"
         self.amp_storage = ReplayBuffer(
-            discriminator.input_dim // 2, amp_replay_buffer_size, device
+            discriminator.input_dim // 2,
+            amp_replay_buffer_size,
+            device,
+            storage=amp_replay_buffer_storage,
+            dtype=(
+                getattr(torch, amp_replay_buffer_dtype)
+                if amp_replay_buffer_dtype is not None
+                else None
+            ),
+            predraw=amp_replay_buffer_predraw,
+            sampling=amp_replay_buffer_sampling,
+            recency_decay=amp_replay_buffer_recency_decay,
+            priority_alpha=amp_replay_buffer_priority_alpha,
         )
         self.amp_data = amp_data
         self.amp_normalizer = amp_normalizer
@@ -90,6 +115,16 @@ class AMPPPO:
         self.actor_critic.to(self.device)
         self.storage = None  # initialized later
 
+        # Policy used to collect rollouts and the storage it writes to. They are
+        # the learner's own unless pipelining is enabled.
+        self.pipelined = False
+        self.policy_lag_ratio_clip = policy_lag_ratio_clip
+        self.acting_actor_critic = self.actor_critic
+        self.acting_discriminator = self.discriminator
+        self.acting_amp_normalizer = self.amp_normalizer
+        self.rollout_storage = None
+        self.pending_amp_transitions = []
+
         # Optimizer for policy and discriminator.
         params = [
             {"params": self.actor_critic.parameters(), "name": "actor_critic"},
@@ -104,7 +139,26 @@ class AMPPPO:
                 "name": "amp_head",
             },
         ]
-        self.optimizer = optim.Adam(params, lr=learning_rate)
+        # Mixed precision: None, "float16" (with loss scaling) or "bfloat16"
+        self.mixed_precision_dtype = (
+            getattr(torch, mixed_precision) if mixed_precision is not None else None
+        )
+        # Loss scaling for float16 only, torch.amp.GradScaler is torch >= 2.3
+        self.scaler = None
+        if self.mixed_precision_dtype == torch.float16:
+            if hasattr(getattr(torch, "amp", None), "GradScaler"):
+                self.scaler = torch.amp.GradScaler(torch.device(self.device).type)
+            else:
+                self.scaler = torch.cuda.amp.GradScaler()
+        # With a fused Adam the adaptive learning rate is kept on the device, so
+        # that the KL schedule does not sync every mini-batch.
+        self.fused_optimizer = fused_optimizer
+        self.learning_rate_t = None
+        if fused_optimizer:
+            self.learning_rate_t = torch.tensor(learning_rate, device=self.device)
+            self.optimizer = optim.Adam(params, lr=self.learning_rate_t, fused=True)
+        else:
+            self.optimizer = optim.Adam(params, lr=learning_rate)
         self.transition = RolloutStorage.Transition()
 
         # PPO parameters
@@ -127,9 +181,17 @@ class AMPPPO:
 
         # adaptation module parameters
         self.adaptation_module_learning_rate = 1.0e-3
-        self.adaptation_module_optimizer = optim.Adam(
-            self.actor_critic.parameters(), lr=self.adaptation_module_learning_rate
-        )
+        if fused_optimizer:
+            self.adaptation_module_optimizer = optim.Adam(
+                self.actor_critic.parameters(),
+                lr=self.adaptation_module_learning_rate,
+                fused=True,
+            )
+        else:
+            self.adaptation_module_optimizer = optim.Adam(
+                self.actor_critic.parameters(),
+                lr=self.adaptation_module_learning_rate,
+            )
         self.num_adaptation_module_substeps = 1
 
     def init_storage(
@@ -150,6 +212,41 @@ class AMPPPO:
             num_rma_obs=self.num_rma_obs,
             num_history_obs=self.num_history_obs,
         )
+        self.rollout_storage = self.storage
+
+    def enable_pipelining(self):
+        """Collects rollouts with a snapshot of the policy while update() runs.
+
+        Rollouts are written to a second storage, swapped with the learner's one by
+        swap_storage(), and the AMP transitions they produce are only inserted in
+        the replay buffer by flush_amp_transitions(). Must be called after
+        init_storage().
+        """
+        if self.actor_critic.is_recurrent:
+            raise ValueError("Pipelined rollouts do not support recurrent policies.")
+        self.pipelined = True
+        self.acting_actor_critic = copy.deepcopy(self.actor_critic)
+        self.acting_discriminator = copy.deepcopy(self.discriminator)
+        self.acting_amp_normalizer = copy.deepcopy(self.amp_normalizer)
+        self.rollout_storage = copy.deepcopy(self.storage)
+
+    def sync_acting_policy(self):
+        """Copies the learner's weights into the policy used to collect rollouts."""
+        if not self.pipelined:
+            return
+        self.acting_actor_critic.load_state_dict(self.actor_critic.state_dict())
+        self.acting_discriminator.load_state_dict(self.discriminator.state_dict())
+        if self.amp_normalizer is not None:
+            self.acting_amp_normalizer.load_state_dict(self.amp_normalizer.state_dict())
+
+    def swap_storage(self):
+        """Hands the last collected rollout to the learner."""
+        self.storage, self.rollout_storage = self.rollout_storage, self.storage
+
+    def flush_amp_transitions(self):
+        for states, next_states in self.pending_amp_transitions:
+            self.amp_storage.insert(states, next_states)
+        self.pending_amp_transitions.clear()
 
     def test_mode(self):
         self.actor_critic.test()
@@ -158,22 +255,23 @@ class AMPPPO:
         self.actor_critic.train()
 
     def act(self, obs, critic_obs, amp_obs, rma_obs=None, obs_history=None):
-        if self.actor_critic.is_recurrent:
-            self.transition.hidden_states = self.actor_critic.get_hidden_states()
+        actor_critic = self.acting_actor_critic
+        if actor_critic.is_recurrent:
+            self.transition.hidden_states = actor_critic.get_hidden_states()
         # Compute the actions and values
         aug_obs, aug_critic_obs = obs.detach(), critic_obs.detach()
         aug_rma_obs = None
         if rma_obs is not None:
             aug_rma_obs = rma_obs.detach()
-        self.transition.actions = self.actor_critic.act(aug_obs, aug_rma_obs).detach()
-        self.transition.values = self.actor_critic.evaluate(
+        self.transition.actions = actor_critic.act(aug_obs, aug_rma_obs).detach()
+        self.transition.values = actor_critic.evaluate(
             aug_critic_obs, aug_rma_obs
         ).detach()
-        self.transition.actions_log_prob = self.actor_critic.get_actions_log_prob(
+        self.transition.actions_log_prob = actor_critic.get_actions_log_prob(
             self.transition.actions
         ).detach()
-        self.transition.action_mean = self.actor_critic.action_mean.detach()
-        self.transition.action_sigma = self.actor_critic.action_std.detach()
+        self.transition.action_mean = actor_critic.action_mean.detach()
+        self.transition.action_sigma = actor_critic.action_std.detach()
         # need to record obs and critic_obs before env.step()
         self.transition.observations = obs
         self.transition.critic_observations = critic_obs
@@ -194,13 +292,19 @@ class AMPPPO:
             )
 
         not_done_idxs = (dones == False).nonzero().squeeze()
-        self.amp_storage.insert(self.amp_transition.observations, amp_obs)
+        if self.pipelined:
+            # The replay buffer is being sampled by update()
+            self.pending_amp_transitions.append(
+                (self.amp_transition.observations, amp_obs)
+            )
+        else:
+            self.amp_storage.insert(self.amp_transition.observations, amp_obs)
 
         # Record the transition
-        self.storage.add_transitions(self.transition)
+        self.rollout_storage.add_transitions(self.transition)
         self.transition.clear()
         self.amp_transition.clear()
-        self.actor_critic.reset(dones)
+        self.acting_actor_critic.reset(dones)
 
     def compute_returns(self, last_critic_obs, last_rma_obs):
         aug_last_critic_obs = last_critic_obs.detach()
@@ -211,6 +315,33 @@ class AMPPPO:
             aug_last_critic_obs, aug_last_rma_obs
         ).detach()
         self.storage.compute_returns(last_values, self.gamma, self.lam)
+        if self.pipelined:
+            self.correct_policy_lag()
+
+    def correct_policy_lag(self):
+        """Re-bases a rollout collected by the previous policy snapshot.
+
+        PPO then clips its ratio against the current policy, while the advantages
+        are weighted by the importance ratio between the current and the
+        behavior policy, truncated at policy_lag_ratio_clip.
+        """
+        storage = self.storage
+        rma_obs = None
+        if storage.rma_observations is not None:
+            rma_obs = storage.rma_observations.flatten(0, 1)
+        self.actor_critic.update_distribution(
+            storage.observations.flatten(0, 1), rma_obs
+        )
+        actions_log_prob = self.actor_critic.get_actions_log_prob(
+            storage.actions.flatten(0, 1)
+        ).view_as(storage.actions_log_prob)
+        ratio = torch.exp(actions_log_prob - storage.actions_log_prob)
+        storage.advantages = storage.advantages * torch.clamp(
+            ratio, max=self.policy_lag_ratio_clip
+        )
+        storage.actions_log_prob.copy_(actions_log_prob)
+        storage.mu.copy_(self.actor_critic.action_mean.view_as(storage.mu))
+        storage.sigma.copy_(self.actor_critic.action_std.view_as(storage.sigma))
 
     def bound_loss(self, mu):
         if self.bounds_loss_coef is not None:
@@ -226,14 +357,23 @@ class AMPPPO:
             b_loss = 0
         return b_loss
 
+    def autocast(self):
+        if self.mixed_precision_dtype is None:
+            return contextlib.nullcontext()
+        return torch.autocast(
+            device_type=torch.device(self.device).type,
+            dtype=self.mixed_precision_dtype,
+        )
+
     def update(self):
-        mean_value_loss = 0
-        mean_surrogate_loss = 0
-        mean_amp_loss = 0
-        mean_grad_pen_loss = 0
-        mean_policy_pred = 0
-        mean_expert_pred = 0
-        mean_adaptation_module_loss = 0
+        # Accumulated on the device, synced once at the end of the update
+        mean_value_loss = torch.zeros((), device=self.device)
+        mean_surrogate_loss = torch.zeros((), device=self.device)
+        mean_amp_loss = torch.zeros((), device=self.device)
+        mean_grad_pen_loss = torch.zeros((), device=self.device)
+        mean_policy_pred = torch.zeros((), device=self.device)
+        mean_expert_pred = torch.zeros((), device=self.device)
+        mean_adaptation_module_loss = torch.zeros((), device=self.device)
 
         if self.actor_critic.is_recurrent:
             generator = self.storage.reccurent_mini_batch_generator(
@@ -274,133 +414,161 @@ class AMPPPO:
                 hid_states_batch,
                 masks_batch,
             ) = sample
-            aug_obs_batch = obs_batch.detach()
-            self.actor_critic.act(
-                aug_obs_batch,
-                rma_obs_batch,
-                masks=masks_batch,
-                hidden_states=hid_states_batch[0],
-            )
-            actions_log_prob_batch = self.actor_critic.get_actions_log_prob(
-                actions_batch
-            )
-            aug_critic_obs_batch = critic_obs_batch.detach()
-            value_batch = self.actor_critic.evaluate(
-                aug_critic_obs_batch,
-                rma_obs_batch,
-                masks=masks_batch,
-                hidden_states=hid_states_batch[1],
-            )
-            mu_batch = self.actor_critic.action_mean
-            sigma_batch = self.actor_critic.action_std
-            entropy_batch = self.actor_critic.entropy
-
-            # KL
-            if self.desired_kl != None and self.schedule == "adaptive":
-                with torch.inference_mode():
-                    kl = torch.sum(
-                        torch.log(sigma_batch / old_sigma_batch + 1.0e-5)
-                        + (
-                            torch.square(old_sigma_batch)
-                            + torch.square(old_mu_batch - mu_batch)
+            with self.autocast():
+                aug_obs_batch = obs_batch.detach()
+                self.actor_critic.act(
+                    aug_obs_batch,
+                    rma_obs_batch,
+                    masks=masks_batch,
+                    hidden_states=hid_states_batch[0],
+                )
+                actions_log_prob_batch = self.actor_critic.get_actions_log_prob(
+                    actions_batch
+                )
+                aug_critic_obs_batch = critic_obs_batch.detach()
+                value_batch = self.actor_critic.evaluate(
+                    aug_critic_obs_batch,
+                    rma_obs_batch,
+                    masks=masks_batch,
+                    hidden_states=hid_states_batch[1],
+                )
+                mu_batch = self.actor_critic.action_mean
+                sigma_batch = self.actor_critic.action_std
+                entropy_batch = self.actor_critic.entropy
+
+                # KL
+                if self.desired_kl != None and self.schedule == "adaptive":
+                    with torch.inference_mode():
+                        kl = torch.sum(
+                            torch.log(sigma_batch / old_sigma_batch + 1.0e-5)
+                            + (
+                                torch.square(old_sigma_batch)
+                                + torch.square(old_mu_batch - mu_batch)
+                            )
+                            / (2.0 * torch.square(sigma_batch))
+                            - 0.5,
+                            axis=-1,
                         )
-                        / (2.0 * torch.square(sigma_batch))
-                        - 0.5,
-                        axis=-1,
-                    )
-                    kl_mean = torch.mean(kl)
-
-                    if kl_mean > self.desired_kl * 2.0:
-                        self.learning_rate = max(1e-5, self.learning_rate / 1.5)
-                    elif kl_mean < self.desired_kl / 2.0 and kl_mean > 0.0:
-                        self.learning_rate = min(1e-2, self.learning_rate * 1.5)
-
-                    for param_group in self.optimizer.param_groups:
-                        param_group["lr"] = self.learning_rate
-
-            # Surrogate loss
-            ratio = torch.exp(
-                actions_log_prob_batch - torch.squeeze(old_actions_log_prob_batch)
-            )
-            surrogate = -torch.squeeze(advantages_batch) * ratio
-            surrogate_clipped = -torch.squeeze(advantages_batch) * torch.clamp(
-                ratio, 1.0 - self.clip_param, 1.0 + self.clip_param
-            )
-            surrogate_loss = torch.max(surrogate, surrogate_clipped).mean()
-
-            # Value function loss
-            if self.use_clipped_value_loss:
-                value_clipped = target_values_batch + (
-                    value_batch - target_values_batch
-                ).clamp(-self.clip_param, self.clip_param)
-                value_losses = (value_batch - returns_batch).pow(2)
-                value_losses_clipped = (value_clipped - returns_batch).pow(2)
-                value_loss = torch.max(value_losses, value_losses_clipped).mean()
-            else:
-                value_loss = (returns_batch - value_batch).pow(2).mean()
-
-            # Discriminator loss.
-            policy_state, policy_next_state = sample_amp_policy
-            expert_state, expert_next_state = sample_amp_expert
-
-            policy_state_unnorm = torch.clone(policy_state)
-            expert_state_unnorm = torch.clone(expert_state)
-
-            if self.amp_normalizer is not None:
-                with torch.no_grad():
-                    policy_state = self.amp_normalizer.normalize_torch(
-                        policy_state, self.device
-                    )
-                    policy_next_state = self.amp_normalizer.normalize_torch(
-                        policy_next_state, self.device
-                    )
-                    expert_state = self.amp_normalizer.normalize_torch(
-                        expert_state, self.device
-                    )
-                    expert_next_state = self.amp_normalizer.normalize_torch(
-                        expert_next_state, self.device
-                    )
-            policy_d = self.discriminator(
-                torch.cat([policy_state, policy_next_state], dim=-1)
-            )
-            expert_d = self.discriminator(
-                torch.cat([expert_state, expert_next_state], dim=-1)
-            )
-            expert_loss = torch.nn.MSELoss()(
-                expert_d, torch.ones(expert_d.size(), device=self.device)
-            )
-            policy_loss = torch.nn.MSELoss()(
-                policy_d, -1 * torch.ones(policy_d.size(), device=self.device)
-            )
-            amp_loss = 0.5 * (expert_loss + policy_loss)
-            grad_pen_loss = self.discriminator.compute_grad_pen(
-                expert_state, expert_next_state, lambda_=self.disc_grad_penalty
-            )
+                        kl_mean = torch.mean(kl)
+
+                        if self.learning_rate_t is not None:
+                            lr = self.learning_rate_t
+                            lr.copy_(
+                                torch.where(
+                                    kl_mean > self.desired_kl * 2.0,
+                                    torch.clamp(lr / 1.5, min=1e-5),
+                                    torch.where(
+                                        (kl_mean < self.desired_kl / 2.0)
+                                        & (kl_mean > 0.0),
+                                        torch.clamp(lr * 1.5, max=1e-2),
+                                        lr,
+                                    ),
+                                )
+                            )
+                        else:
+                            if kl_mean > self.desired_kl * 2.0:
+                                self.learning_rate = max(1e-5, self.learning_rate / 1.5)
+                            elif kl_mean < self.desired_kl / 2.0 and kl_mean > 0.0:
+                                self.learning_rate = min(1e-2, self.learning_rate * 1.5)
+
+                            for param_group in self.optimizer.param_groups:
+                                param_group["lr"] = self.learning_rate
+
+                # Surrogate loss
+                ratio = torch.exp(
+                    actions_log_prob_batch - torch.squeeze(old_actions_log_prob_batch)
+                )
+                surrogate = -torch.squeeze(advantages_batch) * ratio
+                surrogate_clipped = -torch.squeeze(advantages_batch) * torch.clamp(
+                    ratio, 1.0 - self.clip_param, 1.0 + self.clip_param
+                )
+                surrogate_loss = torch.max(surrogate, surrogate_clipped).mean()
+
+                # Value function loss
+                if self.use_clipped_value_loss:
+                    value_clipped = target_values_batch + (
+                        value_batch - target_values_batch
+                    ).clamp(-self.clip_param, self.clip_param)
+                    value_losses = (value_batch - returns_batch).pow(2)
+                    value_losses_clipped = (value_clipped - returns_batch).pow(2)
+                    value_loss = torch.max(value_losses, value_losses_clipped).mean()
+                else:
+                    value_loss = (returns_batch - value_batch).pow(2).mean()
+
+                # Discriminator loss.
+                policy_state, policy_next_state, policy_idxs = sample_amp_policy
+                expert_state, expert_next_state = sample_amp_expert
+
+                policy_state_unnorm = torch.clone(policy_state)
+                expert_state_unnorm = torch.clone(expert_state)
+
+                if self.amp_normalizer is not None:
+                    with torch.no_grad():
+                        policy_state = self.amp_normalizer.normalize_torch(
+                            policy_state, self.device
+                        )
+                        policy_next_state = self.amp_normalizer.normalize_torch(
+                            policy_next_state, self.device
+                        )
+                        expert_state = self.amp_normalizer.normalize_torch(
+                            expert_state, self.device
+                        )
+                        expert_next_state = self.amp_normalizer.normalize_torch(
+                            expert_next_state, self.device
+                        )
+                policy_d = self.discriminator(
+                    torch.cat([policy_state, policy_next_state], dim=-1)
+                )
+                self.amp_storage.update_priorities(policy_idxs, policy_d)
+                expert_d = self.discriminator(
+                    torch.cat([expert_state, expert_next_state], dim=-1)
+                )
+                expert_loss = torch.nn.MSELoss()(
+                    expert_d, torch.ones(expert_d.size(), device=self.device)
+                )
+                policy_loss = torch.nn.MSELoss()(
+                    policy_d, -1 * torch.ones(policy_d.size(), device=self.device)
+                )
+                amp_loss = 0.5 * (expert_loss + policy_loss)
+                grad_pen_loss = self.discriminator.compute_grad_pen(
+                    expert_state, expert_next_state, lambda_=self.disc_grad_penalty
+                )
 
-            b_loss = self.bound_loss(mu_batch)
-            bounds_loss_coef = (
-                self.bounds_loss_coef if self.bounds_loss_coef is not None else 0.0
-            )
-            # Compute total loss.
-            # loss = (
-            #     surrogate_loss
-            #     + self.value_loss_coef * value_loss
-            #     - self.entropy_coef * entropy_batch.mean()
-            #     + (amp_loss + grad_pen_loss)
-            # )
-            loss = (
-                surrogate_loss
-                + self.value_loss_coef * value_loss
-                - self.entropy_coef * entropy_batch.mean()
-                + self.disc_coef * (amp_loss + grad_pen_loss)
-                + bounds_loss_coef * b_loss
-            )
+                b_loss = self.bound_loss(mu_batch)
+                bounds_loss_coef = (
+                    self.bounds_loss_coef if self.bounds_loss_coef is not None else 0.0
+                )
+                # Compute total loss.
+                # loss = (
+                #     surrogate_loss
+                #     + self.value_loss_coef * value_loss
+                #     - self.entropy_coef * entropy_batch.mean()
+                #     + (amp_loss + grad_pen_loss)
+                # )
+                loss = (
+                    surrogate_loss
+                    + self.value_loss_coef * value_loss
+                    - self.entropy_coef * entropy_batch.mean()
+                    + self.disc_coef * (amp_loss + grad_pen_loss)
+                    + bounds_loss_coef * b_loss
+                )
 
             # Gradient step
             self.optimizer.zero_grad()
-            loss.backward()
-            nn.utils.clip_grad_norm_(self.actor_critic.parameters(), self.max_grad_norm)
-            self.optimizer.step()
+            if self.scaler is not None:
+                self.scaler.scale(loss).backward()
+                self.scaler.unscale_(self.optimizer)
+                nn.utils.clip_grad_norm_(
+                    self.actor_critic.parameters(), self.max_grad_norm
+                )
+                self.scaler.step(self.optimizer)
+                self.scaler.update()
+            else:
+                loss.backward()
+                nn.utils.clip_grad_norm_(
+                    self.actor_critic.parameters(), self.max_grad_norm
+                )
+                self.optimizer.step()
 
             if not self.actor_critic.fixed_std and self.min_std is not None:
                 self.actor_critic.std.data = self.actor_critic.std.data.clamp(
@@ -408,15 +576,15 @@ class AMPPPO:
                 )
 
             if self.amp_normalizer is not None:
-                self.amp_normalizer.update(policy_state_unnorm.cpu().numpy())
-                self.amp_normalizer.update(expert_state_unnorm.cpu().numpy())
+                self.amp_normalizer.update(policy_state_unnorm)
+                self.amp_normalizer.update(expert_state_unnorm)
 
-            mean_value_loss += value_loss.item()
-            mean_surrogate_loss += surrogate_loss.item()
-            mean_amp_loss += amp_loss.item()
-            mean_grad_pen_loss += grad_pen_loss.item()
-            mean_policy_pred += policy_d.mean().item()
-            mean_expert_pred += expert_d.mean().item()
+            mean_value_loss += value_loss.detach()
+            mean_surrogate_loss += surrogate_loss.detach()
+            mean_amp_loss += amp_loss.detach()
+            mean_grad_pen_loss += grad_pen_loss.detach()
+            mean_policy_pred += policy_d.detach().mean()
+            mean_expert_pred += expert_d.detach().mean()
 
             if self.num_rma_obs != 0:
                 for _ in range(self.num_adaptation_module_substeps):
@@ -431,7 +599,7 @@ class AMPPPO:
                     adaptation_loss.backward()
                     self.adaptation_module_optimizer.step()
 
-                    mean_adaptation_module_loss += adaptation_loss.item()
+                    mean_adaptation_module_loss += adaptation_loss.detach()
 
         num_updates = self.num_learning_epochs * self.num_mini_batches
         mean_value_loss /= num_updates
@@ -444,6 +612,29 @@ class AMPPPO:
             mean_adaptation_module_loss /= (
                 num_updates * self.num_adaptation_module_substeps
             )
+        stats = [
+            mean_value_loss,
+            mean_surrogate_loss,
+            mean_amp_loss,
+            mean_grad_pen_loss,
+            mean_policy_pred,
+            mean_expert_pred,
+            mean_adaptation_module_loss,
+        ]
+        if self.learning_rate_t is not None:
+            stats.append(self.learning_rate_t)
+        stats = torch.stack([stat.float() for stat in stats]).tolist()
+        (
+            mean_value_loss,
+            mean_surrogate_loss,
+            mean_amp_loss,
+            mean_grad_pen_loss,
+            mean_policy_pred,
+            mean_expert_pred,
+            mean_adaptation_module_loss,
+        ) = stats[:7]
+        if self.learning_rate_t is not None:
+            self.learning_rate = stats[7]
         self.storage.clear()
 
         return (
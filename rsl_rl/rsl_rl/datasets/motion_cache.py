@@ -0,0 +1,203 @@
+"""Compiled, memory-mapped storage for AMP motion files.
+
+The raw motion files are JSON documents holding a list of frames plus a few
+scalars (frame duration, motion weight). Parsing them is slow, mostly because
+of per-frame debug information that the loader never uses. This module
+compiles a set of motion files into a directory holding:
+
+    frames.npy  - all frames of all motions stacked into one contiguous
+                  float32 array [total_num_frames, frame_dim], with the root
+                  quaternions already normalized and standardized.
+    index.json  - per-motion names, number of frames, frame durations and
+                  weights. Start offsets are the cumulative sum of num_frames.
+
+The frames array is opened with np.memmap (through np.load(mmap_mode="r")),
+so several processes opening the same dataset share the same pages.
+
+Compiled datasets are cached by a hash of the content of the motion files,
+so that any script loading the same clips reuses the same compiled copy.
+
+Usage (converter CLI):
+    python -m rsl_rl.datasets.motion_cache --output <dir> <motion files...>
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+FRAMES_FILE = "frames.npy"
+INDEX_FILE = "index.json"
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AMP_MOTION_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "rsl_rl", "motions"),
+)
+
+# Root orientation is stored as a [x, y, z, w] quaternion after the root position.
+ROOT_ROT_START_IDX = 3
+ROOT_ROT_END_IDX = 7
+
+
+class CompiledMotions:
+    """Read-only view over a compiled motion directory."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), "r") as f:
+            index = json.load(f)
+        if index["version"] != FORMAT_VERSION:
+            raise ValueError(
+                f"Compiled motions in {path} have version {index['version']}, "
+                f"expected {FORMAT_VERSION}."
+            )
+        self.names = index["names"]
+        self.num_frames = np.array(index["num_frames"], dtype=np.int64)
+        self.frame_durations = np.array(index["frame_durations"], dtype=np.float64)
+        self.weights = np.array(index["weights"], dtype=np.float64)
+        self.offsets = np.concatenate(([0], np.cumsum(self.num_frames)[:-1]))
+        self.frames = np.load(os.path.join(path, FRAMES_FILE), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_motion(self, motion_idx):
+        """Returns the [num_frames, frame_dim] frames of a single motion."""
+        start = self.offsets[motion_idx]
+        return self.frames[start : start + self.num_frames[motion_idx]]
+
+
+def hash_motion_files(motion_files):
+    """Returns a hash of the format version and the content of the motion files."""
+    h = hashlib.sha1(str(FORMAT_VERSION).encode())
+    for motion_file in motion_files:
+        with open(motion_file, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _normalize_root_rot(motion_data):
+    """Normalizes the root quaternions and makes their w component positive."""
+    root_rot = motion_data[:, ROOT_ROT_START_IDX:ROOT_ROT_END_IDX]
+    norm = np.linalg.norm(root_rot, axis=-1, keepdims=True)
+    if np.any(np.isclose(norm, 0.0)):
+        raise ValueError("Quaternion may not be zero in motion data.")
+    root_rot = root_rot / norm
+    root_rot = np.where(root_rot[:, -1:] < 0, -root_rot, root_rot)
+    motion_data[:, ROOT_ROT_START_IDX:ROOT_ROT_END_IDX] = root_rot
+    return motion_data
+
+
+def compile_motion_files(motion_files, output_dir):
+    """Parses the motion files and writes them as a compiled motion directory.
+
+    The directory is first written under a temporary name and then renamed, so
+    concurrent processes never observe a partially written dataset.
+    """
+    _check_motion_files(motion_files)
+    names, num_frames, frame_durations, weights, frames = [], [], [], [], []
+    for motion_file in motion_files:
+        with open(motion_file, "r") as f:
+            motion_json = json.load(f)
+        motion_data = _normalize_root_rot(np.array(motion_json["Frames"]))
+        names.append(motion_file.split(".")[0])
+        num_frames.append(motion_data.shape[0])
+        frame_durations.append(float(motion_json["FrameDuration"]))
+        weights.append(float(motion_json["MotionWeight"]))
+        frames.append(motion_data.astype(np.float32))
+
+    parent_dir = os.path.dirname(os.path.abspath(output_dir))
+    os.makedirs(parent_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent_dir)
+    os.chmod(tmp_dir, 0o755)
+    try:
+        np.save(os.path.join(tmp_dir, FRAMES_FILE), np.concatenate(frames, axis=0))
+        with open(os.path.join(tmp_dir, INDEX_FILE), "w") as f:
+            json.dump(
+                {
+                    "version": FORMAT_VERSION,
+                    "names": names,
+                    "num_frames": num_frames,
+                    "frame_durations": frame_durations,
+                    "weights": weights,
+                },
+                f,
+            )
+        os.replace(tmp_dir, output_dir)
+    except OSError:
+        # Another process finished compiling the same dataset first.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not is_compiled_motion_dir(output_dir):
+            raise
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return output_dir
+
+
+def _check_motion_files(motion_files):
+    if len(motion_files) == 0:
+        raise ValueError("No motion files to load, check the motion file paths.")
+
+
+def is_compiled_motion_dir(path):
+    return os.path.isfile(os.path.join(path, INDEX_FILE)) and os.path.isfile(
+        os.path.join(path, FRAMES_FILE)
+    )
+
+
+def load_motions(motion_files, cache_dir=DEFAULT_CACHE_DIR):
+    """Returns the compiled motions for a list of motion files.
+
+    motion_files can also be the path of an already compiled directory (as
+    written by the converter CLI), in which case no hashing is done at all.
+    """
+    if isinstance(motion_files, str):
+        if is_compiled_motion_dir(motion_files):
+            return CompiledMotions(motion_files)
+        motion_files = [motion_files]
+
+    _check_motion_files(motion_files)
+    compiled_dir = os.path.join(cache_dir, hash_motion_files(motion_files))
+    if not is_compiled_motion_dir(compiled_dir):
+        print(f"Compiling {len(motion_files)} motion files to {compiled_dir}")
+        compile_motion_files(motion_files, compiled_dir)
+    return CompiledMotions(compiled_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compile AMP motion files into a memory-mappable dataset."
+    )
+    parser.add_argument(
+        "motion_files", nargs="+", help="Motion files or glob patterns to compile."
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Output directory. Defaults to the content-hash cache directory.",
+    )
+    args = parser.parse_args()
+
+    motion_files = []
+    for pattern in args.motion_files:
+        motion_files.extend(sorted(glob.glob(pattern)) or [pattern])
+
+    if args.output is None:
+        compiled = load_motions(motion_files)
+    else:
+        if is_compiled_motion_dir(args.output):
+            shutil.rmtree(args.output)
+        compiled = CompiledMotions(compile_motion_files(motion_files, args.output))
+    print(
+        f"Compiled {len(compiled)} motions ({compiled.frames.shape[0]} frames) "
+        f"to {compiled.path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
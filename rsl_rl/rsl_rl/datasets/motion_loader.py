@@ -1,5 +1,4 @@
 import glob
-import json
 import logging
 import os
 
@@ -7,7 +6,8 @@ import numpy as np
 import torch
 from pybullet_utils import transformations
 
-from rsl_rl.datasets import motion_util, pose3d
+from rsl_rl.datasets import motion_cache, motion_util
+from rsl_rl.datasets.transition_pool import ExpertTransitionPool
 from rsl_rl.utils import utils
 
 
@@ -65,10 +65,15 @@ class AMPLoader:
         num_preload_transitions=1000000,
         motion_files=glob.glob("datasets/motion_files2/*"),
         no_feet=False,
+        compile_sampler=False,
     ):
         """Expert dataset provides AMP observations from Dog mocap dataset.
 
         time_between_frames: Amount of time in seconds between transition.
+        motion_files: List of motion files, or the path of a motion directory
+            compiled with rsl_rl.datasets.motion_cache.
+        compile_sampler: Compile the on-device transition sampler used when
+            transitions are not preloaded with torch.compile (torch >= 2.0).
         """
         self.device = device
         self.time_between_frames = time_between_frames
@@ -84,59 +89,37 @@ class AMPLoader:
         self.trajectory_frame_durations = []
         self.trajectory_num_frames = []
 
-        for i, motion_file in enumerate(motion_files):
-            self.trajectory_names.append(motion_file.split(".")[0])
-            with open(motion_file, "r") as f:
-                motion_json = json.load(f)
-                motion_data = np.array(motion_json["Frames"])
-                # motion_data = self.reorder_from_pybullet_to_isaac(motion_data)
-
-                # Normalize and standardize quaternions.
-                for f_i in range(motion_data.shape[0]):
-                    root_rot = AMPLoader.get_root_rot(motion_data[f_i])
-                    root_rot = pose3d.QuaternionNormalize(root_rot)
-                    root_rot = motion_util.standardize_quaternion(root_rot)
-                    motion_data[
-                        f_i,
-                        AMPLoader.POS_SIZE : (AMPLoader.POS_SIZE + AMPLoader.ROT_SIZE),
-                    ] = root_rot
-
-                # Remove first 7 observation dimensions (root_pos and root_orn).
-                self.trajectories.append(
-                    torch.tensor(
-                        motion_data[
-                            :, AMPLoader.ROOT_ROT_END_IDX : AMPLoader.JOINT_VEL_END_IDX
-                        ],
-                        dtype=torch.float32,
-                        device=device,
-                    )
-                )
-                if self.no_feet:
-                    # set feet pos and vel to zero
-                    motion_data[
-                        :,
-                        AMPLoader.TAR_TOE_POS_LOCAL_START_IDX : AMPLoader.TAR_TOE_POS_LOCAL_END_IDX,
-                    ] = 0
-                    motion_data[
-                        :,
-                        AMPLoader.TAR_TOE_VEL_LOCAL_START_IDX : AMPLoader.TAR_TOE_VEL_LOCAL_END_IDX,
-                    ] = 0
-                self.trajectories_full.append(
-                    torch.tensor(
-                        motion_data[:, : AMPLoader.JOINT_VEL_END_IDX],
-                        dtype=torch.float32,
-                        device=device,
-                    )
-                )
-                self.trajectory_idxs.append(i)
-                self.trajectory_weights.append(float(motion_json["MotionWeight"]))
-                frame_duration = float(motion_json["FrameDuration"])
-                self.trajectory_frame_durations.append(frame_duration)
-                traj_len = (motion_data.shape[0] - 1) * frame_duration
-                self.trajectory_lens.append(traj_len)
-                self.trajectory_num_frames.append(float(motion_data.shape[0]))
+        motions = motion_cache.load_motions(motion_files)
+        trajectories, trajectories_full = [], []
+        for i, motion_name in enumerate(motions.names):
+            self.trajectory_names.append(motion_name)
+            # Root quaternions are normalized and standardized at compile time.
+            motion_data = np.array(motions.get_motion(i))
 
-            print(f"Loaded {traj_len}s. motion from {motion_file}.")
+            # Remove first 7 observation dimensions (root_pos and root_orn).
+            trajectories.append(
+                motion_data[:, AMPLoader.ROOT_ROT_END_IDX : AMPLoader.JOINT_VEL_END_IDX]
+            )
+            if self.no_feet:
+                # set feet pos and vel to zero
+                motion_data[
+                    :,
+                    AMPLoader.TAR_TOE_POS_LOCAL_START_IDX : AMPLoader.TAR_TOE_POS_LOCAL_END_IDX,
+                ] = 0
+                motion_data[
+                    :,
+                    AMPLoader.TAR_TOE_VEL_LOCAL_START_IDX : AMPLoader.TAR_TOE_VEL_LOCAL_END_IDX,
+                ] = 0
+            trajectories_full.append(motion_data[:, : AMPLoader.JOINT_VEL_END_IDX])
+            self.trajectory_idxs.append(i)
+            self.trajectory_weights.append(motions.weights[i])
+            frame_duration = motions.frame_durations[i]
+            self.trajectory_frame_durations.append(frame_duration)
+            traj_len = (motion_data.shape[0] - 1) * frame_duration
+            self.trajectory_lens.append(traj_len)
+            self.trajectory_num_frames.append(float(motion_data.shape[0]))
+
+            print(f"Loaded {traj_len}s. motion from {motion_name}.")
 
         # Trajectory weights are used to sample some trajectories more than others.
         self.trajectory_weights = np.array(self.trajectory_weights) / np.sum(
@@ -146,21 +129,105 @@ class AMPLoader:
         self.trajectory_lens = np.array(self.trajectory_lens)
         self.trajectory_num_frames = np.array(self.trajectory_num_frames)
 
+        # All trajectories stacked into flat tensors, indexed through per-trajectory
+        # start offsets, so that batched interpolation is a single gather. The
+        # per-trajectory tensors are views into them.
+        self.all_trajectories = torch.tensor(
+            np.concatenate(trajectories), dtype=torch.float32, device=self.device
+        )
+        self.all_trajectories_full = torch.tensor(
+            np.concatenate(trajectories_full), dtype=torch.float32, device=self.device
+        )
+        split_sizes = self.trajectory_num_frames.astype(np.int64).tolist()
+        self.trajectories = list(torch.split(self.all_trajectories, split_sizes))
+        self.trajectories_full = list(
+            torch.split(self.all_trajectories_full, split_sizes)
+        )
+        num_frames = torch.tensor(
+            self.trajectory_num_frames, dtype=torch.long, device=self.device
+        )
+        self.trajectory_offsets_t = torch.cumsum(num_frames, dim=0) - num_frames
+        self.trajectory_num_frames_t = num_frames
+        self.trajectory_lens_t = torch.tensor(
+            self.trajectory_lens, dtype=torch.float64, device=self.device
+        )
+        self.trajectory_frame_durations_t = torch.tensor(
+            self.trajectory_frame_durations, dtype=torch.float64, device=self.device
+        )
+        self.trajectory_weights_t = torch.tensor(
+            self.trajectory_weights, dtype=torch.float32, device=self.device
+        )
+        # AMP observations of every frame: joint pos to joint vel, then root height.
+        self.all_amp_obs = torch.cat(
+            [
+                self.all_trajectories_full[
+                    :, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX
+                ],
+                self.all_trajectories_full[
+                    :, AMPLoader.ROOT_POS_START_IDX + 2 : AMPLoader.ROOT_POS_START_IDX + 3
+                ],
+            ],
+            dim=-1,
+        )
+
+        self._sample_transitions_fn = self._sample_transitions_batch
+        if compile_sampler:
+            self.compile_sampler()
+
         # Preload transitions.
-        self.preload_transitions = preload_transitions
-        if self.preload_transitions:
-            print(f"Preloading {num_preload_transitions} transitions")
-            traj_idxs = self.weighted_traj_idx_sample_batch(num_preload_transitions)
-            times = self.traj_time_sample_batch(traj_idxs)
-            self.preloaded_s = self.get_full_frame_at_time_batch(traj_idxs, times)
-            self.preloaded_s_next = self.get_full_frame_at_time_batch(
-                traj_idxs, times + self.time_between_frames
-            )
+        self.preload_transitions = False
+        self.num_preloaded_transitions = 0
+        if preload_transitions:
+            self.preload(num_preload_transitions)
+        self.transition_pool = None
+
+    def preload(self, num_preload_transitions):
+        """Samples and stores a pool of transitions used by feed_forward_generator."""
+        print(f"Preloading {num_preload_transitions} transitions")
+        traj_idxs = self.weighted_traj_idx_sample_batch(num_preload_transitions)
+        times = self.traj_time_sample_batch(traj_idxs)
+        self.preloaded_s = self.get_full_frame_at_time_batch(traj_idxs, times)
+        self.preloaded_s_next = self.get_full_frame_at_time_batch(
+            traj_idxs, times + self.time_between_frames
+        )
+        self.preload_transitions = True
+        self.num_preloaded_transitions = num_preload_transitions
 
-            print(self.get_joint_pose_batch(self.preloaded_s).mean(dim=0))
-            print(f"Finished preloading")
+        print(self.get_joint_pose_batch(self.preloaded_s).mean(dim=0))
+        print(f"Finished preloading")
 
-        self.all_trajectories_full = torch.vstack(self.trajectories_full)
+    def start_transition_pool(self, size, refresh_fraction=0.05):
+        """Serves feed_forward_generator from a ring pool refreshed in the background.
+
+        Takes precedence over preloaded transitions.
+        """
+        if self.transition_pool is not None:
+            self.transition_pool.close()
+        self.transition_pool = ExpertTransitionPool(self, size, refresh_fraction)
+
+    def compile_sampler(self):
+        """Compiles the on-device transition sampler with torch.compile, if available."""
+        if hasattr(torch, "compile"):
+            self._sample_transitions_fn = torch.compile(self._sample_transitions_batch)
+
+    def memory_footprint(self):
+        """Returns the number of bytes held by the dataset tensors, by name."""
+        tensors = {
+            "trajectories": [self.all_trajectories],
+            "trajectories_full": [self.all_trajectories_full],
+            "amp_obs": [self.all_amp_obs],
+        }
+        if self.preload_transitions:
+            tensors["preloaded_transitions"] = [self.preloaded_s, self.preloaded_s_next]
+        if self.transition_pool is not None:
+            tensors["transition_pool"] = [
+                self.transition_pool.s,
+                self.transition_pool.s_next,
+            ]
+        return {
+            name: sum(t.element_size() * t.numel() for t in ts)
+            for name, ts in tensors.items()
+        }
 
     def reorder_from_pybullet_to_isaac(self, motion_data):
         """Convert from PyBullet ordering to Isaac ordering.
@@ -231,6 +298,17 @@ class AMPLoader:
         )
         return np.maximum(np.zeros_like(time_samples), time_samples)
 
+    def traj_idx_time_sample_batch_torch(self, size):
+        """Samples trajectory idxs and times on the device."""
+        traj_idxs = torch.multinomial(self.trajectory_weights_t, size, replacement=True)
+        subst = self.time_between_frames + self.trajectory_frame_durations_t[traj_idxs]
+        times = (
+            self.trajectory_lens_t[traj_idxs]
+            * torch.rand(size, dtype=torch.float64, device=self.device)
+            - subst
+        )
+        return traj_idxs, torch.clamp(times, min=0.0)
+
     def slerp(self, val0, val1, blend):
         return (1.0 - blend) * val0 + blend * val1
 
@@ -248,28 +326,54 @@ class AMPLoader:
         blend = p * n - idx_low
         return self.slerp(frame_start, frame_end, blend)
 
+    def _frame_indices_batch(self, traj_idxs, times, wrap=False):
+        """Returns the flat indices of the frames surrounding the given times and
+        the blend factor between them.
+
+        The trajectory indices and times can be numpy arrays or tensors. Index
+        arithmetic is done in float64, like the numpy implementation it
+        replaces, so that the same frames are selected.
+        """
+        traj_idxs = torch.as_tensor(traj_idxs, dtype=torch.long, device=self.device)
+        times = torch.as_tensor(times, dtype=torch.float64, device=self.device)
+        p = times / self.trajectory_lens_t[traj_idxs]
+        if wrap:
+            p = p % 1
+        n = self.trajectory_num_frames_t[traj_idxs]
+        p_n = p * n
+        idx_low = torch.floor(p_n).long()
+        idx_high = torch.ceil(p_n).long()
+        blend = (p_n - idx_low).to(torch.float32).unsqueeze(-1)
+        offsets = self.trajectory_offsets_t[traj_idxs]
+        idx_low = offsets + torch.minimum(idx_low, n - 1)
+        idx_high = offsets + torch.minimum(idx_high, n - 1)
+        return idx_low, idx_high, blend
+
     def get_frame_at_time_batch(self, traj_idxs, times):
         """Returns frame for the given trajectory at the specified time."""
-        p = times / self.trajectory_lens[traj_idxs]
-        n = self.trajectory_num_frames[traj_idxs]
-        idx_low, idx_high = np.floor(p * n).astype(np.int), np.ceil(p * n).astype(
-            np.int
-        )
-        all_frame_starts = torch.zeros(
-            len(traj_idxs), self.observation_dim, device=self.device
-        )
-        all_frame_ends = torch.zeros(
-            len(traj_idxs), self.observation_dim, device=self.device
-        )
-        for traj_idx in set(traj_idxs):
-            trajectory = self.trajectories[traj_idx]
-            traj_mask = traj_idxs == traj_idx
-            all_frame_starts[traj_mask] = trajectory[idx_low[traj_mask]]
-            all_frame_ends[traj_mask] = trajectory[idx_high[traj_mask]]
-        blend = torch.tensor(
-            p * n - idx_low, device=self.device, dtype=torch.float32
-        ).unsqueeze(-1)
-        return self.slerp(all_frame_starts, all_frame_ends, blend)
+        idx_low, idx_high, blend = self._frame_indices_batch(traj_idxs, times)
+        return self.slerp(
+            self.all_trajectories[idx_low], self.all_trajectories[idx_high], blend
+        )
+
+    def get_amp_obs_at_time_batch(self, traj_idxs, times):
+        """Returns AMP observations for the given trajectories at the specified times."""
+        idx_low, idx_high, blend = self._frame_indices_batch(
+            traj_idxs, times, wrap=True
+        )
+        return self.slerp(self.all_amp_obs[idx_low], self.all_amp_obs[idx_high], blend)
+
+    def _sample_transitions_batch(self, size):
+        traj_idxs, times = self.traj_idx_time_sample_batch_torch(size)
+        s = self.get_amp_obs_at_time_batch(traj_idxs, times)
+        s_next = self.get_amp_obs_at_time_batch(
+            traj_idxs, times + self.time_between_frames
+        )
+        return s, s_next
+
+    def sample_transitions_batch(self, size):
+        """Samples a batch of AMP transitions (s, s_next) without leaving the device."""
+        return self._sample_transitions_fn(size)
 
     def get_full_frame_at_time(self, traj_idx, time):
         """Returns full frame for the given trajectory at the specified time."""
@@ -282,63 +386,31 @@ class AMPLoader:
         return self.blend_frame_pose(frame_start, frame_end, blend)
 
     def get_full_frame_at_time_batch(self, traj_idxs, times):
-        p = (times / self.trajectory_lens[traj_idxs]) % 1
-        n = self.trajectory_num_frames[traj_idxs]
-        idx_low, idx_high = np.floor(p * n).astype(np.int), np.ceil(p * n).astype(
-            np.int
-        )
-        all_frame_pos_starts = torch.zeros(
-            len(traj_idxs), AMPLoader.POS_SIZE, device=self.device
-        )
-        all_frame_pos_ends = torch.zeros(
-            len(traj_idxs), AMPLoader.POS_SIZE, device=self.device
-        )
-        all_frame_rot_starts = torch.zeros(
-            len(traj_idxs), AMPLoader.ROT_SIZE, device=self.device
-        )
-        all_frame_rot_ends = torch.zeros(
-            len(traj_idxs), AMPLoader.ROT_SIZE, device=self.device
-        )
-        all_frame_amp_starts = torch.zeros(
-            len(traj_idxs),
-            AMPLoader.JOINT_VEL_END_IDX - AMPLoader.JOINT_POSE_START_IDX,
-            device=self.device,
-        )
-        all_frame_amp_ends = torch.zeros(
-            len(traj_idxs),
-            AMPLoader.JOINT_VEL_END_IDX - AMPLoader.JOINT_POSE_START_IDX,
-            device=self.device,
+        """Returns full frames for the given trajectories at the specified times.
+
+        Times wrap around the trajectory length.
+        """
+        idx_low, idx_high, blend = self._frame_indices_batch(
+            traj_idxs, times, wrap=True
         )
-        for traj_idx in set(traj_idxs):
-            trajectory = self.trajectories_full[traj_idx]
-            traj_mask = traj_idxs == traj_idx
-            all_frame_pos_starts[traj_mask] = AMPLoader.get_root_pos_batch(
-                trajectory[idx_low[traj_mask]]
-            )
-            all_frame_pos_ends[traj_mask] = AMPLoader.get_root_pos_batch(
-                trajectory[idx_high[traj_mask]]
-            )
-            all_frame_rot_starts[traj_mask] = AMPLoader.get_root_rot_batch(
-                trajectory[idx_low[traj_mask]]
-            )
-            all_frame_rot_ends[traj_mask] = AMPLoader.get_root_rot_batch(
-                trajectory[idx_high[traj_mask]]
-            )
-            all_frame_amp_starts[traj_mask] = trajectory[idx_low[traj_mask]][
-                :, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX
-            ]
-            all_frame_amp_ends[traj_mask] = trajectory[idx_high[traj_mask]][
-                :, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX
-            ]
-        blend = torch.tensor(
-            p * n - idx_low, device=self.device, dtype=torch.float32
-        ).unsqueeze(-1)
+        frame_starts = self.all_trajectories_full[idx_low]
+        frame_ends = self.all_trajectories_full[idx_high]
 
-        pos_blend = self.slerp(all_frame_pos_starts, all_frame_pos_ends, blend)
+        pos_blend = self.slerp(
+            AMPLoader.get_root_pos_batch(frame_starts),
+            AMPLoader.get_root_pos_batch(frame_ends),
+            blend,
+        )
         rot_blend = utils.quaternion_slerp(
-            all_frame_rot_starts, all_frame_rot_ends, blend
+            AMPLoader.get_root_rot_batch(frame_starts),
+            AMPLoader.get_root_rot_batch(frame_ends),
+            blend,
+        )
+        amp_blend = self.slerp(
+            frame_starts[:, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX],
+            frame_ends[:, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX],
+            blend,
         )
-        amp_blend = self.slerp(all_frame_amp_starts, all_frame_amp_ends, blend)
         return torch.cat([pos_blend, rot_blend, amp_blend], dim=-1)
 
     def get_frame(self):
@@ -358,8 +430,7 @@ class AMPLoader:
             idxs = np.random.choice(self.preloaded_s.shape[0], size=num_frames)
             return self.preloaded_s[idxs]
         else:
-            traj_idxs = self.weighted_traj_idx_sample_batch(num_frames)
-            times = self.traj_time_sample_batch(traj_idxs)
+            traj_idxs, times = self.traj_idx_time_sample_batch_torch(num_frames)
             return self.get_full_frame_at_time_batch(traj_idxs, times)
 
     def blend_frame_pose(self, frame0, frame1, blend):
@@ -425,8 +496,12 @@ class AMPLoader:
 
     def feed_forward_generator(self, num_mini_batch, mini_batch_size):
         """Generates a batch of AMP transitions."""
+        if self.transition_pool is not None:
+            self.transition_pool.step()
         for _ in range(num_mini_batch):
-            if self.preload_transitions:
+            if self.transition_pool is not None:
+                s, s_next = self.transition_pool.sample(mini_batch_size)
+            elif self.preload_transitions:
                 idxs = np.random.choice(self.preloaded_s.shape[0], size=mini_batch_size)
                 s = self.preloaded_s[
                     idxs, AMPLoader.JOINT_POSE_START_IDX : AMPLoader.JOINT_VEL_END_IDX
@@ -459,19 +534,7 @@ class AMPLoader:
                     dim=-1,
                 )
             else:
-                s, s_next = [], []
-                traj_idxs = self.weighted_traj_idx_sample_batch(mini_batch_size)
-                times = self.traj_time_sample_batch(traj_idxs)
-                for traj_idx, frame_time in zip(traj_idxs, times):
-                    s.append(self.get_frame_at_time(traj_idx, frame_time))
-                    s_next.append(
-                        self.get_frame_at_time(
-                            traj_idx, frame_time + self.time_between_frames
-                        )
-                    )
-
-                s = torch.vstack(s)
-                s_next = torch.vstack(s_next)
+                s, s_next = self.sample_transitions_batch(mini_batch_size)
             yield s, s_next
 
     @property
@@ -556,3 +619,62 @@ class AMPLoader:
             :,
             AMPLoader.TAR_TOE_VEL_LOCAL_START_IDX : AMPLoader.TAR_TOE_VEL_LOCAL_END_IDX,
         ]
+
+
+_AMP_LOADERS = {}
+
+
+def get_amp_loader(
+    device,
+    time_between_frames,
+    motion_files,
+    no_feet=False,
+    preload_transitions=False,
+    num_preload_transitions=1000000,
+    compile_sampler=False,
+    transition_pool_size=None,
+    transition_pool_refresh=0.05,
+):
+    """Returns the process-wide AMPLoader for a set of motion files, device and dt.
+
+    The environment (reference state initialization) and the runner (expert
+    transitions for the discriminator) share one set of motion tensors this
+    way. Preloading, sampler compilation and the transition pool are applied
+    on top of an existing loader when a later caller asks for them.
+    """
+    # "cuda" and "cuda:<current device>" are the same device, and share a loader
+    device_key = torch.device(device)
+    if device_key.type == "cuda" and device_key.index is None:
+        device_key = torch.device("cuda", torch.cuda.current_device())
+    key = (
+        motion_files if isinstance(motion_files, str) else tuple(motion_files),
+        str(device_key),
+        float(time_between_frames),
+        bool(no_feet),
+    )
+    loader = _AMP_LOADERS.get(key)
+    if loader is None:
+        loader = AMPLoader(
+            device,
+            time_between_frames,
+            motion_files=motion_files,
+            no_feet=no_feet,
+        )
+        _AMP_LOADERS[key] = loader
+    if (
+        preload_transitions
+        and loader.num_preloaded_transitions < num_preload_transitions
+    ):
+        loader.preload(num_preload_transitions)
+    if compile_sampler:
+        loader.compile_sampler()
+    if transition_pool_size and loader.transition_pool is None:
+        loader.start_transition_pool(transition_pool_size, transition_pool_refresh)
+
+    footprint = loader.memory_footprint()
+    details = ", ".join(f"{k}: {v / 2**20:.1f}MB" for k, v in footprint.items())
+    print(
+        f"AMP motion dataset ({len(loader.trajectory_idxs)} motions, {key[1]}, "
+        f"dt={key[2]}): {sum(footprint.values()) / 2**20:.1f}MB ({details})"
+    )
+    return loader
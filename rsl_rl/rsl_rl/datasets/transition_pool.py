@@ -0,0 +1,81 @@
+"""Fixed-size pool of expert AMP transitions refreshed in the background."""
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+
+
+class ExpertTransitionPool:
+    """Ring pool of (s, s_next) expert transitions.
+
+    Instead of preloading all transitions once, the pool holds `size`
+    transitions and replaces `refresh_fraction` of them at every call to
+    `step()` (once per learning iteration). New transitions are sampled by a
+    background thread (on a side CUDA stream when on GPU) and copied into the
+    ring on the caller's stream, so readers never see half-written rows.
+
+    Memory is set by `size`; the number of distinct transitions seen over a
+    run grows with the number of iterations. Only the first refresh chunk is
+    sampled at construction, the pool grows to its full size over the first
+    iterations. Until then, `sample()` samples the motions directly, so the
+    discriminator does not train on the few transitions of a partial pool.
+    """
+
+    def __init__(self, amp_loader, size, refresh_fraction=0.05):
+        self.amp_loader = amp_loader
+        self.device = torch.device(amp_loader.device)
+        self.size = size
+        self.refresh_size = max(1, min(size, int(size * refresh_fraction)))
+
+        obs_dim = amp_loader.observation_dim
+        self.s = torch.zeros(size, obs_dim, dtype=torch.float32, device=self.device)
+        self.s_next = torch.zeros_like(self.s)
+        self.step_idx = 0
+        self.num_valid = 0
+        self.num_sampled = 0
+
+        self._stream = (
+            torch.cuda.Stream(self.device) if self.device.type == "cuda" else None
+        )
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+        self._insert(*self._sample())
+        self._pending = self._executor.submit(self._sample)
+
+    def _sample(self):
+        if self._stream is None:
+            return self.amp_loader.sample_transitions_batch(self.refresh_size) + (None,)
+        with torch.cuda.stream(self._stream):
+            s, s_next = self.amp_loader.sample_transitions_batch(self.refresh_size)
+            event = torch.cuda.Event()
+            event.record(self._stream)
+        return s, s_next, event
+
+    def _insert(self, s, s_next, event):
+        if event is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_event(event)
+            s.record_stream(current_stream)
+            s_next.record_stream(current_stream)
+        idxs = (
+            torch.arange(self.refresh_size, device=self.device) + self.step_idx
+        ) % self.size
+        self.s[idxs] = s
+        self.s_next[idxs] = s_next
+        self.step_idx = (self.step_idx + self.refresh_size) % self.size
+        self.num_valid = min(self.size, self.num_valid + self.refresh_size)
+        self.num_sampled += self.refresh_size
+
+    def step(self):
+        """Inserts the transitions sampled in the background and starts a new refresh."""
+        self._insert(*self._pending.result())
+        self._pending = self._executor.submit(self._sample)
+
+    def sample(self, batch_size):
+        if self.num_valid < self.size:
+            return self.amp_loader.sample_transitions_batch(batch_size)
+        idxs = torch.randint(0, self.num_valid, (batch_size,), device=self.device)
+        return self.s[idxs], self.s_next[idxs]
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -28,10 +28,12 @@
 #
 # Copyright (c) 2021 ETH Zurich, Nikita Rudin
 
+import contextlib
 import os
 import statistics
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import torch
@@ -40,10 +42,10 @@ from torch.utils.tensorboard import SummaryWriter
 # from legged_gym.utilities.bdx_motion_data import MotionLib
 from rsl_rl.algorithms import AMPPPO, PPO
 from rsl_rl.algorithms.amp_discriminator import AMPDiscriminator
-from rsl_rl.datasets.motion_loader import AMPLoader
+from rsl_rl.datasets.motion_loader import get_amp_loader
 from rsl_rl.env import VecEnv
 from rsl_rl.modules import ActorCritic, ActorCriticRecurrent
-from rsl_rl.utils.utils import Normalizer
+from rsl_rl.utils.utils import TorchNormalizer
 
 
 class AMPOnPolicyRunner:
@@ -80,15 +82,18 @@ class AMPOnPolicyRunner:
         #     self.cfg["amp_motion_file"], device=self.device, sample_dt=self.env.dt
         # )
 
-        amp_data = AMPLoader(
+        amp_data = get_amp_loader(
             device,
             time_between_frames=self.env.dt,
-            preload_transitions=True,
-            num_preload_transitions=train_cfg["runner"]["amp_num_preload_transitions"],
             motion_files=self.cfg["amp_motion_files"],
             no_feet=self.cfg["no_feet"],
+            preload_transitions=self.cfg["amp_preload_transitions"],
+            num_preload_transitions=train_cfg["runner"]["amp_num_preload_transitions"],
+            compile_sampler=self.cfg["amp_compile_sampler"],
+            transition_pool_size=self.cfg["amp_transition_pool_size"],
+            transition_pool_refresh=self.cfg["amp_transition_pool_refresh"],
         )
-        amp_normalizer = Normalizer(amp_data.observation_dim)
+        amp_normalizer = TorchNormalizer(amp_data.observation_dim).to(self.device)
         discriminator = AMPDiscriminator(
             amp_data.observation_dim * 2,
             train_cfg["runner"]["amp_reward_coef"],
@@ -132,6 +137,16 @@ class AMPOnPolicyRunner:
             [self.env.num_actions],
         )
 
+        # Collect the next rollout while learning from the previous one
+        self.pipelined = self.cfg["pipelined"]
+        self._learner = None
+        self._learn_stream = None
+        if self.pipelined:
+            self.alg.enable_pipelining()
+            self._learner = ThreadPoolExecutor(max_workers=1)
+            if torch.device(self.device).type == "cuda":
+                self._learn_stream = torch.cuda.Stream(self.device)
+
         # Log
         self.log_dir = log_dir
         self.writer = None
@@ -164,6 +179,7 @@ class AMPOnPolicyRunner:
             rma_obs.to(self.device)
         self.alg.actor_critic.train()  # switch to train mode (for dropout for example)
         self.alg.discriminator.train()
+        self.alg.sync_acting_policy()
 
         ep_infos = []
         rewbuffer = deque(maxlen=100)
@@ -175,76 +191,69 @@ class AMPOnPolicyRunner:
             self.env.num_envs, dtype=torch.float, device=self.device
         )
 
+        if self.pipelined:
+            # Iteration k learns from the rollout collected during iteration k - 1.
+            obs, critic_obs, amp_obs, rma_obs, obs_history = self.collect_rollout(
+                obs,
+                critic_obs,
+                amp_obs,
+                rma_obs,
+                obs_history,
+                ep_infos,
+                rewbuffer,
+                lenbuffer,
+                cur_reward_sum,
+                cur_episode_length,
+            )
+            ep_infos.clear()
+
         tot_iter = self.current_learning_iteration + num_learning_iterations
         for it in range(self.current_learning_iteration, tot_iter):
             start = time.time()
-            # Rollout
-            with torch.inference_mode():
-                for i in range(self.num_steps_per_env):
-                    actions = self.alg.act(
-                        obs, critic_obs, amp_obs, rma_obs, obs_history
-                    )
-                    (
-                        obs,
-                        privileged_obs,
-                        rewards,
-                        dones,
-                        infos,
-                        reset_env_ids,
-                        terminal_amp_states,
-                    ) = self.env.step(actions)
-                    next_amp_obs = self.env.get_amp_observations()
-                    obs_history = self.env.get_observations_history()
-
-                    critic_obs = privileged_obs if privileged_obs is not None else obs
-                    obs, critic_obs, next_amp_obs, rewards, dones = (
-                        obs.to(self.device),
-                        critic_obs.to(self.device),
-                        next_amp_obs.to(self.device),
-                        rewards.to(self.device),
-                        dones.to(self.device),
-                    )
-                    if infos["dynamics_states"] is not None:
-                        rma_obs = infos["dynamics_states"].to(self.device)
-
-                    # Account for terminal states.
-                    next_amp_obs_with_term = torch.clone(next_amp_obs)
-                    next_amp_obs_with_term[reset_env_ids] = terminal_amp_states
-
-                    rewards = self.alg.discriminator.predict_amp_reward(
-                        amp_obs,
-                        next_amp_obs_with_term,
-                        rewards,
-                        normalizer=self.alg.amp_normalizer,
-                    )[0]
-                    amp_obs = torch.clone(next_amp_obs)
-                    self.alg.process_env_step(
-                        rewards, dones, infos, next_amp_obs_with_term
+            if self.pipelined:
+                self.alg.flush_amp_transitions()
+                self.alg.swap_storage()
+                self.alg.sync_acting_policy()
+                learner = self._learner.submit(
+                    self.learn_step,
+                    critic_obs.clone(),
+                    rma_obs.clone() if rma_obs is not None else None,
+                    self._record_rollout_event(),
+                )
+                obs, critic_obs, amp_obs, rma_obs, obs_history = self.collect_rollout(
+                    obs,
+                    critic_obs,
+                    amp_obs,
+                    rma_obs,
+                    obs_history,
+                    ep_infos,
+                    rewbuffer,
+                    lenbuffer,
+                    cur_reward_sum,
+                    cur_episode_length,
+                )
+                collection_time = time.time() - start
+                losses, learn_time = learner.result()
+                if self._learn_stream is not None:
+                    torch.cuda.current_stream(self.device).wait_stream(
+                        self._learn_stream
                     )
-
-                    if self.log_dir is not None:
-                        # Book keeping
-                        if "episode" in infos:
-                            ep_infos.append(infos["episode"])
-                        cur_reward_sum += rewards
-                        cur_episode_length += 1
-                        new_ids = (dones > 0).nonzero(as_tuple=False)
-                        rewbuffer.extend(
-                            cur_reward_sum[new_ids][:, 0].cpu().numpy().tolist()
-                        )
-                        lenbuffer.extend(
-                            cur_episode_length[new_ids][:, 0].cpu().numpy().tolist()
-                        )
-                        cur_reward_sum[new_ids] = 0
-                        cur_episode_length[new_ids] = 0
-
-                stop = time.time()
-                collection_time = stop - start
-
-                # Learning step
-                start = stop
-                self.alg.compute_returns(critic_obs, rma_obs)
-
+            else:
+                obs, critic_obs, amp_obs, rma_obs, obs_history = self.collect_rollout(
+                    obs,
+                    critic_obs,
+                    amp_obs,
+                    rma_obs,
+                    obs_history,
+                    ep_infos,
+                    rewbuffer,
+                    lenbuffer,
+                    cur_reward_sum,
+                    cur_episode_length,
+                )
+                collection_time = time.time() - start
+                losses, learn_time = self.learn_step(critic_obs, rma_obs)
+            iteration_time = time.time() - start
             (
                 mean_value_loss,
                 mean_surrogate_loss,
@@ -253,15 +262,19 @@ class AMPOnPolicyRunner:
                 mean_policy_pred,
                 mean_expert_pred,
                 mean_adaptation_module_loss,
-            ) = self.alg.update()
-            stop = time.time()
-            learn_time = stop - start
+            ) = losses
             if self.log_dir is not None:
                 self.log(locals())
             if it % self.save_interval == 0:
                 self.save(os.path.join(self.log_dir, "model_{}.pt".format(it)))
             ep_infos.clear()
 
+        if self.pipelined:
+            # Drop the rollout collected during the last iteration, the next learn()
+            # collects a new one. Its AMP transitions are still valid policy samples.
+            self.alg.rollout_storage.clear()
+            self.alg.flush_amp_transitions()
+
         self.current_learning_iteration += num_learning_iterations
         self.save(
             os.path.join(
@@ -269,10 +282,103 @@ class AMPOnPolicyRunner:
             )
         )
 
+    def collect_rollout(
+        self,
+        obs,
+        critic_obs,
+        amp_obs,
+        rma_obs,
+        obs_history,
+        ep_infos,
+        rewbuffer,
+        lenbuffer,
+        cur_reward_sum,
+        cur_episode_length,
+    ):
+        with torch.inference_mode():
+            for i in range(self.num_steps_per_env):
+                actions = self.alg.act(obs, critic_obs, amp_obs, rma_obs, obs_history)
+                (
+                    obs,
+                    privileged_obs,
+                    rewards,
+                    dones,
+                    infos,
+                    reset_env_ids,
+                    terminal_amp_states,
+                ) = self.env.step(actions)
+                next_amp_obs = self.env.get_amp_observations()
+                obs_history = self.env.get_observations_history()
+
+                critic_obs = privileged_obs if privileged_obs is not None else obs
+                obs, critic_obs, next_amp_obs, rewards, dones = (
+                    obs.to(self.device),
+                    critic_obs.to(self.device),
+                    next_amp_obs.to(self.device),
+                    rewards.to(self.device),
+                    dones.to(self.device),
+                )
+                if infos["dynamics_states"] is not None:
+                    rma_obs = infos["dynamics_states"].to(self.device)
+
+                # Account for terminal states.
+                next_amp_obs_with_term = torch.clone(next_amp_obs)
+                next_amp_obs_with_term[reset_env_ids] = terminal_amp_states
+
+                rewards = self.alg.acting_discriminator.predict_amp_reward(
+                    amp_obs,
+                    next_amp_obs_with_term,
+                    rewards,
+                    normalizer=self.alg.acting_amp_normalizer,
+                )[0]
+                amp_obs = torch.clone(next_amp_obs)
+                self.alg.process_env_step(rewards, dones, infos, next_amp_obs_with_term)
+
+                if self.log_dir is not None:
+                    # Book keeping
+                    if "episode" in infos:
+                        ep_infos.append(infos["episode"])
+                    cur_reward_sum += rewards
+                    cur_episode_length += 1
+                    new_ids = (dones > 0).nonzero(as_tuple=False)
+                    rewbuffer.extend(
+                        cur_reward_sum[new_ids][:, 0].cpu().numpy().tolist()
+                    )
+                    lenbuffer.extend(
+                        cur_episode_length[new_ids][:, 0].cpu().numpy().tolist()
+                    )
+                    cur_reward_sum[new_ids] = 0
+                    cur_episode_length[new_ids] = 0
+        return obs, critic_obs, amp_obs, rma_obs, obs_history
+
+    def learn_step(self, last_critic_obs, last_rma_obs, rollout_event=None):
+        """Computes the returns of the last rollout and updates the policy.
+
+        In pipelined mode this runs on the learner thread, on its own CUDA stream.
+        """
+        start = time.time()
+        stream_context = contextlib.nullcontext()
+        if self._learn_stream is not None:
+            self._learn_stream.wait_event(rollout_event)
+            stream_context = torch.cuda.stream(self._learn_stream)
+        with stream_context:
+            with torch.inference_mode():
+                self.alg.compute_returns(last_critic_obs, last_rma_obs)
+            losses = self.alg.update()
+        return losses, time.time() - start
+
+    def _record_rollout_event(self):
+        if self._learn_stream is None:
+            return None
+        event = torch.cuda.Event()
+        event.record(torch.cuda.current_stream(self.device))
+        return event
+
     def log(self, locs, width=80, pad=35):
         self.tot_timesteps += self.num_steps_per_env * self.env.num_envs
-        self.tot_time += locs["collection_time"] + locs["learn_time"]
-        iteration_time = locs["collection_time"] + locs["learn_time"]
+        # Collection and learning overlap in pipelined mode.
+        iteration_time = locs["iteration_time"]
+        self.tot_time += iteration_time
 
         ep_string = f""
         if locs["ep_infos"]:
@@ -289,11 +395,7 @@ class AMPOnPolicyRunner:
                 self.writer.add_scalar("Episode/" + key, value, locs["it"])
                 ep_string += f"""{f'Mean episode {key}:':>{pad}} {value:.4f}\n"""
         mean_std = self.alg.actor_critic.std.mean()
-        fps = int(
-            self.num_steps_per_env
-            * self.env.num_envs
-            / (locs["collection_time"] + locs["learn_time"])
-        )
+        fps = int(self.num_steps_per_env * self.env.num_envs / iteration_time)
 
         self.writer.add_scalar(
             "Loss/value_function", locs["mean_value_loss"], locs["it"]
@@ -314,6 +416,12 @@ class AMPOnPolicyRunner:
             "Perf/collection time", locs["collection_time"], locs["it"]
         )
         self.writer.add_scalar("Perf/learning_time", locs["learn_time"], locs["it"])
+        self.writer.add_scalar("Perf/iteration_time", iteration_time, locs["it"])
+        self.writer.add_scalar(
+            "Perf/overlap_time",
+            locs["collection_time"] + locs["learn_time"] - iteration_time,
+            locs["it"],
+        )
         if len(locs["rewbuffer"]) > 0:
             self.writer.add_scalar(
                 "Train/mean_reward", statistics.mean(locs["rewbuffer"]), locs["it"]
@@ -385,7 +493,7 @@ class AMPOnPolicyRunner:
                 "model_state_dict": self.alg.actor_critic.state_dict(),
                 "optimizer_state_dict": self.alg.optimizer.state_dict(),
                 "discriminator_state_dict": self.alg.discriminator.state_dict(),
-                "amp_normalizer": self.alg.amp_normalizer,
+                "amp_normalizer_state_dict": self.alg.amp_normalizer.state_dict(),
                 "iter": self.current_learning_iteration,
                 "infos": infos,
             },
@@ -396,7 +504,13 @@ class AMPOnPolicyRunner:
         loaded_dict = torch.load(path)
         self.alg.actor_critic.load_state_dict(loaded_dict["model_state_dict"])
         self.alg.discriminator.load_state_dict(loaded_dict["discriminator_state_dict"])
-        self.alg.amp_normalizer = loaded_dict["amp_normalizer"]
+        if "amp_normalizer_state_dict" in loaded_dict:
+            self.alg.amp_normalizer.load_state_dict(
+                loaded_dict["amp_normalizer_state_dict"]
+            )
+        else:
+            # Checkpoints from before the normalizer moved to torch
+            self.alg.amp_normalizer.load_numpy_normalizer(loaded_dict["amp_normalizer"])
         if load_optimizer:
             self.alg.optimizer.load_state_dict(loaded_dict["optimizer_state_dict"])
         self.current_learning_iteration = loaded_dict["iter"]
@@ -1,26 +1,89 @@
 import torch
-import numpy as np
+
+from rsl_rl.storage.sum_tree import SumTree
 
 
 class ReplayBuffer:
     """Fixed-size buffer to store experience tuples."""
 
-    def __init__(self, obs_dim, buffer_size, device):
+    # Recency weights grow by 1 / recency_decay per insert. They are rescaled before
+    # they get large enough for the float64 sums to lose the oldest transitions.
+    _MAX_RECENCY_WEIGHT = 1e12
+
+    def __init__(
+        self,
+        obs_dim,
+        buffer_size,
+        device,
+        storage="device",
+        dtype=None,
+        predraw=False,
+        sampling="uniform",
+        recency_decay=1.0,
+        priority_alpha=0.0,
+        priority_eps=1e-3,
+    ):
         """Initialize a ReplayBuffer object.
         Arguments:
             buffer_size (int): maximum size of buffer
+            device: device of the sampled mini batches
+            storage (str): "device" to store the transitions on device, or "pinned" to
+                store them in pinned host memory, for buffers too large for the device
+            dtype (torch.dtype): storage dtype, e.g. torch.float16 to halve the memory of
+                the buffer. Sampled mini batches are always float32
+            predraw (bool): draw the indices of all the mini batches of
+                feed_forward_generator in a single call
+            sampling (str): "uniform", or "prioritized" to sample transitions with
+                probabilities proportional to their recency weight times their priority
+            recency_decay (float): with prioritized sampling, the weight of the stored
+                transitions is multiplied by recency_decay at each insert
+            priority_alpha (float): with prioritized sampling, exponent of the priority
+                computed from the discriminator score by update_priorities. 0 samples
+                on recency only
+            priority_eps (float): added to the errors, so that every transition can be sampled
         """
-        self.states = torch.zeros(buffer_size, obs_dim).to(device)
-        self.next_states = torch.zeros(buffer_size, obs_dim).to(device)
+        if sampling not in ("uniform", "prioritized"):
+            raise ValueError(f"Unknown replay buffer sampling {sampling}, expected 'uniform' or 'prioritized'.")
+        if sampling == "uniform" and (recency_decay != 1.0 or priority_alpha != 0.0):
+            raise ValueError("recency_decay and priority_alpha need prioritized replay buffer sampling.")
+        if not 0.0 < recency_decay <= 1.0:
+            raise ValueError(f"recency_decay must be in (0, 1], got {recency_decay}.")
+        if storage not in ("device", "pinned"):
+            raise ValueError(f"Unknown replay buffer storage {storage}, expected 'device' or 'pinned'.")
+        if storage == "pinned" and torch.device(device).type != "cuda":
+            raise ValueError("Pinned replay buffer storage needs a CUDA device.")
+        self.pinned = storage == "pinned"
+        self.storage_device = "cpu" if self.pinned else device
+        dtype = torch.float if dtype is None else dtype
+        self.states = torch.zeros(
+            buffer_size, obs_dim, dtype=dtype, device=self.storage_device, pin_memory=self.pinned
+        )
+        self.next_states = torch.zeros(
+            buffer_size, obs_dim, dtype=dtype, device=self.storage_device, pin_memory=self.pinned
+        )
         self.buffer_size = buffer_size
         self.device = device
+        self.predraw = predraw
 
         self.step = 0
         self.num_samples = 0
-    
+
+        self.prioritized = sampling == "prioritized"
+        if self.prioritized:
+            self.recency_decay = recency_decay
+            self.priority_alpha = priority_alpha
+            self.priority_eps = priority_eps
+            # Sampling weight of a transition: score_priorities * recency_weights
+            self.tree = SumTree(buffer_size, device)
+            self.score_priorities = torch.zeros(buffer_size, dtype=torch.float64, device=device)
+            self.recency_weights = torch.zeros(buffer_size, dtype=torch.float64, device=device)
+            self.recency_weight = 1.0
+            # New transitions get the max priority, so they are sampled before they are scored
+            self.max_priority = torch.ones((), dtype=torch.float64, device=device)
+
     def insert(self, states, next_states):
         """Add new states to memory."""
-        
+
         num_states = states.shape[0]
         start_idx = self.step
         end_idx = self.step + num_states
@@ -33,11 +96,67 @@ class ReplayBuffer:
             self.states[start_idx:end_idx] = states
             self.next_states[start_idx:end_idx] = next_states
 
+        if self.prioritized:
+            idxs = torch.arange(start_idx, end_idx, device=self.device) % self.buffer_size
+            self._insert_priorities(idxs)
+
         self.num_samples = min(self.buffer_size, max(end_idx, self.num_samples))
         self.step = (self.step + num_states) % self.buffer_size
 
+    def _insert_priorities(self, idxs):
+        if self.recency_decay < 1.0:
+            # Rather than decaying all the stored weights, the new ones grow
+            self.recency_weight /= self.recency_decay
+            if self.recency_weight > self._MAX_RECENCY_WEIGHT:
+                self.tree.scale_(1.0 / self.recency_weight)
+                self.recency_weights.div_(self.recency_weight)
+                self.recency_weight = 1.0
+        self.score_priorities[idxs] = self.max_priority
+        self.recency_weights[idxs] = self.recency_weight
+        self.tree.update(idxs, self.max_priority * self.recency_weight)
+
+    def update_priorities(self, sample_idxs, policy_d):
+        """Sets the priorities of sampled transitions from their discriminator scores.
+
+        The discriminator is trained to score policy transitions -1, so the transitions it
+        still mistakes for expert ones get a higher priority.
+        """
+        if not self.prioritized or self.priority_alpha == 0.0:
+            return
+        idxs = sample_idxs.to(self.device)
+        error = (policy_d.detach().reshape(-1).to(torch.float64) + 1.0).square()
+        priorities = (error + self.priority_eps).pow(self.priority_alpha)
+        self.score_priorities[idxs] = priorities
+        self.tree.update(idxs, priorities * self.recency_weights[idxs])
+        torch.maximum(self.max_priority, priorities.max(), out=self.max_priority)
+
+    def sample_idxs(self, size):
+        """Samples indices of stored transitions, on the storage device."""
+        if self.prioritized:
+            return self.tree.sample(size).to(self.storage_device)
+        return torch.randint(0, self.num_samples, size, device=self.storage_device)
+
+    def get_batch(self, sample_idxs):
+        """Returns the float32 (states, next_states) at sample_idxs, on the device."""
+        if not self.pinned:
+            return self.states[sample_idxs].float(), self.next_states[sample_idxs].float()
+        batch = []
+        for buffer in (self.states, self.next_states):
+            # Gathered into pinned memory, so that the copy to the device is asynchronous
+            host_batch = torch.empty(
+                (len(sample_idxs), buffer.shape[1]), dtype=buffer.dtype, pin_memory=True
+            )
+            torch.index_select(buffer, 0, sample_idxs, out=host_batch)
+            batch.append(host_batch.to(self.device, non_blocking=True).float())
+        return tuple(batch)
+
     def feed_forward_generator(self, num_mini_batch, mini_batch_size):
-        for _ in range(num_mini_batch):
-            sample_idxs = np.random.choice(self.num_samples, size=mini_batch_size)
-            yield (self.states[sample_idxs].to(self.device),
-                   self.next_states[sample_idxs].to(self.device))
+        """Yields (states, next_states, sample_idxs) mini batches."""
+        if self.predraw:
+            all_sample_idxs = self.sample_idxs((num_mini_batch, mini_batch_size))
+        for i in range(num_mini_batch):
+            if self.predraw:
+                sample_idxs = all_sample_idxs[i]
+            else:
+                sample_idxs = self.sample_idxs((mini_batch_size,))
+            yield (*self.get_batch(sample_idxs), sample_idxs)
@@ -34,6 +34,34 @@ import numpy as np
 from rsl_rl.utils import split_and_pad_trajectories
 
 
+@torch.jit.script
+def compute_gae_returns_(
+    returns: torch.Tensor,
+    rewards: torch.Tensor,
+    values: torch.Tensor,
+    dones: torch.Tensor,
+    last_values: torch.Tensor,
+    gamma: float,
+    lam: float,
+):
+    """Writes the GAE returns of the rollout in returns, in place.
+
+    Scripted, the recursion over the steps runs without the Python interpreter. It
+    reads each step of the buffers once, while it is in cache, and only allocates
+    step sized temporaries. The operations are those of the per-step recursion, so
+    the results are bitwise identical to it.
+    """
+    advantage = torch.zeros_like(last_values)
+    next_values = last_values
+    for step in range(returns.shape[0] - 1, -1, -1):
+        discount = (1.0 - dones[step].float()) * gamma
+        delta = rewards[step] + discount * next_values - values[step]
+        advantage = delta + discount * lam * advantage
+        torch.add(advantage, values[step], out=returns[step])
+        next_values = values[step]
+    return returns
+
+
 class RolloutStorage:
     class Transition:
         def __init__(self):
@@ -200,20 +228,15 @@ class RolloutStorage:
         self.step = 0
 
     def compute_returns(self, last_values, gamma, lam):
-        advantage = 0
-        for step in reversed(range(self.num_transitions_per_env)):
-            if step == self.num_transitions_per_env - 1:
-                next_values = last_values
-            else:
-                next_values = self.values[step + 1]
-            next_is_not_terminal = 1.0 - self.dones[step].float()
-            delta = (
-                self.rewards[step]
-                + next_is_not_terminal * gamma * next_values
-                - self.values[step]
-            )
-            advantage = delta + next_is_not_terminal * gamma * lam * advantage
-            self.returns[step] = advantage + self.values[step]
+        compute_gae_returns_(
+            self.returns,
+            self.rewards,
+            self.values,
+            self.dones,
+            last_values,
+            float(gamma),
+            float(lam),
+        )
 
         # Compute and normalize the advantages
         self.advantages = self.returns - self.values
@@ -0,0 +1,51 @@
+import torch
+
+
+class SumTree:
+    """Binary tree of priorities where each node holds the sum of its children, on the device.
+
+    The leaves are the priorities of capacity items (padded to a power of two). Updates
+    and samples are batched: each one is a loop over the log2(capacity) levels of the
+    tree, with vectorized operations over the batch.
+    """
+
+    def __init__(self, capacity, device):
+        self.capacity = capacity
+        self.depth = max(1, (capacity - 1).bit_length())
+        self.num_leaves = 2**self.depth
+        self.device = device
+        # Node i has children 2i and 2i + 1, the root is node 1. float64 so that the
+        # sums of many small priorities do not lose the small ones.
+        self.tree = torch.zeros(2 * self.num_leaves, dtype=torch.float64, device=device)
+
+    def total(self):
+        return self.tree[1]
+
+    def get(self, indices):
+        return self.tree[self.num_leaves + indices]
+
+    def update(self, indices, priorities):
+        """Sets the priorities of the items at indices, in O(len(indices) * log(capacity))."""
+        nodes = self.num_leaves + indices
+        self.tree[nodes] = priorities.to(torch.float64)
+        for _ in range(self.depth):
+            nodes = nodes // 2
+            # Siblings share their parent, which gets the same sum from both
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def scale_(self, factor):
+        """Multiplies all the priorities by factor."""
+        self.tree.mul_(factor)
+
+    def sample(self, size):
+        """Samples item indices with probabilities proportional to their priorities."""
+        total = self.total()
+        targets = torch.rand(size, dtype=torch.float64, device=self.device) * total
+        nodes = torch.ones(size, dtype=torch.long, device=self.device)
+        for _ in range(self.depth):
+            left = self.tree[2 * nodes]
+            # Never descend in an empty subtree, which rounding could otherwise reach
+            go_right = (targets >= left) & (self.tree[2 * nodes + 1] > 0)
+            targets = torch.where(go_right, targets - left, targets)
+            nodes = 2 * nodes + go_right
+        return nodes - self.num_leaves
@@ -32,7 +32,8 @@ from typing import Tuple
 import torch
 import numpy as np
 
-_EPS = np.finfo(float).eps * 4.0
+# Below this sin(angle), quaternion_slerp falls back to the normalized linear interpolation
+_SLERP_EPS = 1e-6
 
 
 def split_and_pad_trajectories(tensor, dones):
@@ -141,6 +142,60 @@ class Normalizer(RunningMeanStd):
                 torch.vstack(tuple(policy_batch) + tuple(expert_batch)).cpu().numpy())
 
 
+class TorchRunningMeanStd(torch.nn.Module):
+    def __init__(self, shape: Tuple[int, ...] = (), epsilon: float = 1e-4):
+        """
+        Torch version of RunningMeanStd, keeping float64 statistics as buffers on
+        the module's device so that updates never leave the device.
+        :param shape: the shape of the data stream's output
+        :param epsilon: helps with arithmetic issues
+        """
+        super().__init__()
+        self.register_buffer("mean", torch.zeros(shape, dtype=torch.float64))
+        self.register_buffer("var", torch.ones(shape, dtype=torch.float64))
+        self.register_buffer("count", torch.tensor(epsilon, dtype=torch.float64))
+
+    @torch.no_grad()
+    def update(self, arr: torch.Tensor) -> None:
+        arr = arr.to(torch.float64)
+        batch_mean = torch.mean(arr, dim=0)
+        batch_var = torch.var(arr, dim=0, unbiased=False)
+        self.update_from_moments(batch_mean, batch_var, arr.shape[0])
+
+    @torch.no_grad()
+    def update_from_moments(self, batch_mean: torch.Tensor, batch_var: torch.Tensor, batch_count: int) -> None:
+        delta = batch_mean - self.mean
+        tot_count = self.count + batch_count
+
+        m_a = self.var * self.count
+        m_b = batch_var * batch_count
+        m_2 = m_a + m_b + torch.square(delta) * self.count * batch_count / tot_count
+
+        self.mean += delta * batch_count / tot_count
+        self.var.copy_(m_2 / tot_count)
+        self.count.copy_(tot_count)
+
+
+class TorchNormalizer(TorchRunningMeanStd):
+    def __init__(self, input_dim, epsilon=1e-4, clip_obs=10.0):
+        super().__init__(shape=input_dim)
+        self.epsilon = epsilon
+        self.clip_obs = clip_obs
+
+    def normalize_torch(self, input, device=None):
+        """Same interface as Normalizer.normalize_torch, the statistics already
+        live on the module's device."""
+        mean = self.mean.to(input.dtype)
+        std = torch.sqrt(self.var + self.epsilon).to(input.dtype)
+        return torch.clamp((input - mean) / std, -self.clip_obs, self.clip_obs)
+
+    def load_numpy_normalizer(self, normalizer):
+        """Loads the statistics of a (pickled) numpy Normalizer."""
+        self.mean.copy_(torch.from_numpy(np.asarray(normalizer.mean, dtype=np.float64)))
+        self.var.copy_(torch.from_numpy(np.asarray(normalizer.var, dtype=np.float64)))
+        self.count.fill_(float(normalizer.count))
+
+
 class Normalize(torch.nn.Module):
     def __init__(self):
         super(Normalize, self).__init__()
@@ -152,36 +207,26 @@ class Normalize(torch.nn.Module):
 
 
 def quaternion_slerp(q0, q1, fraction, spin=0, shortestpath=True):
-    """Batch quaternion spherical linear interpolation."""
-
-    out = torch.zeros_like(q0)
-
-    zero_mask = torch.isclose(fraction, torch.zeros_like(fraction)).squeeze()
-    ones_mask = torch.isclose(fraction, torch.ones_like(fraction)).squeeze()
-    out[zero_mask] = q0[zero_mask]
-    out[ones_mask] = q1[ones_mask]
+    """Batch quaternion spherical linear interpolation.
 
+    q0, q1: [..., 4] quaternions, fraction: broadcastable to [..., 1].
+    Branch free (torch.where, no masked indexing), so it never synchronizes with the
+    device and can be compiled or captured in a CUDA graph. When sin(angle) is too
+    small to divide by, it falls back to the normalized linear interpolation.
+    q0 and q1 are not modified.
+    """
     d = torch.sum(q0 * q1, dim=-1, keepdim=True)
-    dist_mask = (torch.abs(torch.abs(d) - 1.0) < _EPS).squeeze()
-    out[dist_mask] = q0[dist_mask]
-
     if shortestpath:
-        d_old = torch.clone(d)
-        d = torch.where(d_old < 0, -d, d)
-        q1 = torch.where(d_old < 0, -q1, q1)
-
-    angle = torch.acos(d) + spin * torch.pi
-    angle_mask = (torch.abs(angle) < _EPS).squeeze()
-    out[angle_mask] = q0[angle_mask]
-
-    final_mask = torch.logical_or(zero_mask, ones_mask)
-    final_mask = torch.logical_or(final_mask, dist_mask)
-    final_mask = torch.logical_or(final_mask, angle_mask)
-    final_mask = torch.logical_not(final_mask)
-
-    isin = 1.0 / angle
-    q0 *= torch.sin((1.0 - fraction) * angle) * isin
-    q1 *= torch.sin(fraction * angle) * isin
-    q0 += q1
-    out[final_mask] = q0[final_mask]
-    return out
+        q1 = torch.where(d < 0, -q1, q1)
+        d = torch.abs(d)
+    # d can be slightly out of [-1, 1] due to rounding, acos would be NaN
+    angle = torch.acos(torch.clamp(d, -1.0, 1.0)) + spin * torch.pi
+    sin_angle = torch.sin(angle)
+    small_angle = torch.abs(sin_angle) < _SLERP_EPS
+    sin_angle = torch.where(small_angle, torch.ones_like(sin_angle), sin_angle)
+    w0 = torch.where(
+        small_angle, 1.0 - fraction, torch.sin((1.0 - fraction) * angle) / sin_angle
+    )
+    w1 = torch.where(small_angle, fraction, torch.sin(fraction * angle) / sin_angle)
+    out = w0 * q0 + w1 * q1
+    return torch.where(small_angle, torch.nn.functional.normalize(out, dim=-1), out)
@@ -8,14 +8,18 @@ class OnnxInfer:
         self.ort_session = onnxruntime.InferenceSession(
             self.onnx_model_path, providers=["CPUExecutionProvider"]
         )
+        # [batch, num_obs], the batch axis is dynamic
+        self.num_obs = self.ort_session.get_inputs()[0].shape[1]
 
     def infer(self, inputs):
-        outputs = self.ort_session.run(None, {"obs": inputs})
-        return outputs[0]
+        """Runs the policy on one observation [num_obs] or a batch [batch, num_obs]."""
+        batch = np.asarray(inputs, dtype=np.float32).reshape(-1, self.num_obs)
+        outputs = self.ort_session.run(None, {"obs": batch})
+        return outputs[0].reshape(*np.shape(inputs)[:-1], -1)
 
 
 if __name__ == "__main__":
     O = OnnxInfer("ONNX.onnx")
-    inputs = np.random.uniform(size=51).astype(np.float32)
+    inputs = np.random.uniform(size=O.num_obs).astype(np.float32)
     print(inputs)
     print(O.infer(inputs))